@@ -17,6 +17,7 @@ import mtpy_gui.modeling.modem_plot_response_qt5 as modem_plot_response
 import mtpy_gui.modeling.view_vtk_qt5 as view_vtk
 
 import mtpy_gui.modeling.mt_editor_qt5 as mt_editor
+from mtpy_gui.modeling.data_store import get_data_store
 #import mtpy_gui.modeling.occam1d_gui_qt5 as occam1d_gui
 
 
@@ -62,6 +63,10 @@ class MyMenuBar(QMenuBar):
         action.setChecked(False)
         action.triggered.connect(self.app.set_app_theme)
         
+        action = settings.addAction('Clear Shared Data')
+        action.setStatusTip("Forget the data, response and model files opened by the tools")
+        action.triggered.connect(self.app.clear_data_store)
+        
 
     
 class mainScrollArea(QScrollArea):
@@ -157,6 +162,9 @@ class landingPage(QMainWindow):
         self.setCentralWidget(self.window)
         self.setGeometry(50,50,800,600)
 
+        #files parsed once and shared by all of the tools
+        self.data_store = get_data_store()
+
         bar = MyMenuBar(self)
         self.setMenuBar(bar)
 
@@ -202,6 +210,10 @@ class landingPage(QMainWindow):
         self.open_windows.remove(win)
         
     
+    def clear_data_store(self):
+        print('Cleared %i shared files'%len(self.data_store))
+        self.data_store.clear()
+    
     def set_app_theme(self, useDark):
         self.useDark=useDark
                 
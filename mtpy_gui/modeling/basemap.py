@@ -0,0 +1,575 @@
+# -*- coding: utf-8 -*-
+"""
+Basemap tiles with a persistent on disk cache.
+
+Web map tiles are read from a local tile directory or downloaded once from
+a tile server and kept in a cache directory, so maps can be drawn offline
+after the tiles for a survey have been seeded.  A :class:`Basemap` renders
+the tiles for a view extent once into an image that is reused until the
+extent changes and can be added back to an axes after ax.cla().
+
+Tile sources can be
+
+    * a contextily/xyzservices provider, e.g. cx.providers.USGS.USTopo
+    * a url template, e.g. "https://tile.server.org/{z}/{x}/{y}.png"
+    * a local directory of tiles laid out as {z}/{x}/{y}.png, or a path
+      template with {z}, {x} and {y} in it
+
+Created on Mon Oct 19 2026
+
+:license: MIT
+
+"""
+
+# =============================================================================
+# Imports
+# =============================================================================
+import os
+import io
+import hashlib
+import tempfile
+import urllib.error
+import urllib.request
+from pathlib import Path
+from collections import OrderedDict
+
+import numpy as np
+from PIL import Image
+from pyproj import CRS, Transformer
+from matplotlib.image import AxesImage
+
+# =============================================================================
+# Web mercator tiles
+# =============================================================================
+# half the width of the web mercator (EPSG:3857) world in meters
+ORIGIN_SHIFT = 20037508.342789244
+MAX_LATITUDE = 85.0511287798
+TILE_SIZE = 256
+
+
+def lonlat_to_tile(longitude, latitude, zoom):
+    """
+    get the x, y index of the tiles that contain longitude, latitude
+
+    :param longitude: longitude in decimal degrees
+    :type longitude: float or np.ndarray
+    :param latitude: latitude in decimal degrees
+    :type latitude: float or np.ndarray
+    :param zoom: zoom level
+    :type zoom: int
+    :return: tile x, tile y
+    :rtype: np.ndarray of int
+
+    """
+    n = 2**zoom
+    longitude = np.asarray(longitude, dtype=float)
+    latitude = np.radians(
+        np.clip(np.asarray(latitude, dtype=float), -MAX_LATITUDE, MAX_LATITUDE)
+    )
+    x = np.floor((longitude + 180.0) / 360.0 * n)
+    y = np.floor((1.0 - np.arcsinh(np.tan(latitude)) / np.pi) / 2.0 * n)
+    return (
+        np.clip(x, 0, n - 1).astype(int),
+        np.clip(y, 0, n - 1).astype(int),
+    )
+
+
+def tile_bounds(x, y, zoom):
+    """
+    get the bounds of a tile in web mercator (xmin, xmax, ymin, ymax)
+    """
+    size = 2 * ORIGIN_SHIFT / 2**zoom
+    xmin = -ORIGIN_SHIFT + x * size
+    ymax = ORIGIN_SHIFT - y * size
+    return (xmin, xmin + size, ymax - size, ymax)
+
+
+def get_tile_range(lonlat_bounds, zoom):
+    """
+    get the range of tiles covering (lon_min, lon_max, lat_min, lat_max)
+
+    :return: x_min, x_max, y_min, y_max inclusive
+    :rtype: tuple
+
+    """
+    x, y = lonlat_to_tile(
+        [lonlat_bounds[0], lonlat_bounds[1]],
+        [lonlat_bounds[3], lonlat_bounds[2]],
+        zoom,
+    )
+    return (int(x[0]), int(x[1]), int(y[0]), int(y[1]))
+
+
+def get_zoom(lonlat_bounds, n_pixels, max_zoom=19):
+    """
+    zoom level that gives about one tile pixel per display pixel across
+    the longitude span
+    """
+    span = max(lonlat_bounds[1] - lonlat_bounds[0], 1e-9)
+    zoom = int(np.ceil(np.log2(n_pixels * 360.0 / (TILE_SIZE * span))))
+    return int(np.clip(zoom, 0, max_zoom))
+
+
+# =============================================================================
+# Tile cache
+# =============================================================================
+
+
+class TileCache:
+    """
+    Read web map tiles from a local directory or a tile server, keeping
+    downloaded tiles on disk.
+
+    :param source: tile source, see module doc
+    :type source: string, Path or :class:`xyzservices.TileProvider`
+    :param cache_dir: directory to keep downloaded tiles in, defaults to
+     ~/.mtpy_gui/tiles
+    :type cache_dir: string or Path
+    :param offline: if True never download tiles, only use cached or local
+     tiles.  Set to True after the first failure to reach the tile server.
+    :type offline: bool
+    :param memory_tiles: number of decoded tiles to keep in memory
+    :type memory_tiles: int
+
+    """
+
+    def __init__(
+        self, source, cache_dir=None, offline=False, memory_tiles=256
+    ):
+        self.source = source
+        self.offline = offline
+        self.memory_tiles = memory_tiles
+        self.max_zoom = getattr(source, "max_zoom", 19)
+        self.user_agent = "mtpy_gui"
+        self.timeout = 10
+
+        if cache_dir is None:
+            cache_dir = Path.home().joinpath(".mtpy_gui", "tiles")
+        self.cache_dir = Path(cache_dir).joinpath(self.name)
+
+        self._tiles = OrderedDict()
+        # tiles the server did not return this session, not asked for again
+        self._failed = set()
+
+    @property
+    def is_local(self):
+        """
+        True if the source is a local tile directory
+        """
+        if hasattr(self.source, "build_url"):
+            return False
+        return "://" not in str(self.source)
+
+    @property
+    def name(self):
+        """
+        name used for the cache directory of the source
+        """
+        name = getattr(self.source, "name", None)
+        if name is None:
+            name = hashlib.md5(str(self.source).encode()).hexdigest()[:12]
+        return "".join(c if c.isalnum() or c in "-_." else "_" for c in name)
+
+    def get_url(self, x, y, zoom):
+        """
+        url or local file name of a tile
+        """
+        if hasattr(self.source, "build_url"):
+            return self.source.build_url(x=x, y=y, z=zoom)
+
+        template = str(self.source)
+        if self.is_local and "{z}" not in template:
+            template = os.path.join(template, "{z}", "{x}", "{y}.png")
+        return template.format(x=x, y=y, z=zoom)
+
+    def get_cache_fn(self, x, y, zoom):
+        """
+        file name of a tile in the cache
+        """
+        return self.cache_dir.joinpath(f"{zoom}", f"{x}", f"{y}.tile")
+
+    def has_tile(self, x, y, zoom):
+        """
+        True if the tile can be read without downloading
+        """
+        if self.is_local:
+            return Path(self.get_url(x, y, zoom)).exists()
+        return self.get_cache_fn(x, y, zoom).exists()
+
+    def fetch(self, x, y, zoom):
+        """
+        Get the encoded bytes of a tile, from the local source or cache if
+        possible, otherwise download it and save it to the cache.
+
+        :return: encoded tile, None if the tile is not available
+        :rtype: bytes
+
+        """
+        if self.is_local:
+            fn = Path(self.get_url(x, y, zoom))
+        else:
+            fn = self.get_cache_fn(x, y, zoom)
+        if fn.exists():
+            return fn.read_bytes()
+        if self.is_local or self.offline or (zoom, x, y) in self._failed:
+            return None
+
+        request = urllib.request.Request(
+            self.get_url(x, y, zoom), headers={"User-Agent": self.user_agent}
+        )
+        try:
+            with urllib.request.urlopen(request, timeout=self.timeout) as fid:
+                content = fid.read()
+        except urllib.error.HTTPError:
+            # the server is up but does not have this tile
+            self._failed.add((zoom, x, y))
+            return None
+        except OSError as error:
+            # the server cannot be reached, only use cached tiles from now on
+            print(f"Could not reach tile server because {error}, using cache")
+            self.offline = True
+            return None
+
+        try:
+            fn.parent.mkdir(parents=True, exist_ok=True)
+            fid, tmp_fn = tempfile.mkstemp(dir=fn.parent, suffix=".tmp")
+            with os.fdopen(fid, "wb") as fh:
+                fh.write(content)
+            os.replace(tmp_fn, fn)
+        except OSError as error:
+            print(f"Could not cache tile {zoom}/{x}/{y} because {error}")
+        return content
+
+    def get_tile(self, x, y, zoom):
+        """
+        get a decoded tile as an RGBA array (TILE_SIZE, TILE_SIZE, 4)
+
+        :return: tile, None if not available
+        :rtype: np.ndarray of uint8
+
+        """
+        key = (zoom, x, y)
+        if key in self._tiles:
+            self._tiles.move_to_end(key)
+            return self._tiles[key]
+
+        content = self.fetch(x, y, zoom)
+        if content is None:
+            return None
+        try:
+            with Image.open(io.BytesIO(content)) as image:
+                tile = np.asarray(
+                    image.convert("RGBA").resize((TILE_SIZE, TILE_SIZE))
+                )
+        except (OSError, ValueError):
+            return None
+
+        self._tiles[key] = tile
+        if len(self._tiles) > self.memory_tiles:
+            self._tiles.popitem(last=False)
+        return tile
+
+    def get_seed_tiles(self, lonlat_bounds, zooms, max_tiles=2000):
+        """
+        Get the tiles covering a bounding box, the highest zoom levels are
+        left out until there are at most max_tiles.
+
+        :param lonlat_bounds: (lon_min, lon_max, lat_min, lat_max)
+        :type lonlat_bounds: tuple
+        :param zooms: zoom levels to seed
+        :type zooms: list of int
+        :param max_tiles: largest number of tiles to seed
+        :type max_tiles: int
+        :return: (zoom, x, y) of each tile
+        :rtype: list
+
+        """
+        tiles = []
+        for zoom in sorted(zooms):
+            x0, x1, y0, y1 = get_tile_range(lonlat_bounds, zoom)
+            n_tiles = (x1 - x0 + 1) * (y1 - y0 + 1)
+            if len(tiles) + n_tiles > max_tiles:
+                break
+            tiles += [
+                (zoom, x, y)
+                for x in range(x0, x1 + 1)
+                for y in range(y0, y1 + 1)
+            ]
+        if not tiles:
+            raise ValueError(
+                f"More than {max_tiles} tiles are needed, zoom in to seed"
+            )
+        return tiles
+
+    def seed(
+        self,
+        lonlat_bounds,
+        zooms,
+        max_tiles=2000,
+        progress=None,
+        is_cancelled=None,
+    ):
+        """
+        Download the tiles covering a bounding box so they can be used
+        offline, see :meth:`get_seed_tiles`.
+
+        :param progress: called with (n_done, n_total) after each tile
+        :type progress: callable
+        :param is_cancelled: seeding stops when this returns True
+        :type is_cancelled: callable
+        :return: number of tiles that are available
+        :rtype: int
+
+        """
+        tiles = self.get_seed_tiles(lonlat_bounds, zooms, max_tiles)
+        count = 0
+        for n_done, (zoom, x, y) in enumerate(tiles, 1):
+            if is_cancelled is not None and is_cancelled():
+                break
+            if self.has_tile(x, y, zoom) or (
+                self.fetch(x, y, zoom) is not None
+            ):
+                count += 1
+            if progress is not None:
+                progress(n_done, len(tiles))
+        return count
+
+    def mosaic(self, lonlat_bounds, zoom):
+        """
+        Put the tiles covering a bounding box into one image.
+
+        :return: RGBA image and its web mercator extent
+         (xmin, xmax, ymin, ymax)
+        :rtype: np.ndarray, tuple
+
+        """
+        x0, x1, y0, y1 = get_tile_range(lonlat_bounds, zoom)
+        image = np.zeros(
+            ((y1 - y0 + 1) * TILE_SIZE, (x1 - x0 + 1) * TILE_SIZE, 4),
+            dtype=np.uint8,
+        )
+        n_tiles = 0
+        for x in range(x0, x1 + 1):
+            for y in range(y0, y1 + 1):
+                tile = self.get_tile(x, y, zoom)
+                if tile is None:
+                    continue
+                row = (y - y0) * TILE_SIZE
+                col = (x - x0) * TILE_SIZE
+                image[row : row + TILE_SIZE, col : col + TILE_SIZE] = tile
+                n_tiles += 1
+        if n_tiles == 0:
+            raise ValueError(f"No tiles available for zoom {zoom}")
+
+        xmin = tile_bounds(x0, y0, zoom)[0]
+        ymax = tile_bounds(x0, y0, zoom)[3]
+        xmax = tile_bounds(x1, y1, zoom)[1]
+        ymin = tile_bounds(x1, y1, zoom)[2]
+        return image, (xmin, xmax, ymin, ymax)
+
+
+# =============================================================================
+# Basemap layer
+# =============================================================================
+
+
+class Basemap:
+    """
+    A basemap image for an axes in a given coordinate system.
+
+    The tiles are rendered into an image the size of the axes for the
+    current view extent.  Calling :meth:`draw` again with the same extent
+    adds the same image back without touching the tiles.
+
+    :param ax: axes to draw on
+    :type ax: :class:`matplotlib.axes.Axes`
+    :param tile_cache: tile cache to read tiles from
+    :type tile_cache: :class:`TileCache`
+    :param crs: coordinate system of the axes
+    :type crs: string, int or :class:`pyproj.CRS`
+    :param zoom: zoom level, None to pick one from the extent
+    :type zoom: int
+
+    """
+
+    def __init__(self, ax, tile_cache, crs, zoom=None, max_tiles=64):
+        self.ax = ax
+        self.tile_cache = tile_cache
+        self.crs = CRS.from_user_input(crs)
+        self.zoom = zoom
+        self.max_tiles = max_tiles
+        self.image = None
+        self.rgba = None
+        self._key = None
+
+        self._to_lonlat = Transformer.from_crs(
+            self.crs, "EPSG:4326", always_xy=True
+        )
+        self._to_mercator = Transformer.from_crs(
+            self.crs, "EPSG:3857", always_xy=True
+        )
+
+    def get_lonlat_bounds(self, extent, n_points=21):
+        """
+        bounds in longitude and latitude of an extent in the axes crs,
+        the edges are sampled because the transform can be curved
+        """
+        xx = np.linspace(extent[0], extent[1], n_points)
+        yy = np.linspace(extent[2], extent[3], n_points)
+        edge_x = np.concatenate(
+            (
+                xx,
+                xx,
+                np.full(n_points, extent[0]),
+                np.full(n_points, extent[1]),
+            )
+        )
+        edge_y = np.concatenate(
+            (
+                np.full(n_points, extent[2]),
+                np.full(n_points, extent[3]),
+                yy,
+                yy,
+            )
+        )
+        lon, lat = self._to_lonlat.transform(edge_x, edge_y)
+        return (
+            float(np.min(lon)),
+            float(np.max(lon)),
+            float(np.min(lat)),
+            float(np.max(lat)),
+        )
+
+    def get_zoom(self, lonlat_bounds, n_pixels):
+        """
+        get the zoom for the bounds, lowered until the number of tiles is
+        at most max_tiles
+        """
+        if self.zoom is not None:
+            zoom = self.zoom
+        else:
+            zoom = get_zoom(lonlat_bounds, n_pixels, self.tile_cache.max_zoom)
+        while zoom > 0:
+            x0, x1, y0, y1 = get_tile_range(lonlat_bounds, zoom)
+            if (x1 - x0 + 1) * (y1 - y0 + 1) <= self.max_tiles:
+                break
+            zoom -= 1
+        return zoom
+
+    def render(self, extent, n_pix_x, n_pix_y):
+        """
+        Render the basemap for an extent in the axes crs by sampling the
+        tile mosaic at the center of each output pixel.
+
+        :param extent: (xmin, xmax, ymin, ymax) in the axes crs
+        :type extent: tuple
+        :return: RGBA image (n_pix_y, n_pix_x, 4), first row at ymax
+        :rtype: np.ndarray of uint8
+
+        """
+        lonlat_bounds = self.get_lonlat_bounds(extent)
+        zoom = self.get_zoom(lonlat_bounds, n_pix_x)
+        mosaic, (mxmin, mxmax, mymin, mymax) = self.tile_cache.mosaic(
+            lonlat_bounds, zoom
+        )
+
+        px = extent[0] + (np.arange(n_pix_x) + 0.5) * (
+            (extent[1] - extent[0]) / n_pix_x
+        )
+        py = extent[3] - (np.arange(n_pix_y) + 0.5) * (
+            (extent[3] - extent[2]) / n_pix_y
+        )
+        xx, yy = np.meshgrid(px, py)
+        mx, my = self._to_mercator.transform(xx, yy)
+
+        cols = np.floor((mx - mxmin) / (mxmax - mxmin) * mosaic.shape[1])
+        rows = np.floor((mymax - my) / (mymax - mymin) * mosaic.shape[0])
+        valid = (
+            np.isfinite(cols)
+            & np.isfinite(rows)
+            & (cols >= 0)
+            & (cols < mosaic.shape[1])
+            & (rows >= 0)
+            & (rows < mosaic.shape[0])
+        )
+        image = np.zeros((n_pix_y, n_pix_x, 4), dtype=np.uint8)
+        image[valid] = mosaic[rows[valid].astype(int), cols[valid].astype(int)]
+        return image
+
+    def draw(self):
+        """
+        Add the basemap to the axes for the current view extent, only
+        rendering tiles if the extent or axes size has changed.  Call after
+        ax.cla() and after the axes limits are set.  If the axes is replaced
+        set Basemap.ax to the new axes before drawing.
+
+        :return: basemap image
+        :rtype: :class:`matplotlib.image.AxesImage`
+
+        """
+        xlim = self.ax.get_xlim()
+        ylim = self.ax.get_ylim()
+        extent = (min(xlim), max(xlim), min(ylim), max(ylim))
+        bbox = self.ax.get_window_extent()
+        n_pix_x = max(int(bbox.width), 1)
+        n_pix_y = max(int(bbox.height), 1)
+
+        key = (extent, n_pix_x, n_pix_y, self.zoom, self.tile_cache.name)
+        if key != self._key:
+            self.rgba = self.render(extent, n_pix_x, n_pix_y)
+            self._key = key
+            if self.image is not None and self.image.axes is not None:
+                self.image.remove()
+            self.image = None
+
+        if self.image is None or self.image.axes is not self.ax:
+            self.image = AxesImage(
+                self.ax,
+                interpolation="bilinear",
+                origin="upper",
+                extent=self._key[0],
+                zorder=0,
+            )
+            self.image.set_data(self.rgba)
+            self.ax.add_image(self.image)
+        self.ax.set_xlim(xlim)
+        self.ax.set_ylim(ylim)
+        return self.image
+
+    def get_seed_bounds(self, zooms=None):
+        """
+        Get the bounds and zoom levels to seed the tile cache for the
+        current view extent, call from the thread that owns the axes.
+
+        :param zooms: zoom levels to seed, defaults to two levels either side
+         of the zoom used to draw the view
+        :type zooms: list of int
+        :return: (lon_min, lon_max, lat_min, lat_max) and zoom levels
+        :rtype: tuple, list of int
+
+        """
+        xlim = self.ax.get_xlim()
+        ylim = self.ax.get_ylim()
+        lonlat_bounds = self.get_lonlat_bounds(
+            (min(xlim), max(xlim), min(ylim), max(ylim))
+        )
+        if zooms is None:
+            zoom = self.get_zoom(
+                lonlat_bounds, max(int(self.ax.get_window_extent().width), 1)
+            )
+            zooms = range(
+                max(zoom - 2, 0), min(zoom + 2, self.tile_cache.max_zoom) + 1
+            )
+        return lonlat_bounds, list(zooms)
+
+    def seed(self, zooms=None, **kwargs):
+        """
+        Seed the tile cache for the current view extent, kwargs are passed
+        to :meth:`TileCache.seed`.
+
+        :return: number of tiles that are available
+        :rtype: int
+
+        """
+        lonlat_bounds, zooms = self.get_seed_bounds(zooms)
+        return self.tile_cache.seed(lonlat_bounds, zooms, **kwargs)
@@ -0,0 +1,650 @@
+# -*- coding: utf-8 -*-
+"""
+Headless latency benchmarks for the ModEM tools.
+
+Synthetic ModEM data and model files of a given size are written to a
+temporary directory, then the model manipulator, PT maps, response plot
+and mesh plot are driven through typical interactions with Qt running
+offscreen.  The wall time and peak memory of each action are written to a
+JSON file together with the git commit, package versions and sizes, so
+runs on different commits can be compared.  The synthetic files only
+depend on the sizes and the seed.
+
+    python -m mtpy_gui.modeling.benchmark --cells 40 80 --stations 25 100
+        -o benchmark.json
+
+Peak memory is measured with :mod:`tracemalloc`, which counts numpy
+arrays but slows down pure python code, use --no-memory for times only.
+
+Created on Mon Oct 19 2026
+
+:license: MIT
+
+"""
+
+# =============================================================================
+# Imports
+# =============================================================================
+import os
+
+# needs to be set before Qt is imported
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+import sys
+import json
+import time
+import types
+import argparse
+import platform
+import tempfile
+import traceback
+import contextlib
+import subprocess
+import tracemalloc
+from pathlib import Path
+
+import numpy as np
+import matplotlib
+
+from PyQt5 import QtWidgets
+
+# =============================================================================
+# Synthetic ModEM files
+# =============================================================================
+CENTER_LATITUDE = 40.0
+CENTER_LONGITUDE = -115.0
+
+
+def make_nodes(n_core, cell_size, n_pad=6, pad_factor=1.4):
+    """
+    Get cell widths of a core with padding cells on both sides.
+
+    :param n_core: number of core cells
+    :type n_core: int
+    :param cell_size: width of the core cells in meters
+    :type cell_size: float
+    :return: cell widths
+    :rtype: np.ndarray
+
+    """
+    pad = cell_size * pad_factor ** np.arange(1, n_pad + 1)
+    return np.concatenate((pad[::-1], np.full(n_core, cell_size), pad))
+
+
+def write_modem_model(fn, n_cells, n_z=None, cell_size=500.0, seed=0):
+    """
+    Write a synthetic ModEM model of blocks in a layered background with
+    some air cells in the top layers.
+
+    :param fn: file name
+    :type fn: string or Path
+    :param n_cells: number of core cells in the north and east directions
+    :type n_cells: int
+    :param n_z: number of layers, defaults to n_cells // 2 + 10
+    :type n_z: int
+    :return: (n_north, n_east, n_z) resistivity model
+    :rtype: np.ndarray
+
+    """
+    rng = np.random.default_rng(seed)
+    if n_z is None:
+        n_z = n_cells // 2 + 10
+    dx = make_nodes(n_cells, cell_size)
+    dy = make_nodes(n_cells, cell_size)
+    dz = 10.0 * 1.2 ** np.arange(n_z)
+
+    res_model = np.ones((dx.size, dy.size, n_z))
+    res_model *= 10 ** np.linspace(1.5, 3, n_z)[None, None, :]
+    for _ in range(max(n_cells // 4, 1)):
+        n0, e0 = rng.integers(0, dx.size - 4, 2)
+        z0 = rng.integers(0, n_z - 2)
+        size = rng.integers(2, max(n_cells // 4, 3), 3)
+        res_model[n0 : n0 + size[0], e0 : e0 + size[1], z0 : z0 + size[2]] = (
+            10 ** rng.uniform(0, 4)
+        )
+    # topography in one corner
+    res_model[: dx.size // 3, : dy.size // 3, :3] = 1e12
+
+    lines = [
+        "# synthetic model for benchmarking",
+        f"{dx.size:>5d}{dy.size:>5d}{n_z:>5d}    0 LOGE",
+    ]
+    for widths in (dx, dy, dz):
+        lines.append(" ".join(f"{ww:.3f}" for ww in widths))
+    lines.append("")
+    # ModEM writes north from the last row to the first
+    for zz in range(n_z):
+        for ee in range(dy.size):
+            lines.append(
+                " ".join(f"{vv:.5E}" for vv in np.log(res_model[::-1, ee, zz]))
+            )
+        lines.append("")
+    lines.append(f"{-dx.sum() / 2:.3f} {-dy.sum() / 2:.3f} 0.000")
+    lines.append("0.000")
+    Path(fn).write_text("\n".join(lines) + "\n")
+    return res_model
+
+
+def write_modem_data(fn, n_stations, n_periods=20, spacing=1000.0, seed=0):
+    """
+    Write a synthetic ModEM data file with full impedance and tipper for
+    stations on a square grid.
+
+    :param fn: file name
+    :type fn: string or Path
+    :param n_stations: number of stations, rounded to a square
+    :type n_stations: int
+    :param n_periods: number of periods
+    :type n_periods: int
+    :param spacing: station spacing in meters
+    :type spacing: float
+
+    """
+    rng = np.random.default_rng(seed)
+    n_side = max(int(round(np.sqrt(n_stations))), 1)
+    offsets = (np.arange(n_side) - (n_side - 1) / 2.0) * spacing
+    north, east = [aa.ravel() for aa in np.meshgrid(offsets, offsets)]
+    latitude = CENTER_LATITUDE + north / 111320.0
+    longitude = CENTER_LONGITUDE + east / (
+        111320.0 * np.cos(np.deg2rad(CENTER_LATITUDE))
+    )
+    periods = np.logspace(-2, 3, n_periods)
+
+    header = [
+        "# synthetic data for benchmarking",
+        "# Period(s) Code GG_Lat GG_Lon X(m) Y(m) Z(m) Component Real Imag "
+        "Error",
+    ]
+    z_lines = header + [
+        "> Full_Impedance",
+        "> exp(+i\\omega t)",
+        "> [mV/km]/[nT]",
+        "> 0.00",
+        f"> {CENTER_LATITUDE:.3f} {CENTER_LONGITUDE:.3f}",
+        f"> {n_periods} {north.size}",
+    ]
+    t_lines = header + [
+        "> Full_Vertical_Components",
+        "> exp(+i\\omega t)",
+        "> []",
+        "> 0.00",
+        f"> {CENTER_LATITUDE:.3f} {CENTER_LONGITUDE:.3f}",
+        f"> {n_periods} {north.size}",
+    ]
+    for ss in range(north.size):
+        station = f"mt{ss:03d}"
+        rho = 10 ** rng.uniform(1, 3)
+        strike = np.deg2rad(rng.uniform(0, 90))
+        for period in periods:
+            # apparent resistivity rho = 0.2 T |Z|^2 with Z in mV/km/nT
+            z_mag = np.sqrt(5 * rho / period) * np.exp(1j * np.pi / 4)
+            z_1d = np.array([[0, z_mag], [-z_mag, 0]])
+            rotation = np.array(
+                [
+                    [np.cos(strike), -np.sin(strike)],
+                    [np.sin(strike), np.cos(strike)],
+                ]
+            )
+            z = rotation @ z_1d @ rotation.T
+            z = z * (1 + 0.05 * rng.standard_normal((2, 2)))
+            tipper = 0.1 * (
+                rng.standard_normal(2) + 1j * rng.standard_normal(2)
+            )
+            location = (
+                f"{period:.6E} {station} {latitude[ss]:.6f} "
+                f"{longitude[ss]:.6f} {north[ss]:.3f} {east[ss]:.3f} 0.000"
+            )
+            error = 0.05 * abs(z_mag)
+            for (ii, jj), comp in zip(
+                [(0, 0), (0, 1), (1, 0), (1, 1)], ["ZXX", "ZXY", "ZYX", "ZYY"]
+            ):
+                value = z[ii, jj]
+                z_lines.append(
+                    f"{location} {comp} {value.real:.6E} {value.imag:.6E} "
+                    f"{error:.6E}"
+                )
+            for value, comp in zip(tipper, ["TX", "TY"]):
+                t_lines.append(
+                    f"{location} {comp} {value.real:.6E} {value.imag:.6E} "
+                    "3.000000E-02"
+                )
+    Path(fn).write_text("\n".join(z_lines + t_lines) + "\n")
+
+
+# =============================================================================
+# Benchmark
+# =============================================================================
+def get_git_commit():
+    """
+    get the current commit and whether the tree has changes, None if not
+    in a git repository
+    """
+    cwd = Path(__file__).parent
+    try:
+        commit = subprocess.run(
+            ["git", "rev-parse", "HEAD"],
+            cwd=cwd,
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout.strip()
+        status = subprocess.run(
+            ["git", "status", "--porcelain", "--untracked-files=no"],
+            cwd=cwd,
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+    return {"commit": commit, "dirty": bool(status)}
+
+
+def get_versions():
+    """
+    versions of the packages that change the timings
+    """
+    versions = {
+        "python": platform.python_version(),
+        "numpy": np.__version__,
+        "matplotlib": matplotlib.__version__,
+    }
+    for name in ["mtpy", "scipy", "PyQt5.QtCore"]:
+        try:
+            module = __import__(name, fromlist=["__name__"])
+        except ImportError:
+            continue
+        versions[name] = getattr(
+            module, "__version__", getattr(module, "PYQT_VERSION_STR", None)
+        )
+    return versions
+
+
+@contextlib.contextmanager
+def choose_file(fn):
+    """
+    make file dialogs return fn instead of asking
+    """
+    dialog = QtWidgets.QFileDialog
+    original = dialog.getOpenFileName
+    dialog.getOpenFileName = staticmethod(lambda *args, **kwargs: (str(fn), ""))
+    try:
+        yield
+    finally:
+        dialog.getOpenFileName = original
+
+
+class Benchmark:
+    """
+    Time actions and keep the results.
+
+    :param app: application to process events after each action so the
+     canvases are drawn
+    :type app: QtWidgets.QApplication
+    :param repeat: number of times to run actions that can be repeated
+    :type repeat: int
+    :param memory: measure peak memory with tracemalloc
+    :type memory: bool
+
+    """
+
+    def __init__(self, app, repeat=3, memory=True):
+        self.app = app
+        self.repeat = repeat
+        self.memory = memory
+        self.results = []
+
+    def _run(self, function):
+        if self.memory:
+            tracemalloc.reset_peak()
+            start_memory = tracemalloc.get_traced_memory()[0]
+        start = time.perf_counter()
+        function()
+        self.app.processEvents()
+        elapsed = time.perf_counter() - start
+        peak = None
+        if self.memory:
+            peak = (tracemalloc.get_traced_memory()[1] - start_memory) / 2**20
+        return elapsed, peak
+
+    def measure(self, tool, action, size, functions):
+        """
+        Time a sequence of steps of one action, e.g. each step of a slider
+        scrub, and add a result.
+
+        :param tool: name of the tool
+        :type tool: string
+        :param action: name of the action
+        :type action: string
+        :param size: sizes of the synthetic files
+        :type size: dict
+        :param functions: steps to time, each is called without arguments
+        :type functions: list of callables
+
+        """
+        times = []
+        peaks = []
+        for function in functions:
+            elapsed, peak = self._run(function)
+            times.append(elapsed)
+            if peak is not None:
+                peaks.append(peak)
+        times = np.array(times)
+        self.results.append(
+            {
+                "tool": tool,
+                "action": action,
+                "size": size,
+                "n": int(times.size),
+                "median_s": float(np.median(times)),
+                "mean_s": float(times.mean()),
+                "min_s": float(times.min()),
+                "max_s": float(times.max()),
+                "total_s": float(times.sum()),
+                "peak_mb": float(max(peaks)) if peaks else None,
+            }
+        )
+
+    def skip(self, tool, size, error):
+        """
+        record a tool that could not be run
+        """
+        self.results.append(
+            {
+                "tool": tool,
+                "action": None,
+                "size": size,
+                "skipped": "".join(
+                    traceback.format_exception_only(type(error), error)
+                ).strip(),
+            }
+        )
+
+
+# =============================================================================
+# Tools
+# =============================================================================
+def _event(x, y):
+    return types.SimpleNamespace(xdata=x, ydata=y)
+
+
+def bench_model_manipulator(bench, model_fn, size, n_steps=10, log_space=False):
+    """
+    open a model, scrub the sliders, paint a box and smooth
+    """
+    from mtpy_gui.modeling.modem_model_manipulator_qt5 import (
+        ModelWidget,
+        Smooth,
+    )
+
+    tool = "ModelWidget"
+    widget = ModelWidget()
+    widget.use_model_cache = False
+    widget.log_space = log_space
+    widget.show()
+
+    def read_model():
+        widget.model_fn = model_fn
+
+    bench.measure(tool, "open model", size, [read_model])
+
+    for name, slider in [
+        ("scrub map slider", widget.map_slider),
+        ("scrub east slider", widget.east_slider),
+        ("scrub north slider", widget.north_slider),
+    ]:
+        n = min(n_steps, slider.maximum())
+        bench.measure(
+            tool,
+            name,
+            size,
+            [
+                (lambda ii=ii, slider=slider: slider.setValue(ii))
+                for ii in list(range(1, n + 1)) + list(range(n - 1, -1, -1))
+            ],
+        )
+
+    widget.map_slider.setValue(widget.map_slider.maximum() // 2)
+    box = [
+        (_event(-2.0 + ii * 0.1, -2.0), _event(2.0 + ii * 0.1, 2.0))
+        for ii in range(bench.repeat)
+    ]
+    bench.measure(
+        tool,
+        "rectangle edit",
+        size,
+        [(lambda pick=pick: widget.map_on_pick(*pick)) for pick in box],
+    )
+
+    widget.smooth_widget = Smooth()
+    widget.smooth_widget.hide()
+    bench.measure(tool, "smooth", size, [widget.smooth_model])
+    bench.measure(tool, "undo", size, [widget.undo_tools])
+    widget.close()
+    if widget.slice_cache is not None:
+        widget.slice_cache.close()
+
+
+def bench_pt_map(bench, data_fn, model_fn, size, n_steps=10):
+    """
+    open data and a model, then step through periods
+    """
+    from mtpy_gui.modeling.modem_plot_pt_maps_qt5 import ModEMPlotPTMap
+
+    tool = "ModEMPlotPTMap"
+    window = ModEMPlotPTMap()
+    window.show()
+
+    with choose_file(data_fn):
+        bench.measure(tool, "open data", size, [window.get_data_fn])
+    with choose_file(model_fn):
+        bench.measure(tool, "open model", size, [window.get_model_fn])
+
+    n = min(n_steps, window.list_widget.count())
+    bench.measure(
+        tool,
+        "switch period",
+        size,
+        [
+            (lambda ii=ii: window.get_period(window.list_widget.item(ii)))
+            for ii in range(n)
+        ],
+    )
+    window.close()
+
+
+def bench_plot_responses(bench, data_fn, size, n_steps=10):
+    """
+    open data, then step through stations
+    """
+    from mtpy_gui.modeling.modem_plot_response_gui import PlotResponses
+
+    tool = "PlotResponses"
+    widget = PlotResponses()
+    widget.show()
+
+    def read_data():
+        widget.data_fn = data_fn
+
+    bench.measure(tool, "open data", size, [read_data])
+
+    n = min(n_steps, widget.list_widget.count())
+    bench.measure(
+        tool,
+        "switch station",
+        size,
+        [
+            (lambda ii=ii: widget.get_station(widget.list_widget.item(ii)))
+            for ii in range(n)
+        ],
+    )
+    widget.close()
+
+
+def bench_mesh_plot(bench, model_fn, size):
+    """
+    plot the mesh of a model
+    """
+    from mtpy_gui.modeling.modem_mesh_builder import MeshPlot
+    import mtpy.modeling.modem as modem
+
+    tool = "MeshPlot"
+    model_obj = modem.Model()
+    model_obj.read_model_file(str(model_fn))
+    widget = MeshPlot()
+    widget.show()
+    bench.measure(
+        tool,
+        "plot mesh",
+        size,
+        [(lambda: widget.plot_mesh(model_obj)) for ii in range(bench.repeat)],
+    )
+    widget.close()
+
+
+TOOLS = ["ModelWidget", "ModEMPlotPTMap", "PlotResponses", "MeshPlot"]
+
+
+def run(
+    cells=(40,),
+    stations=(25,),
+    n_periods=20,
+    tools=TOOLS,
+    repeat=3,
+    n_steps=10,
+    memory=True,
+    log_space=False,
+    seed=0,
+):
+    """
+    Run the benchmarks for each combination of model and station count.
+
+    :param cells: number of core cells in each horizontal direction
+    :type cells: list of int
+    :param stations: number of stations
+    :type stations: list of int
+    :return: metadata and results that can be written to JSON
+    :rtype: dict
+
+    """
+    app = QtWidgets.QApplication.instance() or QtWidgets.QApplication(sys.argv)
+    bench = Benchmark(app, repeat=repeat, memory=memory)
+    if memory:
+        tracemalloc.start()
+
+    with tempfile.TemporaryDirectory(prefix="mtpy_gui_benchmark_") as tmp:
+        for n_cells in cells:
+            for n_stations in stations:
+                size = {
+                    "cells": n_cells,
+                    "stations": n_stations,
+                    "periods": n_periods,
+                }
+                model_fn = Path(tmp, f"model_{n_cells}.rho")
+                data_fn = Path(tmp, f"data_{n_stations}.dat")
+                if not model_fn.exists():
+                    write_modem_model(model_fn, n_cells, seed=seed)
+                if not data_fn.exists():
+                    write_modem_data(
+                        data_fn, n_stations, n_periods=n_periods, seed=seed
+                    )
+
+                runs = {
+                    "ModelWidget": lambda: bench_model_manipulator(
+                        bench, model_fn, size, n_steps, log_space
+                    ),
+                    "ModEMPlotPTMap": lambda: bench_pt_map(
+                        bench, data_fn, model_fn, size, n_steps
+                    ),
+                    "PlotResponses": lambda: bench_plot_responses(
+                        bench, data_fn, size, n_steps
+                    ),
+                    "MeshPlot": lambda: bench_mesh_plot(bench, model_fn, size),
+                }
+                for tool in tools:
+                    try:
+                        runs[tool]()
+                    except Exception as error:
+                        bench.skip(tool, size, error)
+
+    if memory:
+        tracemalloc.stop()
+
+    return {
+        "metadata": {
+            "git": get_git_commit(),
+            "versions": get_versions(),
+            "platform": platform.platform(),
+            "qt_platform": os.environ.get("QT_QPA_PLATFORM"),
+            "repeat": repeat,
+            "n_steps": n_steps,
+            "memory": memory,
+            "log_space": log_space,
+            "seed": seed,
+            "date": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        },
+        "results": bench.results,
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Headless latency benchmarks for the ModEM tools",
+        formatter_class=argparse.ArgumentDefaultsHelpFormatter,
+    )
+    parser.add_argument(
+        "--cells", type=int, nargs="+", default=[40], help="core cells"
+    )
+    parser.add_argument(
+        "--stations", type=int, nargs="+", default=[25], help="stations"
+    )
+    parser.add_argument("--periods", type=int, default=20, help="periods")
+    parser.add_argument(
+        "--tools", nargs="+", default=TOOLS, choices=TOOLS, help="tools"
+    )
+    parser.add_argument(
+        "--repeat", type=int, default=3, help="repeats of edits and plots"
+    )
+    parser.add_argument(
+        "--steps", type=int, default=10, help="slider, period, station steps"
+    )
+    parser.add_argument(
+        "--no-memory", action="store_true", help="do not trace memory"
+    )
+    parser.add_argument(
+        "--log-space", action="store_true", help="log10 working model"
+    )
+    parser.add_argument("--seed", type=int, default=0, help="random seed")
+    parser.add_argument(
+        "-o", "--output", default="benchmark.json", help="JSON file"
+    )
+    args = parser.parse_args(argv)
+
+    results = run(
+        cells=args.cells,
+        stations=args.stations,
+        n_periods=args.periods,
+        tools=args.tools,
+        repeat=args.repeat,
+        n_steps=args.steps,
+        memory=not args.no_memory,
+        log_space=args.log_space,
+        seed=args.seed,
+    )
+    with open(args.output, "w") as fid:
+        json.dump(results, fid, indent=2)
+
+    for result in results["results"]:
+        if "skipped" in result:
+            print(f"{result['tool']:<16} skipped: {result['skipped']}")
+        else:
+            print(
+                f"{result['tool']:<16} {result['action']:<20} "
+                f"median {result['median_s'] * 1000:9.1f} ms  "
+                f"peak {result['peak_mb'] or 0:8.1f} MB"
+            )
+    print(f"Wrote {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,174 @@
+# -*- coding: utf-8 -*-
+"""
+Parsed ModEM files shared between windows.
+
+The tools opened from the landing page read data, response and model files
+through one :class:`DataStore`, so a file opened in several windows is
+parsed once.  Every window gets the same object by reference, keyed by the
+path, size and modification time of the file, so a file that changes on
+disk is parsed again the next time it is opened.  A window that edits an
+object takes its own copy with :meth:`DataStore.copy` before the first
+edit and the shared object is never changed.
+
+Created on Mon Oct 19 2026
+
+:license: MIT
+
+"""
+
+# =============================================================================
+# Imports
+# =============================================================================
+import copy
+import threading
+from pathlib import Path
+from collections import OrderedDict
+
+# =============================================================================
+# Readers
+# =============================================================================
+# readers import mtpy when they are called, tools written for the older
+# modem objects and the newer MTData do not need both
+
+
+def read_mt_data(fn, survey=None):
+    """
+    read a ModEM data or response file into an :class:`mtpy.MTData`
+    """
+    from mtpy import MTData
+
+    mt_data = MTData()
+    if survey is None:
+        mt_data.from_modem(Path(fn))
+    else:
+        mt_data.from_modem(Path(fn), survey=survey)
+    return mt_data
+
+
+def read_modem_data(fn):
+    """
+    read a ModEM data or response file into a :class:`mtpy.modeling.modem.Data`
+    """
+    import mtpy.modeling.modem as modem
+
+    modem_data = modem.Data()
+    modem_data.read_data_file(fn)
+    return modem_data
+
+
+def read_modem_model(fn):
+    """
+    read a ModEM model file into a :class:`mtpy.modeling.modem.Model`
+    """
+    import mtpy.modeling.modem as modem
+
+    modem_model = modem.Model()
+    modem_model.read_model_file(fn)
+    return modem_model
+
+
+# =============================================================================
+# Data store
+# =============================================================================
+class DataStore:
+    """
+    Parsed files shared by reference between windows.
+
+    >>> store = get_data_store()
+    >>> mt_data = store.get("ModEM_Data.dat", read_mt_data)
+    >>> edited = store.copy(mt_data)
+
+    :param cache_size: number of parsed objects to keep, the least recently
+     opened are dropped first
+    :type cache_size: int
+
+    """
+
+    def __init__(self, cache_size=8):
+        self.cache_size = cache_size
+        self.n_parsed = 0
+        self.n_shared = 0
+        # (reader, path, reader kwargs): (file key, object)
+        self._objects = OrderedDict()
+        self._lock = threading.RLock()
+
+    def __len__(self):
+        return len(self._objects)
+
+    @staticmethod
+    def file_key(fn):
+        """
+        key of a file, changes when the file changes
+        """
+        stat = Path(fn).stat()
+        return (stat.st_size, stat.st_mtime_ns)
+
+    def get(self, fn, reader, **kwargs):
+        """
+        Get the object read from fn, the file is only parsed if no window
+        has opened it since it last changed.
+
+        :param fn: full path to the file
+        :type fn: string or Path
+        :param reader: function that parses fn, called as reader(fn, **kwargs)
+        :type reader: callable
+        :return: shared object, do not edit it, see :meth:`copy`
+
+        """
+        fn = Path(fn).resolve()
+        key = (
+            reader.__module__,
+            reader.__qualname__,
+            fn.as_posix(),
+            tuple(sorted(kwargs.items())),
+        )
+        file_key = self.file_key(fn)
+        with self._lock:
+            entry = self._objects.get(key)
+            if entry is not None and entry[0] == file_key:
+                self._objects.move_to_end(key)
+                self.n_shared += 1
+                return entry[1]
+
+        obj = reader(fn.as_posix(), **kwargs)
+        with self._lock:
+            self._objects[key] = (file_key, obj)
+            self._objects.move_to_end(key)
+            while len(self._objects) > self.cache_size:
+                self._objects.popitem(last=False)
+            self.n_parsed += 1
+        return obj
+
+    @staticmethod
+    def copy(obj):
+        """
+        deep copy of a shared object for a window to edit
+        """
+        return copy.deepcopy(obj)
+
+    def invalidate(self, fn):
+        """
+        drop every object read from fn
+        """
+        fn = Path(fn).resolve().as_posix()
+        with self._lock:
+            for key in [key for key in self._objects if key[2] == fn]:
+                del self._objects[key]
+
+    def clear(self):
+        with self._lock:
+            self._objects.clear()
+
+
+_data_store = None
+
+
+def get_data_store():
+    """
+    Get the data store of the application, made on first use so windows
+    opened on their own share files the same way.
+    """
+    global _data_store
+    if _data_store is None:
+        _data_store = DataStore()
+    return _data_store
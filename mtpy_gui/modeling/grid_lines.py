@@ -0,0 +1,137 @@
+# -*- coding: utf-8 -*-
+"""
+Grid lines of a model mesh as a LineCollection.
+
+The line segments are built from the grid nodes with numpy and cached per
+grid and scale, so the same segments are shared by every axes that shows
+the grid and are only rebuilt when the grid changes.
+
+Created on Mon Oct 19 2026
+
+:license: MIT
+
+"""
+
+# =============================================================================
+# Imports
+# =============================================================================
+from collections import OrderedDict
+
+import numpy as np
+from matplotlib.collections import LineCollection
+
+# =============================================================================
+# Grid line segments
+# =============================================================================
+_segment_cache = OrderedDict()
+SEGMENT_CACHE_SIZE = 16
+
+
+def get_grid_segments(
+    x_nodes, y_nodes, scale=1.0, x_limits=None, y_limits=None
+):
+    """
+    Get the line segments of a grid, a vertical line at each x node and a
+    horizontal line at each y node.
+
+    :param x_nodes: nodes along the plot x axis
+    :type x_nodes: np.ndarray
+    :param y_nodes: nodes along the plot y axis
+    :type y_nodes: np.ndarray
+    :param scale: nodes are divided by scale
+    :type scale: float
+    :param x_limits: (min, max) of the horizontal lines in plot units,
+     defaults to the extent of the x nodes
+    :type x_limits: tuple
+    :param y_limits: (min, max) of the vertical lines in plot units,
+     defaults to the extent of the y nodes
+    :type y_limits: tuple
+    :return: read only segments (n_x + n_y, 2, 2)
+    :rtype: np.ndarray
+
+    """
+    x_nodes = np.asarray(x_nodes, dtype=float)
+    y_nodes = np.asarray(y_nodes, dtype=float)
+    key = (
+        x_nodes.tobytes(),
+        y_nodes.tobytes(),
+        float(scale),
+        None if x_limits is None else tuple(map(float, x_limits)),
+        None if y_limits is None else tuple(map(float, y_limits)),
+    )
+    if key in _segment_cache:
+        _segment_cache.move_to_end(key)
+        return _segment_cache[key]
+
+    x = x_nodes / scale
+    y = y_nodes / scale
+    if x_limits is None:
+        x_limits = (x.min(), x.max())
+    if y_limits is None:
+        y_limits = (y.min(), y.max())
+
+    vertical = np.empty((x.size, 2, 2))
+    vertical[:, :, 0] = x[:, None]
+    vertical[:, :, 1] = y_limits
+
+    horizontal = np.empty((y.size, 2, 2))
+    horizontal[:, :, 0] = x_limits
+    horizontal[:, :, 1] = y[:, None]
+
+    segments = np.concatenate((vertical, horizontal))
+    segments.flags.writeable = False
+
+    _segment_cache[key] = segments
+    if len(_segment_cache) > SEGMENT_CACHE_SIZE:
+        _segment_cache.popitem(last=False)
+    return segments
+
+
+def make_grid_lines(
+    x_nodes, y_nodes, scale=1.0, x_limits=None, y_limits=None, **kwargs
+):
+    """
+    Make a LineCollection of grid lines, see :func:`get_grid_segments`.
+    Other keyword arguments are passed to LineCollection.
+
+    :return: grid lines
+    :rtype: :class:`matplotlib.collections.LineCollection`
+
+    """
+    return LineCollection(
+        get_grid_segments(
+            x_nodes,
+            y_nodes,
+            scale=scale,
+            x_limits=x_limits,
+            y_limits=y_limits,
+        ),
+        **kwargs,
+    )
+
+
+def add_grid_lines(ax, grid_lines):
+    """
+    add grid lines to an axes if they are not already on it, use after
+    ax.cla() to put the same collection back.
+    """
+    if grid_lines.axes is not ax:
+        ax.add_collection(grid_lines)
+    return grid_lines
+
+
+def get_picked_vertices(event):
+    """
+    Get the x and y of the picked vertices of a pick event.  For a
+    LineCollection this is the first point of each picked segment.
+
+    :return: x, y
+    :rtype: np.ndarray, np.ndarray
+
+    """
+    artist = event.artist
+    if isinstance(artist, LineCollection):
+        segments = artist.get_segments()
+        points = np.array([segments[ii][0] for ii in event.ind])
+        return points[:, 0], points[:, 1]
+    return artist.get_xdata()[event.ind], artist.get_ydata()[event.ind]
@@ -0,0 +1,215 @@
+# -*- coding: utf-8 -*-
+"""
+Level of detail rendering of a 2D model slice.
+
+Only the cells inside the current view are drawn.  If there are more
+visible cells than pixels in the axes the slice is resampled to the
+display resolution and drawn as an image instead of a QuadMesh.  The
+slice is redrawn when the axes limits change from zooming or panning.
+
+Created on Mon Oct 19 2026
+
+:license: MIT
+
+"""
+
+# =============================================================================
+# Imports
+# =============================================================================
+import numpy as np
+from matplotlib.colors import Normalize
+from matplotlib.image import AxesImage
+
+# =============================================================================
+# Level of detail mesh
+# =============================================================================
+
+
+class LODMesh:
+    """
+    Draw a 2D slice of cells on an axes with level of detail.
+
+    :param ax: axes to draw on
+    :type ax: :class:`matplotlib.axes.Axes`
+    :param x_nodes: cell nodes along the plot x axis
+    :type x_nodes: np.ndarray (n_x + 1)
+    :param y_nodes: cell nodes along the plot y axis
+    :type y_nodes: np.ndarray (n_y + 1)
+    :param lod_factor: switch to a raster when the number of visible cells
+     is larger than lod_factor times the number of pixels in the axes
+    :type lod_factor: float
+
+    """
+
+    def __init__(self, ax, x_nodes, y_nodes, lod_factor=1.0, **kwargs):
+        self.ax = ax
+        self.x_nodes = np.asarray(x_nodes)
+        self.y_nodes = np.asarray(y_nodes)
+        self.lod_factor = lod_factor
+
+        self.data = None
+        self.cmap = kwargs.pop("cmap", "jet_r")
+        self.vmin = kwargs.pop("vmin", None)
+        self.vmax = kwargs.pop("vmax", None)
+
+        self.artist = None
+        self.is_raster = False
+        self._callbacks = None
+        self._cids = []
+        self._drawing = False
+
+    def connect(self):
+        """
+        connect to the axes limit callbacks, these are reset by ax.cla()
+        so this is called on every update.
+        """
+        if self._callbacks is self.ax.callbacks:
+            return
+        self._callbacks = self.ax.callbacks
+        self._cids = [
+            self.ax.callbacks.connect("xlim_changed", self._on_limits_changed),
+            self.ax.callbacks.connect("ylim_changed", self._on_limits_changed),
+        ]
+
+    def disconnect(self):
+        """
+        disconnect from the axes limit callbacks
+        """
+        if self._callbacks is not None:
+            for cid in self._cids:
+                self._callbacks.disconnect(cid)
+        self._callbacks = None
+        self._cids = []
+
+    def set_data(self, data, cmap=None, vmin=None, vmax=None):
+        """
+        set new slice data and redraw
+
+        :param data: values of the cells (n_x, n_y)
+        :type data: np.ndarray
+
+        """
+        self.data = data
+        if cmap is not None:
+            self.cmap = cmap
+        if vmin is not None:
+            self.vmin = vmin
+        if vmax is not None:
+            self.vmax = vmax
+        self.update()
+
+    def _on_limits_changed(self, ax):
+        if self.data is None or self._drawing:
+            return
+        self.update()
+        self.ax.figure.canvas.draw_idle()
+
+    def _remove_artist(self):
+        if self.artist is not None:
+            try:
+                self.artist.remove()
+            except (ValueError, NotImplementedError):
+                # already removed by ax.cla()
+                pass
+        self.artist = None
+
+    @staticmethod
+    def _visible_range(nodes, limits):
+        """
+        cell index range that overlaps the axis limits
+        """
+        vmin, vmax = min(limits), max(limits)
+        i0 = max(int(np.searchsorted(nodes, vmin, side="right")) - 1, 0)
+        i1 = min(int(np.searchsorted(nodes, vmax, side="left")), nodes.size - 1)
+        return i0, max(i0, i1)
+
+    def get_pixel_count(self):
+        """
+        number of display pixels in the axes
+        """
+        bbox = self.ax.get_window_extent()
+        return max(int(bbox.width), 1), max(int(bbox.height), 1)
+
+    def update(self):
+        """
+        redraw the visible part of the slice at the right level of detail
+        """
+        if self.data is None:
+            return
+        self.connect()
+
+        # on the first draw show the whole slice
+        if self.ax.get_autoscalex_on():
+            self.ax.set_xlim(self.x_nodes[0], self.x_nodes[-1])
+        if self.ax.get_autoscaley_on():
+            self.ax.set_ylim(self.y_nodes[0], self.y_nodes[-1])
+
+        xlim = self.ax.get_xlim()
+        ylim = self.ax.get_ylim()
+        x0, x1 = self._visible_range(self.x_nodes, xlim)
+        y0, y1 = self._visible_range(self.y_nodes, ylim)
+        n_pix_x, n_pix_y = self.get_pixel_count()
+
+        self._drawing = True
+        try:
+            self._remove_artist()
+            if (x1 - x0) * (y1 - y0) > self.lod_factor * n_pix_x * n_pix_y:
+                self.artist = self._draw_raster(xlim, ylim, n_pix_x, n_pix_y)
+                self.is_raster = True
+            else:
+                self.artist = self.ax.pcolormesh(
+                    self.x_nodes[x0 : x1 + 1],
+                    self.y_nodes[y0 : y1 + 1],
+                    self.data[x0:x1, y0:y1].T,
+                    cmap=self.cmap,
+                    vmin=self.vmin,
+                    vmax=self.vmax,
+                )
+                self.is_raster = False
+        finally:
+            self._drawing = False
+
+        return self.artist
+
+    def resample(self, xlim, ylim, n_pix_x, n_pix_y):
+        """
+        Sample the slice at the center of each display pixel.
+
+        :return: raster (n_pix_y, n_pix_x) with rows ordered from ylim[0]
+         to ylim[1], masked outside of the grid
+        :rtype: np.ma.MaskedArray
+
+        """
+        px = xlim[0] + (np.arange(n_pix_x) + 0.5) * (
+            (xlim[1] - xlim[0]) / n_pix_x
+        )
+        py = ylim[0] + (np.arange(n_pix_y) + 0.5) * (
+            (ylim[1] - ylim[0]) / n_pix_y
+        )
+        ix = np.searchsorted(self.x_nodes, px, side="right") - 1
+        iy = np.searchsorted(self.y_nodes, py, side="right") - 1
+        x_valid = (ix >= 0) & (ix < self.data.shape[0])
+        y_valid = (iy >= 0) & (iy < self.data.shape[1])
+
+        raster = self.data[
+            np.clip(ix, 0, self.data.shape[0] - 1)[None, :],
+            np.clip(iy, 0, self.data.shape[1] - 1)[:, None],
+        ]
+        mask = ~(y_valid[:, None] & x_valid[None, :]) | ~np.isfinite(raster)
+        return np.ma.masked_array(raster, mask=mask)
+
+    def _draw_raster(self, xlim, ylim, n_pix_x, n_pix_y):
+        """
+        draw the slice resampled to display resolution as an image
+        """
+        image = AxesImage(
+            self.ax,
+            cmap=self.cmap,
+            norm=Normalize(vmin=self.vmin, vmax=self.vmax),
+            interpolation="nearest",
+            origin="lower",
+            extent=(xlim[0], xlim[1], ylim[0], ylim[1]),
+        )
+        image.set_data(self.resample(xlim, ylim, n_pix_x, n_pix_y))
+        self.ax.add_image(image)
+        return image
@@ -0,0 +1,257 @@
+# -*- coding: utf-8 -*-
+"""
+Binary sidecar cache for ModEM model files.
+
+Parsing a large ASCII ModEM .rho file takes a long time, so after the first
+read the grid and resistivity model are written next to the model file in
+a directory called <model_fn>.cache.  The cache is keyed by the size and
+modification time of the model file and the resistivity model is memory
+mapped when it is read back, so only the slices that are looked at are
+loaded into memory.
+
+Created on Mon Oct 19 2026
+
+:license: MIT
+
+"""
+
+# =============================================================================
+# Imports
+# =============================================================================
+import os
+import json
+import tempfile
+from pathlib import Path
+
+import numpy as np
+
+from mtpy.modeling import StructuredGrid3D
+
+# =============================================================================
+# Model cache
+# =============================================================================
+CACHE_VERSION = 1
+
+
+class ModEMModelCache:
+    """
+    Read and write a binary cache of a ModEM model file.
+
+    >>> cache = ModEMModelCache("model.rho")
+    >>> model_obj = cache.read_model()
+    >>> new_res_model = cache.working_copy(model_obj.res_model)
+
+    :param model_fn: full path to ModEM model file
+    :type model_fn: string or Path
+
+    """
+
+    res_fn = "res_model.npy"
+    grid_fn = "grid.npz"
+
+    def __init__(self, model_fn):
+        self.model_fn = Path(model_fn)
+        self.cache_dir = self.model_fn.parent.joinpath(
+            f"{self.model_fn.name}.cache"
+        )
+
+    @property
+    def key(self):
+        """
+        key of the source file, changes when the file changes
+        """
+        stat = self.model_fn.stat()
+        return {
+            "version": CACHE_VERSION,
+            "size": stat.st_size,
+            "mtime_ns": stat.st_mtime_ns,
+        }
+
+    def _read_metadata(self):
+        grid_fn = self.cache_dir.joinpath(self.grid_fn)
+        if (
+            not grid_fn.exists()
+            or not self.cache_dir.joinpath(self.res_fn).exists()
+        ):
+            return None
+        try:
+            with np.load(grid_fn, allow_pickle=False) as grid:
+                return json.loads(str(grid["__metadata__"]))
+        except (OSError, ValueError, KeyError):
+            return None
+
+    @property
+    def is_valid(self):
+        """
+        True if there is a cache that matches the current model file
+        """
+        metadata = self._read_metadata()
+        if metadata is None:
+            return False
+        return metadata.get("key") == self.key
+
+    def read_model(self, use_cache=True):
+        """
+        Read the model from the cache if it is valid, otherwise parse the
+        model file and write the cache.
+
+        :param use_cache: set to False to always parse the model file
+        :type use_cache: bool
+        :return: model object, res_model is a read only memory map when it
+         comes from the cache
+        :rtype: :class:`mtpy.modeling.StructuredGrid3D`
+
+        """
+        if use_cache and self.is_valid:
+            try:
+                return self.read()
+            except (OSError, ValueError, KeyError) as error:
+                print(f"Could not read model cache because {error}")
+
+        model_obj = StructuredGrid3D()
+        model_obj.from_modem(self.model_fn)
+        if use_cache:
+            try:
+                self.write(model_obj)
+            except OSError as error:
+                print(f"Could not write model cache because {error}")
+        return model_obj
+
+    def read(self):
+        """
+        read the model object from the cache
+        """
+        model_obj = StructuredGrid3D()
+        with np.load(
+            self.cache_dir.joinpath(self.grid_fn), allow_pickle=False
+        ) as grid:
+            metadata = json.loads(str(grid["__metadata__"]))
+            attributes = dict(metadata["attributes"])
+            for name in metadata["arrays"]:
+                attributes[name] = grid[name]
+
+        for name, value in metadata["tuples"].items():
+            attributes[name] = tuple(value)
+        model_obj.__dict__.update(attributes)
+        model_obj.res_model = np.load(
+            self.cache_dir.joinpath(self.res_fn), mmap_mode="r"
+        )
+        return model_obj
+
+    def write(self, model_obj, res_model=None):
+        """
+        Write a model object to the cache.  Numpy arrays and simple values
+        in the model object are stored, anything else is left to the
+        defaults of a new StructuredGrid3D when read back.
+
+        :param model_obj: model object
+        :type model_obj: :class:`mtpy.modeling.StructuredGrid3D`
+        :param res_model: resistivity model to write instead of
+         model_obj.res_model
+        :type res_model: np.ndarray
+
+        """
+        if res_model is None:
+            res_model = model_obj.res_model
+
+        arrays = {}
+        attributes = {}
+        tuples = {}
+        for name, value in model_obj.__dict__.items():
+            if name == "res_model":
+                continue
+            if isinstance(value, np.ndarray) and value.dtype != object:
+                arrays[name] = value
+            elif isinstance(value, np.generic):
+                attributes[name] = value.item()
+            elif isinstance(value, (bool, int, float, str, type(None))):
+                attributes[name] = value
+            elif isinstance(value, tuple) and all(
+                isinstance(vv, (bool, int, float, str)) for vv in value
+            ):
+                tuples[name] = list(value)
+
+        metadata = {
+            "key": self.key,
+            "arrays": list(arrays.keys()),
+            "attributes": attributes,
+            "tuples": tuples,
+        }
+
+        self.cache_dir.mkdir(exist_ok=True)
+        # write the grid last, it holds the key so a half written cache
+        # is never valid
+        grid_fn = self.cache_dir.joinpath(self.grid_fn)
+        if grid_fn.exists():
+            grid_fn.unlink()
+        self._atomic_write(
+            self.cache_dir.joinpath(self.res_fn),
+            lambda fid: np.save(fid, np.asarray(res_model)),
+        )
+        self._atomic_write(
+            grid_fn,
+            lambda fid: np.savez(
+                fid, __metadata__=np.array(json.dumps(metadata)), **arrays
+            ),
+        )
+
+    def _atomic_write(self, fn, write_function):
+        """
+        write to a temporary file in the cache directory and rename it
+        """
+        fid, tmp_fn = tempfile.mkstemp(dir=self.cache_dir, suffix=".tmp")
+        try:
+            with os.fdopen(fid, "wb") as fh:
+                write_function(fh)
+            os.replace(tmp_fn, fn)
+        except BaseException:
+            if os.path.exists(tmp_fn):
+                os.remove(tmp_fn)
+            raise
+
+    @staticmethod
+    def working_copy(res_model, log_space=False):
+        """
+        Get a copy of res_model to edit.  If res_model is memory mapped from
+        the cache the copy is a copy-on-write memory map, so only the pages
+        that are edited are copied into memory and the cache is never
+        changed.
+
+        With log_space the copy is log10 resistivity as float32, half the
+        size of the linear model, filled a depth layer at a time.
+
+        :param res_model: resistivity model
+        :type res_model: np.ndarray or np.memmap
+        :param log_space: return log10 resistivity as float32
+        :type log_space: bool
+        :return: editable copy
+        :rtype: np.ndarray or np.memmap
+
+        """
+        if log_space:
+            log_model = np.empty(res_model.shape, dtype=np.float32)
+            for zz in range(res_model.shape[2]):
+                log_model[:, :, zz] = np.log10(res_model[:, :, zz])
+            return log_model
+
+        filename = getattr(res_model, "filename", None)
+        if isinstance(res_model, np.memmap) and filename is not None:
+            return np.load(filename, mmap_mode="c")
+        return res_model.copy()
+
+    @staticmethod
+    def to_linear(res_model, log_space=False):
+        """
+        Get linear resistivity as float64 from a working copy, e.g. to save.
+
+        :param res_model: working copy from :meth:`working_copy`
+        :type res_model: np.ndarray
+        :param log_space: res_model is log10 resistivity
+        :type log_space: bool
+        :return: resistivity model
+        :rtype: np.ndarray
+
+        """
+        if log_space:
+            return np.power(10.0, res_model, dtype=float)
+        return np.asarray(res_model, dtype=float)
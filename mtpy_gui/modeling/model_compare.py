@@ -0,0 +1,135 @@
+# -*- coding: utf-8 -*-
+"""
+Compare two resistivity models on the same mesh.
+
+The difference is the log10 ratio of the models, log10(model / compare),
+and is computed only for the slices that are looked at.  Slices are kept
+in a least recently used cache.  The full difference volume is only made
+when it is exported and is written a depth layer at a time.
+
+Created on Mon Oct 19 2026
+
+:license: MIT
+
+"""
+
+# =============================================================================
+# Imports
+# =============================================================================
+from collections import OrderedDict
+
+import numpy as np
+
+# =============================================================================
+# Model difference
+# =============================================================================
+# index of a slice in a (north, east, z) model for each view
+SLICES = {
+    "map": lambda index: (slice(None), slice(None), index),
+    "east": lambda index: (slice(None), index, slice(None)),
+    "north": lambda index: (index, slice(None), slice(None)),
+}
+
+
+class ModelDifference:
+    """
+    Lazily computed log10 ratio of two models.
+
+    :param res_model: model being edited
+    :type res_model: np.ndarray (n_north, n_east, n_z)
+    :param compare_res_model: model to compare against
+    :type compare_res_model: np.ndarray (n_north, n_east, n_z)
+    :param air_value: cells above this value in either model are air and
+     have a difference of NaN
+    :type air_value: float
+    :param cache_size: number of slices to keep
+    :type cache_size: int
+    :param log_space: res_model is log10 resistivity, compare_res_model is
+     always linear
+    :type log_space: bool
+
+    """
+
+    def __init__(
+        self,
+        res_model,
+        compare_res_model,
+        air_value=1e10,
+        cache_size=32,
+        log_space=False,
+    ):
+        if res_model.shape != compare_res_model.shape:
+            raise ValueError(
+                f"Model shapes do not match {res_model.shape} != "
+                f"{compare_res_model.shape}"
+            )
+        self.res_model = res_model
+        self.compare_res_model = compare_res_model
+        self.air_value = air_value
+        self.cache_size = cache_size
+        self.log_space = log_space
+        self._slices = OrderedDict()
+
+    def reset(self, res_model=None):
+        """
+        clear the cached slices, call after the model is edited
+        """
+        if res_model is not None:
+            self.res_model = res_model
+        self._slices.clear()
+
+    def _difference(self, index):
+        res = np.asarray(self.res_model[index], dtype=float)
+        compare = np.asarray(self.compare_res_model[index], dtype=float)
+        if self.log_space:
+            air = res > np.log10(self.air_value)
+            with np.errstate(divide="ignore", invalid="ignore"):
+                difference = res - np.log10(compare)
+        else:
+            air = res > self.air_value
+            with np.errstate(divide="ignore", invalid="ignore"):
+                difference = np.log10(res / compare)
+        difference[air | (compare > self.air_value)] = np.nan
+        return difference
+
+    def get_slice(self, orientation, index):
+        """
+        Get the difference on a slice of the model.
+
+        :param orientation: one of 'map', 'east', 'north'
+        :type orientation: string
+        :param index: index of the slice
+        :type index: int
+        :return: log10(res_model / compare_res_model) with model axis order
+        :rtype: np.ndarray
+
+        """
+        key = (orientation, int(index))
+        if key in self._slices:
+            self._slices.move_to_end(key)
+            return self._slices[key]
+
+        difference = self._difference(SLICES[orientation](int(index)))
+        self._slices[key] = difference
+        if len(self._slices) > self.cache_size:
+            self._slices.popitem(last=False)
+        return difference
+
+    def export(self, fn):
+        """
+        Write the full difference volume to a .npy file one depth layer at
+        a time.
+
+        :param fn: file name
+        :type fn: string or Path
+        :return: memory map of the file
+        :rtype: np.memmap
+
+        """
+        volume = np.lib.format.open_memmap(
+            fn, mode="w+", dtype=float, shape=self.res_model.shape
+        )
+        for zz in range(self.res_model.shape[2]):
+            volume[:, :, zz] = self._difference(SLICES["map"](zz))
+        volume.flush()
+        return volume
@@ -0,0 +1,203 @@
+# -*- coding: utf-8 -*-
+"""
+Mask of model cells that should never be edited (air, sea, fixed cells).
+
+The mask is computed once when a model is loaded and stored as a packed
+boolean array with a bounding box per depth layer, so tools that edit a
+small region only have to look at that region.
+
+Created on Mon Oct 19 2026
+
+:license: MIT
+
+"""
+
+# =============================================================================
+# Imports
+# =============================================================================
+import numpy as np
+
+# =============================================================================
+# Model cell mask
+# =============================================================================
+
+
+class ModelCellMask:
+    """
+    Mask of non-editable cells in a (north, east, z) resistivity model.
+
+    The boolean mask is packed along the east axis with :func:`numpy.packbits`
+    and for each depth layer the bounding box of masked cells is kept as
+    (north_min, north_max, east_min, east_max) with exclusive max values, or
+    None if the layer has no masked cells.
+
+    :param res_model: resistivity model used to find the masked cells, this
+     is kept as the reference values that are restored by :meth:`protect`
+    :type res_model: np.ndarray (n_north, n_east, n_z)
+    :param air_value: cells with resistivity above this value are air
+    :type air_value: float
+    :param sea_value: cells with this resistivity are sea, None to ignore
+    :type sea_value: float
+    :param fixed: extra cells that should not be edited
+    :type fixed: np.ndarray of bool (n_north, n_east, n_z)
+    :param log_space: the models passed to :meth:`protect` are log10
+     resistivity, res_model is always linear
+    :type log_space: bool
+
+    """
+
+    def __init__(
+        self,
+        res_model,
+        air_value=1e10,
+        sea_value=None,
+        fixed=None,
+        log_space=False,
+    ):
+        self.reference = res_model
+        self.air_value = air_value
+        self.log_space = log_space
+        self.sea_value = sea_value
+        self.shape = res_model.shape
+
+        mask = res_model > air_value
+        if sea_value is not None:
+            mask |= np.isclose(res_model, sea_value)
+        if fixed is not None:
+            mask |= fixed
+
+        self._packed = np.packbits(mask, axis=1)
+        self.layer_bounds = self._get_layer_bounds(mask)
+
+    @staticmethod
+    def _get_layer_bounds(mask):
+        """
+        get the bounding box of masked cells for each layer
+        """
+        north_any = mask.any(axis=1)
+        east_any = mask.any(axis=0)
+
+        layer_bounds = []
+        for zz in range(mask.shape[2]):
+            north_index = np.nonzero(north_any[:, zz])[0]
+            if north_index.size == 0:
+                layer_bounds.append(None)
+                continue
+            east_index = np.nonzero(east_any[:, zz])[0]
+            layer_bounds.append(
+                (
+                    int(north_index[0]),
+                    int(north_index[-1]) + 1,
+                    int(east_index[0]),
+                    int(east_index[-1]) + 1,
+                )
+            )
+        return layer_bounds
+
+    @property
+    def count(self):
+        """number of masked cells"""
+        return int(np.unpackbits(self._packed, axis=1).sum())
+
+    def has_masked(self, z_index):
+        """
+        True if the layer has any masked cells
+        """
+        return self.layer_bounds[z_index] is not None
+
+    def _to_slices(self, index):
+        """
+        convert an index of ints and slices into 3 positive step 1 slices
+        and a tuple to index the result back to the shape of the input.
+        """
+        if index is None:
+            index = ()
+        if not isinstance(index, tuple):
+            index = (index,)
+        index = index + (slice(None),) * (3 - len(index))
+
+        slices = []
+        squeeze = []
+        for ii, n in zip(index, self.shape):
+            if isinstance(ii, slice):
+                start, stop, step = ii.indices(n)
+                if step != 1:
+                    raise ValueError(
+                        "Only slices with a step of 1 are supported"
+                    )
+                slices.append(slice(start, max(start, stop)))
+                squeeze.append(slice(None))
+            else:
+                ii = int(ii)
+                if ii < 0:
+                    ii += n
+                slices.append(slice(ii, ii + 1))
+                squeeze.append(0)
+        return tuple(slices), tuple(squeeze)
+
+    def _unpack(self, north, east, z):
+        """
+        unpack only the bytes needed for the region
+        """
+        byte_start = east.start // 8
+        byte_stop = -(-east.stop // 8)
+        block = np.unpackbits(
+            self._packed[north, byte_start:byte_stop, z],
+            axis=1,
+            count=(byte_stop - byte_start) * 8,
+        )
+        offset = east.start - byte_start * 8
+        return block[:, offset : offset + east.stop - east.start, :].astype(
+            bool
+        )
+
+    def get(self, index=None):
+        """
+        get the mask for a region of the model
+
+        :param index: index into the model made of ints and slices
+        :type index: tuple
+        :return: boolean mask with the same shape as res_model[index]
+        :rtype: np.ndarray
+
+        """
+        (north, east, z), squeeze = self._to_slices(index)
+        return self._unpack(north, east, z)[squeeze]
+
+    def editable(self, index=None):
+        """
+        get a mask of cells that can be edited for a region of the model
+        """
+        return ~self.get(index)
+
+    def protect(self, res_model, index=None):
+        """
+        Put the reference values back into masked cells of res_model within
+        the region given by index.  Only layers with masked cells inside the
+        region are touched.
+
+        :param res_model: model being edited
+        :type res_model: np.ndarray (n_north, n_east, n_z)
+        :param index: region that was edited, None for the whole model
+        :type index: tuple
+
+        """
+        (north, east, z), _ = self._to_slices(index)
+        for zz in range(z.start, z.stop):
+            bounds = self.layer_bounds[zz]
+            if bounds is None:
+                continue
+            n0 = max(north.start, bounds[0])
+            n1 = min(north.stop, bounds[1])
+            e0 = max(east.start, bounds[2])
+            e1 = min(east.stop, bounds[3])
+            if n0 >= n1 or e0 >= e1:
+                continue
+            region = (slice(n0, n1), slice(e0, e1), slice(zz, zz + 1))
+            layer_mask = self._unpack(*region)
+            reference = self.reference[region][layer_mask]
+            if self.log_space:
+                reference = np.log10(reference)
+            res_model[region][layer_mask] = reference
+
+        return res_model
@@ -0,0 +1,420 @@
+# -*- coding: utf-8 -*-
+"""
+Vectorized region painting for resistivity models.
+
+Selections are made on a 2D slice of the model (map view, N-S section or
+E-W section) as a box, polygon/lasso or circle, then extended through a
+range of cells normal to the slice to paint a prism or cylinder.  Values
+are set or scaled in a single vectorized assignment on the bounding box of
+the selection.  Connected regions of similar resistivity can be grown from
+a seed cell in 2D or 3D with :class:`RegionGrow`.
+
+Created on Mon Oct 19 2026
+
+:license: MIT
+
+"""
+
+# =============================================================================
+# Imports
+# =============================================================================
+from collections import OrderedDict
+
+import numpy as np
+from scipy import ndimage
+from matplotlib.path import Path
+
+# =============================================================================
+# Slice orientations
+# =============================================================================
+# model arrays are (north, east, z), for each view give the array axis of
+# the plot x axis, the plot y axis and the axis normal to the slice.
+ORIENTATIONS = {
+    "map": (1, 0, 2),
+    "east": (0, 2, 1),
+    "north": (1, 2, 0),
+}
+
+# =============================================================================
+# Selection
+# =============================================================================
+
+
+class Selection:
+    """
+    A 2D selection on a model slice.
+
+    :param orientation: one of 'map', 'east', 'north'
+    :type orientation: string
+    :param x_slice: cells along the plot x axis in the bounding box
+    :type x_slice: slice
+    :param y_slice: cells along the plot y axis in the bounding box
+    :type y_slice: slice
+    :param mask: selected cells within the bounding box (n_x, n_y)
+    :type mask: np.ndarray of bool
+
+    """
+
+    def __init__(self, orientation, x_slice, y_slice, mask):
+        self.orientation = orientation
+        self.x_slice = x_slice
+        self.y_slice = y_slice
+        self.mask = mask
+
+    @property
+    def is_empty(self):
+        return self.mask.size == 0 or not self.mask.any()
+
+    def get_index(self, normal_slice):
+        """
+        get the model index of the bounding box extended along the normal
+        """
+        x_axis, y_axis, normal_axis = ORIENTATIONS[self.orientation]
+        index = [None, None, None]
+        index[x_axis] = self.x_slice
+        index[y_axis] = self.y_slice
+        index[normal_axis] = normal_slice
+        return tuple(index)
+
+    def get_mask(self, n_normal):
+        """
+        get the 3D mask in model axis order extended n_normal cells along
+        the normal axis
+        """
+        x_axis, y_axis, normal_axis = ORIENTATIONS[self.orientation]
+        mask = self.mask if x_axis < y_axis else self.mask.T
+        mask = np.expand_dims(mask, normal_axis)
+        shape = list(mask.shape)
+        shape[normal_axis] = n_normal
+        return np.broadcast_to(mask, shape)
+
+
+# =============================================================================
+# Painter
+# =============================================================================
+
+
+class ModelPainter:
+    """
+    Build selections on model slices and paint them into a model.
+
+    Grid nodes should be in the same units as the plot coordinates.
+
+    :param grid_east: east nodes
+    :type grid_east: np.ndarray
+    :param grid_north: north nodes
+    :type grid_north: np.ndarray
+    :param grid_z: depth nodes
+    :type grid_z: np.ndarray
+    :param cell_mask: cells that should not be painted
+    :type cell_mask: :class:`mtpy_gui.modeling.model_mask.ModelCellMask`
+    :param log_space: painted models are log10 resistivity, values and
+     factors are still given in linear resistivity
+    :type log_space: bool
+
+    """
+
+    def __init__(
+        self, grid_east, grid_north, grid_z, cell_mask=None, log_space=False
+    ):
+        self.cell_mask = cell_mask
+        self.log_space = log_space
+        nodes = [
+            np.asarray(grid_north),
+            np.asarray(grid_east),
+            np.asarray(grid_z),
+        ]
+        self.centers = [(nn[:-1] + nn[1:]) / 2.0 for nn in nodes]
+
+    def _axis_centers(self, orientation):
+        x_axis, y_axis, normal_axis = ORIENTATIONS[orientation]
+        return self.centers[x_axis], self.centers[y_axis]
+
+    @staticmethod
+    def _center_slice(centers, vmin, vmax):
+        """
+        slice of cells with centers between vmin and vmax
+        """
+        return slice(
+            int(np.searchsorted(centers, vmin, side="left")),
+            int(np.searchsorted(centers, vmax, side="right")),
+        )
+
+    def box_selection(self, orientation, x_index, y_index):
+        """
+        select cells given by index arrays along the plot x and y axes
+
+        :param orientation: one of 'map', 'east', 'north'
+        :type orientation: string
+        :param x_index: cell indices along the plot x axis
+        :type x_index: np.ndarray of int
+        :param y_index: cell indices along the plot y axis
+        :type y_index: np.ndarray of int
+        :return: selection
+        :rtype: :class:`Selection`
+
+        """
+        x_c, y_c = self._axis_centers(orientation)
+        x_index = np.asarray(x_index, dtype=int)
+        y_index = np.asarray(y_index, dtype=int)
+        x_index = x_index[(x_index >= 0) & (x_index < x_c.size)]
+        y_index = y_index[(y_index >= 0) & (y_index < y_c.size)]
+        if x_index.size == 0 or y_index.size == 0:
+            return Selection(
+                orientation, slice(0, 0), slice(0, 0), np.zeros((0, 0), bool)
+            )
+
+        x0, y0 = x_index.min(), y_index.min()
+        x_slice = slice(int(x0), int(x_index.max()) + 1)
+        y_slice = slice(int(y0), int(y_index.max()) + 1)
+        mask = np.zeros(
+            (x_slice.stop - x_slice.start, y_slice.stop - y_slice.start), bool
+        )
+        mask[np.ix_(x_index - x0, y_index - y0)] = True
+        return Selection(orientation, x_slice, y_slice, mask)
+
+    def polygon_selection(self, orientation, vertices):
+        """
+        select cells with centers inside a polygon, used for polygon and
+        lasso selections.
+
+        :param orientation: one of 'map', 'east', 'north'
+        :type orientation: string
+        :param vertices: (x, y) vertices of the polygon in plot coordinates
+        :type vertices: list of tuples
+        :return: selection
+        :rtype: :class:`Selection`
+
+        """
+        vertices = np.asarray(vertices, dtype=float)
+        x_c, y_c = self._axis_centers(orientation)
+        x_slice = self._center_slice(
+            x_c, vertices[:, 0].min(), vertices[:, 0].max()
+        )
+        y_slice = self._center_slice(
+            y_c, vertices[:, 1].min(), vertices[:, 1].max()
+        )
+        xx, yy = np.meshgrid(x_c[x_slice], y_c[y_slice], indexing="ij")
+        points = np.column_stack((xx.ravel(), yy.ravel()))
+        if points.size == 0:
+            mask = np.zeros(xx.shape, bool)
+        else:
+            mask = Path(vertices).contains_points(points).reshape(xx.shape)
+        return Selection(orientation, x_slice, y_slice, mask)
+
+    def circle_selection(self, orientation, center, radius):
+        """
+        select cells with centers within radius of center, extend through
+        depth to make a cylinder.
+
+        :param orientation: one of 'map', 'east', 'north'
+        :type orientation: string
+        :param center: (x, y) center in plot coordinates
+        :type center: tuple
+        :param radius: radius in plot coordinates
+        :type radius: float
+        :return: selection
+        :rtype: :class:`Selection`
+
+        """
+        x_c, y_c = self._axis_centers(orientation)
+        x_slice = self._center_slice(
+            x_c, center[0] - radius, center[0] + radius
+        )
+        y_slice = self._center_slice(
+            y_c, center[1] - radius, center[1] + radius
+        )
+        dx = x_c[x_slice] - center[0]
+        dy = y_c[y_slice] - center[1]
+        mask = (dx[:, None] ** 2 + dy[None, :] ** 2) <= radius**2
+        return Selection(orientation, x_slice, y_slice, mask)
+
+    def paint(
+        self, res_model, selection, normal_slice, value=None, factor=None
+    ):
+        """
+        Set the selected cells to value or multiply them by factor in one
+        assignment.  Cells in cell_mask are left alone.
+
+        :param res_model: model to paint, edited in place
+        :type res_model: np.ndarray (n_north, n_east, n_z)
+        :param selection: 2D selection to paint
+        :type selection: :class:`Selection`
+        :param normal_slice: cells along the normal axis to extend through
+        :type normal_slice: slice
+        :param value: value to set
+        :type value: float
+        :param factor: multiplicative scale factor
+        :type factor: float
+        :return: index of the region that was edited, None if nothing was
+        :rtype: tuple
+
+        """
+        if selection.is_empty:
+            return None
+        normal_axis = ORIENTATIONS[selection.orientation][2]
+        start, stop, _ = normal_slice.indices(res_model.shape[normal_axis])
+        normal_slice = slice(start, max(start, stop))
+
+        index = selection.get_index(normal_slice)
+        n_normal = normal_slice.stop - normal_slice.start
+        return self.paint_mask(
+            res_model,
+            index,
+            selection.get_mask(n_normal),
+            value=value,
+            factor=factor,
+        )
+
+    def paint_mask(self, res_model, index, mask, value=None, factor=None):
+        """
+        Set or scale the cells in mask within the region index of the model.
+        Cells in cell_mask are left alone.
+
+        :param res_model: model to paint, edited in place
+        :type res_model: np.ndarray (n_north, n_east, n_z)
+        :param index: region of the model made of slices
+        :type index: tuple
+        :param mask: cells to paint with the same shape as res_model[index]
+        :type mask: np.ndarray of bool
+        :return: index, None if nothing was painted
+        :rtype: tuple
+
+        """
+        region = res_model[index]
+        if self.cell_mask is not None:
+            mask = mask & self.cell_mask.editable(index)
+        if not mask.any():
+            return None
+
+        if self.log_space:
+            if factor is not None:
+                region[mask] += np.log10(factor)
+            else:
+                region[mask] = np.log10(value)
+        elif factor is not None:
+            region[mask] *= factor
+        else:
+            region[mask] = value
+        return index
+
+
+# =============================================================================
+# Region grow
+# =============================================================================
+
+
+class RegionGrow:
+    """
+    Find the connected region of cells with a log10 resistivity within a
+    tolerance of a seed cell.
+
+    The cells within tolerance are labelled with :func:`scipy.ndimage.label`
+    and the labels are cached by seed value and tolerance, so other seeds
+    with the same value or going back to a tolerance are fast.  Call
+    :meth:`reset` when the model changes.
+
+    :param cell_mask: cells that are never part of a region
+    :type cell_mask: :class:`mtpy_gui.modeling.model_mask.ModelCellMask`
+    :param cache_size: number of labellings to keep
+    :type cache_size: int
+    :param log_space: models are already log10 resistivity
+    :type log_space: bool
+
+    """
+
+    def __init__(self, cell_mask=None, cache_size=4, log_space=False):
+        self.cell_mask = cell_mask
+        self.cache_size = cache_size
+        self.log_space = log_space
+        self._log_res = None
+        self._labels = OrderedDict()
+
+    def reset(self):
+        """
+        clear the cached labels, call after the model is edited
+        """
+        self._log_res = None
+        self._labels.clear()
+
+    def _get_log_res(self, res_model, index):
+        if self.log_space:
+            return res_model[index]
+        if index == (slice(None),) * 3:
+            if self._log_res is None:
+                self._log_res = np.log10(res_model)
+            return self._log_res
+        if self._log_res is not None:
+            return self._log_res[index]
+        return np.log10(res_model[index])
+
+    def _get_labels(self, res_model, index, center, tolerance):
+        """
+        label the cells of res_model[index] within tolerance of center
+        """
+        key = (
+            tuple(None if isinstance(ii, slice) else ii for ii in index),
+            round(float(center), 6),
+            float(tolerance),
+        )
+        if key in self._labels:
+            self._labels.move_to_end(key)
+            return self._labels[key]
+
+        log_res = self._get_log_res(res_model, index)
+        mask = np.abs(log_res - center) <= tolerance
+        if self.cell_mask is not None:
+            mask &= self.cell_mask.editable(index)
+        labels, n_labels = ndimage.label(mask)
+        objects = ndimage.find_objects(labels)
+
+        self._labels[key] = (labels, objects)
+        if len(self._labels) > self.cache_size:
+            self._labels.popitem(last=False)
+        return labels, objects
+
+    def get_region(self, res_model, seed, tolerance, orientation=None):
+        """
+        Get the connected region around a seed cell.
+
+        :param res_model: resistivity model
+        :type res_model: np.ndarray (n_north, n_east, n_z)
+        :param seed: (north, east, z) index of the seed cell
+        :type seed: tuple
+        :param tolerance: tolerance in log10 resistivity
+        :type tolerance: float
+        :param orientation: one of 'map', 'east', 'north' to grow only in
+         the slice through the seed, None to grow in 3D
+        :type orientation: string
+        :return: index of the bounding box of the region made of slices and
+         the mask of the region in the bounding box, None if the seed
+         cannot be edited
+        :rtype: tuple, np.ndarray of bool
+
+        """
+        seed = tuple(int(ii) for ii in seed)
+        index = [slice(None)] * 3
+        if orientation is not None:
+            normal_axis = ORIENTATIONS[orientation][2]
+            index[normal_axis] = seed[normal_axis]
+        index = tuple(index)
+
+        center = res_model[seed]
+        if not self.log_space:
+            center = np.log10(center)
+        labels, objects = self._get_labels(res_model, index, center, tolerance)
+        label_seed = tuple(
+            ss for ss, ii in zip(seed, index) if isinstance(ii, slice)
+        )
+        label = labels[label_seed]
+        if label == 0:
+            return None
+
+        bbox = list(objects[label - 1])
+        mask = labels[tuple(bbox)] == label
+        if orientation is not None:
+            bbox.insert(
+                normal_axis, slice(seed[normal_axis], seed[normal_axis] + 1)
+            )
+            mask = np.expand_dims(mask, normal_axis)
+        return tuple(bbox), mask
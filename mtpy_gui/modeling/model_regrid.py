@@ -0,0 +1,215 @@
+# -*- coding: utf-8 -*-
+"""
+Resample a resistivity model onto a different mesh.
+
+Interpolation is done on log10 resistivity, either trilinear between cell
+centers or nearest cell.  The index and weight of the source cells are
+computed once per axis and the target model is filled a block of depth
+layers at a time so memory stays bounded for large meshes.  Air cells are
+kept as air and never mixed into the values of subsurface cells.
+
+Both meshes have to be in the same coordinate system, i.e. relative to the
+same model center.
+
+Created on Mon Oct 19 2026
+
+:license: MIT
+
+"""
+
+# =============================================================================
+# Imports
+# =============================================================================
+import numpy as np
+
+# =============================================================================
+# Axis tables
+# =============================================================================
+
+
+def get_axis_table(source_nodes, target_nodes, method="linear"):
+    """
+    Get the source cell index and weight of each target cell along one axis.
+
+    A target cell value is (1 - weight) * source[index] +
+    weight * source[index + 1] for linear and source[index] for nearest,
+    where the positions are cell centers.  Target cells outside of the
+    source cell centers take the value of the edge cell.
+
+    :param source_nodes: nodes of the source mesh
+    :type source_nodes: np.ndarray (n_source + 1)
+    :param target_nodes: nodes of the target mesh
+    :type target_nodes: np.ndarray (n_target + 1)
+    :param method: 'linear' or 'nearest'
+    :type method: string
+    :return: index (n_target, 2) of the lower and upper source cells, and
+     weight (n_target) of the upper cell
+    :rtype: np.ndarray of int, np.ndarray of float
+
+    """
+    source_nodes = np.asarray(source_nodes, dtype=float)
+    target_nodes = np.asarray(target_nodes, dtype=float)
+    n_source = source_nodes.size - 1
+    target_centers = (target_nodes[:-1] + target_nodes[1:]) / 2.0
+
+    if method == "nearest":
+        lower = np.clip(
+            np.searchsorted(source_nodes, target_centers, side="right") - 1,
+            0,
+            n_source - 1,
+        )
+        return np.column_stack((lower, lower)), np.zeros(target_centers.size)
+
+    elif method != "linear":
+        raise ValueError(f"method must be 'linear' or 'nearest' not {method}")
+
+    source_centers = (source_nodes[:-1] + source_nodes[1:]) / 2.0
+    lower = np.clip(
+        np.searchsorted(source_centers, target_centers, side="right") - 1,
+        0,
+        max(n_source - 2, 0),
+    )
+    upper = np.minimum(lower + 1, n_source - 1)
+    span = source_centers[upper] - source_centers[lower]
+    with np.errstate(divide="ignore", invalid="ignore"):
+        weight = np.where(
+            span > 0, (target_centers - source_centers[lower]) / span, 0.0
+        )
+    return np.column_stack((lower, upper)), np.clip(weight, 0.0, 1.0)
+
+
+# =============================================================================
+# Regridder
+# =============================================================================
+
+
+class ModelRegridder:
+    """
+    Resample models from a source mesh onto a target mesh.
+
+    >>> regridder = ModelRegridder(
+    ...     source_obj.grid_east,
+    ...     source_obj.grid_north,
+    ...     source_obj.grid_z,
+    ...     target_obj.grid_east,
+    ...     target_obj.grid_north,
+    ...     target_obj.grid_z,
+    ... )
+    >>> target_obj.res_model = regridder.regrid(source_obj.res_model)
+
+    :param method: 'linear' for trilinear or 'nearest'
+    :type method: string
+    :param air_value: cells with resistivity above this value are air
+    :type air_value: float
+    :param air_res: resistivity given to air cells in the target model
+    :type air_res: float
+    :param chunk_size: approximate number of target cells to fill at once
+    :type chunk_size: int
+
+    """
+
+    def __init__(
+        self,
+        grid_east,
+        grid_north,
+        grid_z,
+        target_grid_east,
+        target_grid_north,
+        target_grid_z,
+        method="linear",
+        air_value=1e10,
+        air_res=1e12,
+        chunk_size=2**22,
+    ):
+        self.method = method
+        self.air_value = air_value
+        self.air_res = air_res
+        self.chunk_size = chunk_size
+
+        source = (grid_north, grid_east, grid_z)
+        target = (target_grid_north, target_grid_east, target_grid_z)
+        # (north, east, z) tables for interpolation
+        self.tables = [
+            get_axis_table(ss, tt, method) for ss, tt in zip(source, target)
+        ]
+        # nearest cell decides which target cells are air
+        self.nearest = [
+            get_axis_table(ss, tt, "nearest")[0][:, 0]
+            for ss, tt in zip(source, target)
+        ]
+        self.source_shape = tuple(np.asarray(ss).size - 1 for ss in source)
+        self.shape = tuple(np.asarray(tt).size - 1 for tt in target)
+
+    def _get_z_chunks(self):
+        n_layer = max(self.chunk_size // (self.shape[0] * self.shape[1]), 1)
+        for z0 in range(0, self.shape[2], n_layer):
+            yield slice(z0, min(z0 + n_layer, self.shape[2]))
+
+    def regrid(self, res_model):
+        """
+        Resample a resistivity model onto the target mesh.
+
+        :param res_model: resistivity model on the source mesh
+        :type res_model: np.ndarray (n_north, n_east, n_z)
+        :return: resistivity model on the target mesh
+        :rtype: np.ndarray
+
+        """
+        if res_model.shape != self.source_shape:
+            raise ValueError(
+                f"Model shape {res_model.shape} does not match source mesh "
+                f"{self.source_shape}"
+            )
+
+        (n_index, n_weight), (e_index, e_weight), (z_index, z_weight) = (
+            self.tables
+        )
+        n_near, e_near, z_near = self.nearest
+        n_weights = np.column_stack((1 - n_weight, n_weight))
+        e_weights = np.column_stack((1 - e_weight, e_weight))
+        z_weights = np.column_stack((1 - z_weight, z_weight))
+
+        new_res_model = np.empty(self.shape, dtype=float)
+        for z_slice in self._get_z_chunks():
+            # only read the source layers needed for this chunk
+            z_need = np.unique(
+                np.concatenate((z_index[z_slice].ravel(), z_near[z_slice]))
+            )
+            block = np.asarray(res_model[:, :, z_need], dtype=float)
+            block_air = block > self.air_value
+            with np.errstate(divide="ignore", invalid="ignore"):
+                block_log = np.where(block_air, 0.0, np.log10(block))
+            z_local = np.searchsorted(z_need, z_index[z_slice])
+
+            total = np.zeros(
+                (self.shape[0], self.shape[1], z_slice.stop - z_slice.start)
+            )
+            weight_sum = np.zeros_like(total)
+            for ii in range(2):
+                for jj in range(2):
+                    for kk in range(2):
+                        index = np.ix_(
+                            n_index[:, ii], e_index[:, jj], z_local[:, kk]
+                        )
+                        weight = (
+                            n_weights[:, ii, None, None]
+                            * e_weights[None, :, jj, None]
+                            * z_weights[z_slice, kk][None, None, :]
+                        ) * ~block_air[index]
+                        total += weight * block_log[index]
+                        weight_sum += weight
+
+            near_index = np.ix_(
+                n_near, e_near, np.searchsorted(z_need, z_near[z_slice])
+            )
+            with np.errstate(divide="ignore", invalid="ignore"):
+                chunk = np.where(
+                    weight_sum > 0,
+                    total / weight_sum,
+                    block_log[near_index],
+                )
+            chunk = 10**chunk
+            chunk[block_air[near_index]] = self.air_res
+            new_res_model[:, :, z_slice] = chunk
+
+        return new_res_model
@@ -0,0 +1,222 @@
+# -*- coding: utf-8 -*-
+"""
+Per-layer histograms of log10 resistivity.
+
+The bin of every cell is kept in a small integer array next to bin counts
+for each depth layer.  After an edit only the cells in the edited region
+are binned again and the counts of the layers they are in are updated
+from the change, so statistics stay current while painting without
+scanning the whole model.  Percentiles are interpolated from the
+cumulative counts.
+
+Created on Mon Oct 19 2026
+
+:license: MIT
+
+"""
+
+# =============================================================================
+# Imports
+# =============================================================================
+import numpy as np
+
+# =============================================================================
+# Percentiles
+# =============================================================================
+
+
+def get_percentiles(counts, bin_edges, q=(5, 50, 95)):
+    """
+    Get percentiles from a histogram, interpolating linearly within a bin.
+
+    :param counts: number of values in each bin
+    :type counts: np.ndarray (n_bins)
+    :param bin_edges: edges of the bins
+    :type bin_edges: np.ndarray (n_bins + 1)
+    :param q: percentiles to get in [0, 100]
+    :type q: sequence of float
+    :return: percentiles, NaN if the histogram is empty
+    :rtype: np.ndarray
+
+    """
+    q = np.asarray(q, dtype=float)
+    total = counts.sum()
+    if total == 0:
+        return np.full(q.shape, np.nan)
+    cumulative = np.concatenate(([0], np.cumsum(counts))) / total
+    # cumulative is flat over empty bins, take the first edge it reaches q
+    index = np.clip(
+        np.searchsorted(cumulative, q / 100.0, side="left"),
+        1,
+        counts.size,
+    )
+    low = cumulative[index - 1]
+    span = cumulative[index] - low
+    with np.errstate(divide="ignore", invalid="ignore"):
+        fraction = np.where(span > 0, (q / 100.0 - low) / span, 0.0)
+    return (
+        bin_edges[index - 1]
+        + np.clip(fraction, 0, 1) * np.diff(bin_edges)[index - 1]
+    )
+
+
+# =============================================================================
+# Layer histogram
+# =============================================================================
+
+
+class LayerHistogram:
+    """
+    Histograms of log10 resistivity for each depth layer of a model.
+
+    Values outside of log_range are counted in the first or last bin,
+    air cells are not counted.
+
+    :param res_model: resistivity model
+    :type res_model: np.ndarray (n_north, n_east, n_z)
+    :param log_range: (min, max) log10 resistivity of the bins
+    :type log_range: tuple
+    :param n_bins: number of bins, at most 254
+    :type n_bins: int
+    :param air_value: cells above this value are air
+    :type air_value: float
+    :param log_space: models are already log10 resistivity
+    :type log_space: bool
+
+    """
+
+    def __init__(
+        self,
+        res_model,
+        log_range=(-2, 6),
+        n_bins=160,
+        air_value=1e10,
+        log_space=False,
+    ):
+        if n_bins > 254:
+            raise ValueError(f"n_bins must be 254 or less not {n_bins}")
+        self.log_range = log_range
+        self.n_bins = n_bins
+        self.air_value = air_value
+        self.log_space = log_space
+        self.bin_edges = np.linspace(log_range[0], log_range[1], n_bins + 1)
+        self.air_bin = n_bins
+
+        self._bin_index = None
+        # (n_z, n_bins + 1) the last column counts air cells
+        self._counts = None
+        self.reset(res_model)
+
+    @property
+    def counts(self):
+        """
+        bin counts (n_z, n_bins)
+        """
+        return self._counts[:, : self.n_bins]
+
+    @property
+    def bin_centers(self):
+        return (self.bin_edges[:-1] + self.bin_edges[1:]) / 2.0
+
+    def _get_bins(self, res):
+        """
+        bin index of each value, air cells get air_bin
+        """
+        res = np.asarray(res, dtype=float)
+        width = (self.log_range[1] - self.log_range[0]) / self.n_bins
+        if self.log_space:
+            log_res = res
+        else:
+            with np.errstate(divide="ignore", invalid="ignore"):
+                log_res = np.log10(res)
+        with np.errstate(invalid="ignore"):
+            bins = np.floor((log_res - self.log_range[0]) / width)
+        bins = np.clip(np.nan_to_num(bins, nan=0), 0, self.n_bins - 1)
+        bins = bins.astype(np.uint8)
+        bins[log_res > np.log10(self.air_value)] = self.air_bin
+        return bins
+
+    def _count_layers(self, bins):
+        """
+        counts (n_z, n_bins + 1) of a block of bins with z as the last axis
+        """
+        n_z = bins.shape[2]
+        layer = np.broadcast_to(np.arange(n_z), bins.shape)
+        return np.bincount(
+            (layer * (self.n_bins + 1) + bins).ravel(),
+            minlength=n_z * (self.n_bins + 1),
+        ).reshape(n_z, self.n_bins + 1)
+
+    def reset(self, res_model):
+        """
+        bin the whole model a layer at a time
+        """
+        self._bin_index = np.empty(res_model.shape, dtype=np.uint8)
+        self._counts = np.zeros(
+            (res_model.shape[2], self.n_bins + 1), dtype=np.int64
+        )
+        for zz in range(res_model.shape[2]):
+            bins = self._get_bins(res_model[:, :, zz])
+            self._bin_index[:, :, zz] = bins
+            self._counts[zz] = np.bincount(
+                bins.ravel(), minlength=self.n_bins + 1
+            )
+
+    def update(self, res_model, index=None):
+        """
+        Update the counts after the region index of the model was edited.
+        Only cells that changed bin are counted.
+
+        :param res_model: edited model
+        :type res_model: np.ndarray (n_north, n_east, n_z)
+        :param index: edited region made of slices, None for the whole model
+        :type index: tuple
+        :return: index of the layers whose counts changed
+        :rtype: np.ndarray
+
+        """
+        if index is None or res_model.shape != self._bin_index.shape:
+            self.reset(res_model)
+            return np.arange(res_model.shape[2])
+
+        index = tuple(
+            slice(ii, ii + 1) if isinstance(ii, (int, np.integer)) else ii
+            for ii in index
+        )
+        new_bins = self._get_bins(res_model[index])
+        old_bins = self._bin_index[index]
+        changed = new_bins != old_bins
+        if not changed.any():
+            return np.array([], dtype=int)
+
+        # only count the layers with changes
+        layers = np.nonzero(changed.any(axis=(0, 1)))[0]
+        delta = self._count_layers(new_bins[:, :, layers]) - self._count_layers(
+            old_bins[:, :, layers]
+        )
+        z_start = index[2].indices(res_model.shape[2])[0]
+        self._counts[z_start + layers] += delta
+        self._bin_index[index] = new_bins
+        return z_start + layers
+
+    def get_histogram(self, z_index):
+        """
+        bin counts of a layer or the sum over a slice of layers
+        """
+        counts = self.counts[z_index]
+        if counts.ndim > 1:
+            counts = counts.sum(axis=0)
+        return counts
+
+    def get_region_histogram(self, index, mask):
+        """
+        bin counts of the cells in mask within the region index
+        """
+        bins = self._bin_index[index][mask]
+        return np.bincount(bins, minlength=self.n_bins + 1)[: self.n_bins]
+
+    def get_percentiles(self, z_index, q=(5, 50, 95)):
+        """
+        percentiles of log10 resistivity of a layer or slice of layers
+        """
+        return get_percentiles(self.get_histogram(z_index), self.bin_edges, q)
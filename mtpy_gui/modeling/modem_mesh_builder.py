@@ -13,10 +13,18 @@ from matplotlib.backends.backend_qt4agg import FigureCanvasQTAgg as FigureCanvas
 from matplotlib.backends.backend_qt4agg import NavigationToolbar2QT as NavigationToolbar
 from matplotlib.figure import Figure
 import matplotlib.gridspec as gridspec
+from matplotlib.collections import LineCollection
 import numpy as np
 import matplotlib.pyplot as plt
 import os
 
+from mtpy_gui.modeling.grid_lines import get_grid_segments, get_picked_vertices
+from mtpy_gui.modeling.data_store import (
+    get_data_store,
+    read_modem_data,
+    read_modem_model,
+)
+
 # import mtpy.analysis.pt as mtpt
 # import mtpy.utils.exceptions as mtex
 # from matplotlib.colors import Normalize
@@ -102,8 +110,7 @@ class ModEM_Mesh_Window(QtGui.QMainWindow):
             )
         )
 
-        self.mesh_widget.modem_data = mtpy.modeling.modem.Data()
-        self.mesh_widget.modem_data.read_data_file(fn)
+        self.mesh_widget.modem_data = get_data_store().get(fn, read_modem_data)
         self.mesh_widget.modem_data_fn = fn
 
         self.mesh_widget.dir_path = os.path.dirname(fn)
@@ -118,8 +125,11 @@ class ModEM_Mesh_Window(QtGui.QMainWindow):
             fn_dialog.getOpenFileName(caption="Choose ModEM model file", filter="*.rho")
         )
 
-        self.mesh_widget.model_obj = mtpy.modeling.modem.Model()
-        self.mesh_widget.model_obj.read_model_file(fn)
+        # the mesh is edited so work on a copy of the shared model
+        data_store = get_data_store()
+        self.mesh_widget.model_obj = data_store.copy(
+            data_store.get(fn, read_modem_model)
+        )
 
         self.mesh_widget.dir_path = os.path.dirname(fn)
 
@@ -343,8 +353,7 @@ class MeshWidget(QtGui.QWidget):
             )
         )
 
-        self.modem_data = mtpy.modeling.modem.Data()
-        self.modem_data.read_data_file(fn)
+        self.modem_data = get_data_store().get(fn, read_modem_data)
         self.modem_data_fn = fn
 
         self.dir_path = os.path.dirname(fn)
@@ -375,8 +384,9 @@ class MeshWidget(QtGui.QWidget):
             fn_dialog.getOpenFileName(caption="Choose ModEM model file", filter="*.rho")
         )
 
-        self.model_obj = mtpy.modeling.modem.Model()
-        self.model_obj.read_model_file(fn)
+        # the mesh is edited so work on a copy of the shared model
+        data_store = get_data_store()
+        self.model_obj = data_store.copy(data_store.get(fn, read_modem_model))
 
         self.dir_path = os.path.dirname(fn)
 
@@ -717,50 +727,21 @@ class MeshPlot(QtGui.QWidget):
             picker=3,
         )
 
-        # plot vertical lines
-        east_line_xlist = []
-        east_line_ylist = []
-        north_min = self.plot_grid_north.min()
-        north_max = self.plot_grid_north.max()
-        for xx in self.plot_grid_east:
-            east_line_xlist.extend(
-                [xx * cos_ang + north_min * sin_ang, xx * cos_ang + north_max * sin_ang]
-            )
-            east_line_xlist.append(None)
-            east_line_ylist.extend(
-                [
-                    -xx * sin_ang + north_min * cos_ang,
-                    -xx * sin_ang + north_max * cos_ang,
-                ]
-            )
-            east_line_ylist.append(None)
-        self.ax_map.plot(
-            east_line_xlist,
-            east_line_ylist,
-            lw=self.line_width,
-            color=self.line_color,
-            picker=3,
+        # plot grid lines, rotate the segments into the mesh orientation
+        segments = np.array(
+            get_grid_segments(self.plot_grid_east, self.plot_grid_north)
         )
-
-        north_line_xlist = []
-        north_line_ylist = []
-        east_max = self.plot_grid_east.max()
-        east_min = self.plot_grid_east.min()
-        for yy in self.plot_grid_north:
-            north_line_xlist.extend(
-                [east_min * cos_ang + yy * sin_ang, east_max * cos_ang + yy * sin_ang]
-            )
-            north_line_xlist.append(None)
-            north_line_ylist.extend(
-                [-east_min * sin_ang + yy * cos_ang, -east_max * sin_ang + yy * cos_ang]
+        segments[:, :, 0], segments[:, :, 1] = (
+            segments[:, :, 0] * cos_ang + segments[:, :, 1] * sin_ang,
+            -segments[:, :, 0] * sin_ang + segments[:, :, 1] * cos_ang,
+        )
+        self.ax_map.add_collection(
+            LineCollection(
+                segments,
+                lw=self.line_width,
+                color=self.line_color,
+                picker=3,
             )
-            north_line_ylist.append(None)
-        self.ax_map.plot(
-            north_line_xlist,
-            north_line_ylist,
-            lw=self.line_width,
-            color=self.line_color,
-            picker=3,
         )
 
         if east_limits == None:
@@ -782,36 +763,17 @@ class MeshPlot(QtGui.QWidget):
         self.ax_depth = self.figure.add_subplot(gs[1], aspect="auto")
 
         # plot the grid
-        east_line_xlist = []
-        east_line_ylist = []
-        for xx in self.plot_grid_east:
-            east_line_xlist.extend([xx, xx])
-            east_line_xlist.append(None)
-            east_line_ylist.extend([0, self.plot_grid_z.max()])
-            east_line_ylist.append(None)
-
-        self.ax_depth.plot(
-            east_line_xlist,
-            east_line_ylist,
-            lw=self.line_width,
-            color=self.line_color,
-            picker=5,
-        )
-
-        z_line_xlist = []
-        z_line_ylist = []
-        for zz in self.plot_grid_z:
-            z_line_xlist.extend([self.plot_grid_east.min(), self.plot_grid_east.max()])
-            z_line_xlist.append(None)
-            z_line_ylist.extend([zz, zz])
-            z_line_ylist.append(None)
-
-        self.ax_depth.plot(
-            z_line_xlist,
-            z_line_ylist,
-            lw=self.line_width,
-            color=self.line_color,
-            picker=3,
+        self.ax_depth.add_collection(
+            LineCollection(
+                get_grid_segments(
+                    self.plot_grid_east,
+                    self.plot_grid_z,
+                    y_limits=(0, self.plot_grid_z.max()),
+                ),
+                lw=self.line_width,
+                color=self.line_color,
+                picker=3,
+            )
         )
 
         # --> plot stations
@@ -894,9 +856,9 @@ class MeshPlot(QtGui.QWidget):
                 )
 
             elif self.line_mode == "del_h" and self._ax == self.ax_map:
-                data_point = event.artist
-                east = data_point.get_xdata()[event.ind] * 1000.0
-                north = data_point.get_ydata()[event.ind] * 1000.0
+                east, north = get_picked_vertices(event)
+                east *= 1000.0
+                north *= 1000.0
 
                 new_ii = np.where(self.model_obj.grid_east != east)
                 self.model_obj.grid_east = self.model_obj.grid_east[new_ii]
@@ -909,9 +871,9 @@ class MeshPlot(QtGui.QWidget):
                 )
 
             elif self.line_mode == "del_v" and self._ax == self.ax_depth:
-                data_point = event.artist
-                east = data_point.get_xdata()[event.ind] * 1000.0
-                depth = data_point.get_ydata()[event.ind] * 1000.0
+                east, depth = get_picked_vertices(event)
+                east *= 1000.0
+                depth *= 1000.0
 
                 new_ii = np.where(self.model_obj.grid_z != depth)
                 self.model_obj.grid_z = self.model_obj.grid_z[new_ii]
@@ -924,9 +886,9 @@ class MeshPlot(QtGui.QWidget):
                 )
 
             elif self.line_mode == "del_v" and self._ax == self.ax_map:
-                data_point = event.artist
-                east = data_point.get_xdata()[event.ind] * 1000.0
-                north = data_point.get_ydata()[event.ind] * 1000.0
+                east, north = get_picked_vertices(event)
+                east *= 1000.0
+                north *= 1000.0
 
                 new_ii = np.where(self.model_obj.grid_north != north)
                 self.model_obj.grid_north = self.model_obj.grid_north[new_ii]
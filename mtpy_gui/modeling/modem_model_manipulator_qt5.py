@@ -10,7 +10,10 @@ Created on Fri Sep 02 12:20:42 2016
 # Imports
 # ==============================================================================
 from pathlib import Path
+import os
 import sys
+import copy
+import tempfile
 
 # from PyQt5 import QtCore, QtWidgets
 try:
@@ -26,6 +29,7 @@ from matplotlib.backends.backend_qt5agg import (
     NavigationToolbar2QT as NavigationToolbar,
 )
 import matplotlib.widgets as widgets
+from matplotlib.colors import ListedColormap
 from matplotlib.figure import Figure
 
 import numpy as np
@@ -40,8 +44,22 @@ except ModuleNotFoundError:
 
 from pyproj import CRS
 
-from mtpy import MTData
-from mtpy.modeling import StructuredGrid3D
+from mtpy_gui.modeling.model_mask import ModelCellMask
+from mtpy_gui.modeling.model_paint import (
+    ORIENTATIONS,
+    ModelPainter,
+    RegionGrow,
+)
+from mtpy_gui.modeling.lod_mesh import LODMesh
+from mtpy_gui.modeling.model_cache import ModEMModelCache
+from mtpy_gui.modeling.data_store import get_data_store, read_mt_data
+from mtpy_gui.modeling.station_index import StationIndex, StationLabels
+from mtpy_gui.modeling.basemap import TileCache, Basemap
+from mtpy_gui.modeling.grid_lines import make_grid_lines, add_grid_lines
+from mtpy_gui.modeling.model_regrid import ModelRegridder
+from mtpy_gui.modeling.model_compare import SLICES, ModelDifference
+from mtpy_gui.modeling.model_stats import LayerHistogram, get_percentiles
+from mtpy_gui.modeling.slice_cache import SliceCache
 
 
 # ==============================================================================
@@ -56,6 +74,8 @@ class ModEM_Model_Manipulator(QtWidgets.QMainWindow):
         super(ModEM_Model_Manipulator, self).__init__()
 
         self.model_widget = ModelWidget()
+        self.save_thread = None
+        self.seed_thread = None
 
         self.ui_setup()
 
@@ -79,17 +99,84 @@ class ModEM_Model_Manipulator(QtWidgets.QMainWindow):
         self.menu_model_save_action = self.menu_model_file.addAction("Save")
         self.menu_model_save_action.triggered.connect(self.save_model_fn)
 
+        self.menu_model_compare_action = self.menu_model_file.addAction(
+            "Open Comparison Model"
+        )
+        self.menu_model_compare_action.triggered.connect(self.get_compare_fn)
+        self.menu_model_export_diff_action = self.menu_model_file.addAction(
+            "Export Difference"
+        )
+        self.menu_model_export_diff_action.triggered.connect(
+            self.export_difference
+        )
+
+        # also write a binary copy next to the saved model to reopen fast
+        self.menu_model_binary_action = self.menu_model_file.addAction(
+            "Save Binary Copy"
+        )
+        self.menu_model_binary_action.setCheckable(True)
+        self.menu_model_binary_action.setChecked(
+            self.model_widget.use_model_cache
+        )
+
+        # -------------- STATUS BAR -------------------------------
+        self.save_progress = QtWidgets.QProgressBar()
+        self.save_progress.setRange(0, 100)
+        self.save_progress.setMaximumWidth(200)
+        self.save_progress.hide()
+        self.statusBar().addPermanentWidget(self.save_progress)
+
+        # -------------- STATISTICS DOCK --------------------------
+        self.stats_widget = ModelStats()
+        self.stats_dock = QtWidgets.QDockWidget("Layer Statistics", self)
+        self.stats_dock.setWidget(self.stats_widget)
+        self.addDockWidget(QtCore.Qt.RightDockWidgetArea, self.stats_dock)
+        self.stats_dock.hide()
+        self.stats_dock.visibilityChanged.connect(self.update_stats)
+        self.model_widget.stats_changed.connect(self.update_stats)
+
         self.menu_properties = self.menuBar().addMenu("Properties")
         self.menu_properties_cb_action = self.menu_properties.addAction(
             "Resistivity Limits"
         )
         self.menu_properties_cb_action.triggered.connect(self.set_res_limits)
+        self.menu_properties_diff_action = self.menu_properties.addAction(
+            "Difference Limits"
+        )
+        self.menu_properties_diff_action.triggered.connect(
+            self.set_difference_limits
+        )
 
         self.menu_tools = self.menuBar().addMenu("Tools")
         self.menu_tools_pad_action = self.menu_tools.addAction("Pad Fill")
         self.menu_tools_pad_action.triggered.connect(self.pad_fill)
         self.menu_tools_smooth_action = self.menu_tools.addAction("Smooth")
         self.menu_tools_smooth_action.triggered.connect(self.smooth)
+        self.menu_tools_seed_action = self.menu_tools.addAction(
+            "Seed Basemap Tiles"
+        )
+        self.menu_tools_seed_action.triggered.connect(self.seed_basemap)
+        self.menu_tools_regrid_action = self.menu_tools.addAction(
+            "Regrid To Mesh"
+        )
+        self.menu_tools_regrid_action.triggered.connect(self.regrid_model)
+        self.menu_tools.addAction(self.stats_dock.toggleViewAction())
+
+        self.menu_properties_tiles_action = self.menu_properties.addAction(
+            "Basemap Tile Directory"
+        )
+        self.menu_properties_tiles_action.triggered.connect(
+            self.set_tile_directory
+        )
+        # keep the working model as float32 log10 resistivity
+        self.menu_properties_log_action = self.menu_properties.addAction(
+            "Log10 Working Model"
+        )
+        self.menu_properties_log_action.setCheckable(True)
+        self.menu_properties_log_action.setChecked(self.model_widget.log_space)
+        self.menu_properties_log_action.toggled.connect(
+            self.model_widget.set_log_space
+        )
 
         QtCore.QMetaObject.connectSlotsByName(self)
 
@@ -122,24 +209,169 @@ class ModEM_Model_Manipulator(QtWidgets.QMainWindow):
 
         self.model_widget.model_fn = fn
 
+    def get_compare_fn(self):
+        """
+        read in a model on the same mesh to compare against
+        """
+
+        fn_dialog = QtWidgets.QFileDialog()
+        fn = str(
+            fn_dialog.getOpenFileName(
+                caption="Choose ModEM model file to compare", filter="*.rho"
+            )[0]
+        )
+        if fn:
+            self.model_widget.set_compare_fn(fn)
+
+    def export_difference(self):
+        """
+        save the log10 ratio of the edited and comparison models
+        """
+
+        fn_dialog = QtWidgets.QFileDialog()
+        fn = str(
+            fn_dialog.getSaveFileName(
+                caption="Save model difference", filter="*.npy"
+            )[0]
+        )
+        if fn:
+            self.model_widget.export_difference(fn)
+
     def save_model_fn(self):
         """
         save the current mesh settings to a file
         """
 
         fn_dialog = QtWidgets.QFileDialog()
-        save_fn = Path(
-            str(
-                fn_dialog.getSaveFileName(
-                    caption="Choose ModEM model file", filter="*.rho"
-                )[0]
-            )
+        if self.save_thread is not None and self.save_thread.isRunning():
+            print("Still saving the previous model, try again when it is done")
+            return
+
+        save_fn = str(
+            fn_dialog.getSaveFileName(
+                caption="Choose ModEM model file", filter="*.rho"
+            )[0]
+        )
+        if not save_fn:
+            return
+
+        self.start_save(
+            self.model_widget.model_obj,
+            self.model_widget.new_res_model,
+            save_fn,
+            log_space=self.model_widget.log_space,
         )
 
-        self.model_widget.model_obj.to_modem(
-            model_fn=save_fn,
-            res_model=self.model_widget.new_res_model,
+    def start_save(self, model_obj, res_model, save_fn, log_space=False):
+        """
+        save a model in a worker thread
+        """
+        # the model is written from a snapshot so editing can continue
+        self.save_thread = ModelSaveThread(
+            model_obj,
+            res_model,
+            Path(save_fn),
+            write_binary=self.menu_model_binary_action.isChecked(),
+            log_space=log_space,
         )
+        self.save_thread.progress.connect(self.update_save_progress)
+        self.save_thread.save_finished.connect(self.save_finished)
+        self.save_thread.save_failed.connect(self.save_failed)
+
+        self.menu_model_save_action.setEnabled(False)
+        self.save_progress.setValue(0)
+        self.save_progress.show()
+        self.save_thread.start()
+
+    def regrid_model(self):
+        """
+        resample the edited model onto the mesh of another model file and
+        save it
+        """
+        if self.model_widget.model_obj is None:
+            print("Need to open a model file before regridding")
+            return
+        if self.save_thread is not None and self.save_thread.isRunning():
+            print("Still saving the previous model, try again when it is done")
+            return
+
+        fn_dialog = QtWidgets.QFileDialog()
+        mesh_fn = str(
+            fn_dialog.getOpenFileName(
+                caption="Choose ModEM model file with the new mesh",
+                filter="*.rho",
+            )[0]
+        )
+        if not mesh_fn:
+            return
+
+        method, ok = QtWidgets.QInputDialog.getItem(
+            self,
+            "Regrid To Mesh",
+            "Interpolation",
+            ["linear", "nearest"],
+            0,
+            False,
+        )
+        if not ok:
+            return
+
+        save_fn = str(
+            fn_dialog.getSaveFileName(
+                caption="Save regridded ModEM model file", filter="*.rho"
+            )[0]
+        )
+        if not save_fn:
+            return
+
+        target_obj = ModEMModelCache(mesh_fn).read_model(
+            use_cache=self.model_widget.use_model_cache
+        )
+        try:
+            res_model = self.model_widget.regrid_model(target_obj, method)
+        except ValueError as error:
+            print(f"Could not regrid model because {error}")
+            return
+        self.start_save(target_obj, res_model, save_fn)
+
+    def update_save_progress(self, value, message):
+        self.save_progress.setValue(value)
+        self.statusBar().showMessage(message)
+
+    def save_finished(self, save_fn):
+        self.menu_model_save_action.setEnabled(True)
+        self.save_progress.hide()
+        self.statusBar().showMessage(f"Saved model to {save_fn}", 5000)
+        print(f"Saved model to {save_fn}")
+
+    def save_failed(self, message):
+        self.menu_model_save_action.setEnabled(True)
+        self.save_progress.hide()
+        self.statusBar().showMessage(message, 5000)
+        print(message)
+
+    def update_stats(self):
+        """
+        update the statistics dock if it is showing
+        """
+        if not self.stats_dock.isVisible():
+            return
+        stats = self.model_widget.get_layer_stats()
+        if stats is not None:
+            self.stats_widget.plot(**stats)
+
+    def closeEvent(self, event):
+        """
+        wait for a model that is being saved before closing
+        """
+        if self.save_thread is not None and self.save_thread.isRunning():
+            self.save_thread.wait()
+        if self.seed_thread is not None and self.seed_thread.isRunning():
+            self.seed_thread.requestInterruption()
+            self.seed_thread.wait()
+        if self.model_widget.slice_cache is not None:
+            self.model_widget.slice_cache.close()
+        super().closeEvent(event)
 
     def set_res_limits(self):
         """
@@ -158,12 +390,203 @@ class ModEM_Model_Manipulator(QtWidgets.QMainWindow):
             self.res_popup.res_max,
         )
 
+    def set_difference_limits(self):
+        """
+        set the log10 ratio limits of the difference colorbar
+        """
+        self.diff_popup = ResLimits(
+            self.model_widget.difference_limits[0],
+            self.model_widget.difference_limits[1],
+            label="Log10(Model / Comparison)",
+        )
+        self.diff_popup.res_changed.connect(self.set_difference)
+
+    def set_difference(self):
+        self.model_widget.difference_limits = (
+            self.diff_popup.res_min,
+            self.diff_popup.res_max,
+        )
+
     def pad_fill(self):
         self.model_widget.set_fill_params()
 
     def smooth(self):
         self.model_widget.set_smooth_params()
 
+    def seed_basemap(self):
+        """
+        download basemap tiles for the location map in a worker thread so
+        it can be drawn offline
+        """
+        if self.seed_thread is not None and self.seed_thread.isRunning():
+            print("Still seeding base map tiles")
+            return
+        try:
+            seed_request = self.model_widget.get_seed_request()
+        except Exception as error:
+            print(f"Could not seed base map tiles because {error}")
+            return
+        if seed_request is None:
+            return
+
+        self.seed_thread = BasemapSeedThread(
+            *seed_request, max_tiles=self.model_widget.tile_seed_max
+        )
+        self.seed_thread.progress.connect(self.update_seed_progress)
+        self.seed_thread.seed_finished.connect(self.seed_finished)
+        self.seed_thread.seed_failed.connect(self.seed_failed)
+
+        self.menu_tools_seed_action.setEnabled(False)
+        self.save_progress.setValue(0)
+        self.save_progress.show()
+        self.seed_thread.start()
+
+    def update_seed_progress(self, n_done, n_total):
+        self.save_progress.setValue(int(100 * n_done / n_total))
+        self.statusBar().showMessage(f"Seeding tile {n_done} of {n_total}")
+
+    def seed_finished(self, n_tiles, cache_dir):
+        self.menu_tools_seed_action.setEnabled(True)
+        self.save_progress.hide()
+        self.statusBar().showMessage(f"Cached {n_tiles} tiles", 5000)
+        print(f"Cached {n_tiles} tiles in {cache_dir}")
+
+    def seed_failed(self, message):
+        self.menu_tools_seed_action.setEnabled(True)
+        self.save_progress.hide()
+        self.statusBar().showMessage(message, 5000)
+        print(message)
+
+    def set_tile_directory(self):
+        """
+        use a local directory of {z}/{x}/{y}.png tiles for the basemap
+        """
+        fn_dialog = QtWidgets.QFileDialog()
+        tile_dir = str(
+            fn_dialog.getExistingDirectory(caption="Choose tile directory")
+        )
+        if tile_dir:
+            self.model_widget.cx_source = tile_dir
+            self.model_widget.redraw_location()
+
+
+# =============================================================================
+# Save model thread
+# =============================================================================
+class ModelSaveThread(QtCore.QThread):
+    """
+    Write a ModEM model file in a worker thread.
+
+    The resistivity model is copied when the thread is made so the model can
+    keep being edited while it is saved.  The file is written to a temporary
+    file in the same directory and renamed when it is complete, so a failed
+    save never leaves a partial model file.  If write_binary is True a
+    binary copy is written with
+    :class:`mtpy_gui.modeling.model_cache.ModEMModelCache` so the saved
+    model opens quickly.
+    """
+
+    progress = QtCore.pyqtSignal(int, str)
+    save_finished = QtCore.pyqtSignal(str)
+    save_failed = QtCore.pyqtSignal(str)
+
+    def __init__(
+        self, model_obj, res_model, save_fn, write_binary=False, log_space=False
+    ):
+        super().__init__()
+        # shallow copy so to_modem can set attributes without changing the
+        # model being edited, the grids are not edited.
+        self.model_obj = copy.copy(model_obj)
+        self.res_model = np.array(res_model)
+        self.save_fn = Path(save_fn)
+        self.write_binary = write_binary
+        self.log_space = log_space
+
+    def run(self):
+        tmp_fn = None
+        try:
+            # a log10 working model is only made linear for writing
+            self.res_model = ModEMModelCache.to_linear(
+                self.res_model, self.log_space
+            )
+            self.progress.emit(10, f"Writing {self.save_fn.name}")
+            fid, tmp_fn = tempfile.mkstemp(
+                dir=self.save_fn.parent,
+                prefix=f".{self.save_fn.stem}_",
+                suffix=self.save_fn.suffix,
+            )
+            os.close(fid)
+            self.model_obj.to_modem(model_fn=tmp_fn, res_model=self.res_model)
+
+            self.progress.emit(80, f"Moving to {self.save_fn.name}")
+            # mkstemp makes the file readable only by the user
+            mode = 0o644
+            if self.save_fn.exists():
+                mode = self.save_fn.stat().st_mode & 0o777
+            os.chmod(tmp_fn, mode)
+            os.replace(tmp_fn, self.save_fn)
+            tmp_fn = None
+            if hasattr(self.model_obj, "model_fn"):
+                self.model_obj.model_fn = self.save_fn
+
+            if self.write_binary:
+                self.progress.emit(90, "Writing binary copy")
+                try:
+                    ModEMModelCache(self.save_fn).write(
+                        self.model_obj, res_model=self.res_model
+                    )
+                except OSError as error:
+                    print(f"Could not write binary copy because {error}")
+
+            self.progress.emit(100, "Done")
+            self.save_finished.emit(str(self.save_fn))
+        except Exception as error:
+            self.save_failed.emit(
+                f"Could not save {self.save_fn} because {error}"
+            )
+        finally:
+            if tmp_fn is not None and os.path.exists(tmp_fn):
+                os.remove(tmp_fn)
+
+
+# =============================================================================
+# Seed basemap thread
+# =============================================================================
+class BasemapSeedThread(QtCore.QThread):
+    """
+    Download basemap tiles into the tile cache in a worker thread.
+
+    At most max_tiles are downloaded, the highest zoom levels are left out
+    if the area needs more.  Seeding stops between tiles when the thread is
+    asked to stop with requestInterruption.
+    """
+
+    progress = QtCore.pyqtSignal(int, int)
+    seed_finished = QtCore.pyqtSignal(int, str)
+    seed_failed = QtCore.pyqtSignal(str)
+
+    def __init__(self, tile_cache, lonlat_bounds, zooms, max_tiles=2000):
+        super().__init__()
+        self.tile_cache = tile_cache
+        self.lonlat_bounds = lonlat_bounds
+        self.zooms = zooms
+        self.max_tiles = max_tiles
+
+    def run(self):
+        try:
+            n_tiles = self.tile_cache.seed(
+                self.lonlat_bounds,
+                self.zooms,
+                max_tiles=self.max_tiles,
+                progress=self.progress.emit,
+                is_cancelled=self.isInterruptionRequested,
+            )
+            self.seed_finished.emit(n_tiles, str(self.tile_cache.cache_dir))
+        except Exception as error:
+            self.seed_failed.emit(
+                f"Could not seed base map tiles because {error}"
+            )
+
 
 # =============================================================================
 # Resistivity limits widget
@@ -171,15 +594,18 @@ class ModEM_Model_Manipulator(QtWidgets.QMainWindow):
 class ResLimits(QtWidgets.QWidget):
     res_changed = QtCore.pyqtSignal()
 
-    def __init__(self, res_limit_min, res_limit_max):
+    def __init__(
+        self, res_limit_min, res_limit_max, label="Resistivty (Log10)"
+    ):
         super(ResLimits, self).__init__()
         self.res_min = res_limit_min
         self.res_max = res_limit_max
+        self.label_text = label
 
         self.setup_ui()
 
     def setup_ui(self):
-        self.label = QtWidgets.QLabel("Resistivty (Log10)")
+        self.label = QtWidgets.QLabel(self.label_text)
         self.res_min_label = QtWidgets.QLabel("min")
         self.res_min_edit = QtWidgets.QLineEdit()
         self.res_min_edit.setText("{0:0.5g}".format(self.res_min))
@@ -351,6 +777,89 @@ class Smooth(QtWidgets.QWidget):
         self.undo_button_pushed.emit()
 
 
+# =============================================================================
+# Statistics widget
+# =============================================================================
+class ModelStats(QtWidgets.QWidget):
+    """
+    histogram of log10 resistivity of a layer and the selected region
+    """
+
+    def __init__(self):
+        super(ModelStats, self).__init__()
+
+        self.q = (5, 50, 95)
+        self.layer_steps = None
+        self.region_steps = None
+        self.percentile_lines = []
+
+        self.setup_ui()
+
+    def setup_ui(self):
+        self.figure = Figure()
+        self.canvas = FigureCanvas(self.figure)
+        self.ax = self.figure.add_subplot(1, 1, 1)
+        self.ax.set_xlabel("Resistivity (Log10)")
+        self.ax.set_ylabel("Number of Cells")
+
+        self.stats_label = QtWidgets.QLabel()
+        self.stats_label.setWordWrap(True)
+
+        layout = QtWidgets.QVBoxLayout()
+        layout.addWidget(self.canvas)
+        layout.addWidget(self.stats_label)
+        self.setLayout(layout)
+
+    def _format_percentiles(self, name, percentiles):
+        return "{0}: {1} Ohm-m".format(
+            name,
+            ", ".join(
+                "P{0:g} {1:.3g}".format(qq, 10**pp)
+                for qq, pp in zip(self.q, percentiles)
+            ),
+        )
+
+    def plot(
+        self,
+        bin_edges,
+        counts,
+        percentiles,
+        title,
+        region_counts=None,
+        region_percentiles=None,
+    ):
+        """
+        update the histogram in place, only the step heights change
+        """
+        if self.layer_steps is None:
+            self.layer_steps = self.ax.stairs(
+                counts, bin_edges, fill=True, color=(0.6, 0.6, 0.6)
+            )
+            self.region_steps = self.ax.stairs(
+                counts, bin_edges, color="r", lw=1.5
+            )
+            self.percentile_lines = [
+                self.ax.axvline(0, color="k", ls="--", lw=1) for qq in self.q
+            ]
+        self.layer_steps.set_data(counts, bin_edges)
+        for line, pp in zip(self.percentile_lines, percentiles):
+            line.set_xdata([pp, pp])
+
+        text = [self._format_percentiles("Layer", percentiles)]
+        if region_counts is None:
+            self.region_steps.set_visible(False)
+        else:
+            self.region_steps.set_data(region_counts, bin_edges)
+            self.region_steps.set_visible(True)
+            text.append(self._format_percentiles("Region", region_percentiles))
+
+        self.ax.set_title(title)
+        self.ax.relim()
+        self.ax.autoscale_view()
+        self.stats_label.setText("\n".join(text))
+        self.canvas.draw_idle()
+
+
 # ==============================================================================
 # Model Widget
 # ==============================================================================
@@ -359,6 +868,8 @@ class ModelWidget(QtWidgets.QWidget):
     make the model plot its own widget
     """
 
+    stats_changed = QtCore.pyqtSignal()
+
     def __init__(self):
         super(ModelWidget, self).__init__()
 
@@ -369,17 +880,30 @@ class ModelWidget(QtWidgets.QWidget):
         self._data_fn = None
         self._model_fn = None
         self.station_locations = None
+        self._station_index = None
+        # keep a binary copy of the model next to the model file so it
+        # opens quickly the next time
+        self.use_model_cache = True
+        # keep new_res_model as float32 log10 resistivity, half the memory
+        # and no log10 when drawing, it is made linear again on save
+        self.log_space = False
 
         self.map_index = 0
         self.east_index = 0
         self.north_index = 0
 
-        self.plot_east_map = None
-        self.plot_north_map = None
-        self.plot_east_z = None
-        self.plot_z_east = None
-        self.plot_north_z = None
-        self.plot_z_north = None
+        self.map_lod = None
+        self.east_lod = None
+        self.north_lod = None
+        label_kwargs = {
+            "va": "bottom",
+            "ha": "center",
+            "fontweight": "bold",
+            "fontsize": 10,
+            "bbox": {"boxstyle": "square", "ec": "k", "fc": "w"},
+        }
+        self.east_labels = StationLabels(**label_kwargs)
+        self.north_labels = StationLabels(**label_kwargs)
         self.north_line = None
         self.east_line = None
         self.north_line_xlist = None
@@ -393,6 +917,9 @@ class ModelWidget(QtWidgets.QWidget):
         self.cb_ax = None
         self.location_ax = None
         self.new_res_model = None
+        self.cell_mask = None
+        self.painter = None
+        self.selectors = {}
 
         self.units = "km"
         self.scale = 1000.0
@@ -407,11 +934,44 @@ class ModelWidget(QtWidgets.QWidget):
         self.east_copy_num = 1
         self.north_copy_num = 1
 
+        # painting options
+        self.brush = "Box"
+        self.paint_mode = "Set"
+        self.paint_factor = 1.0
+        # number of cells (before, after) the current slice to paint through
+        self.paint_extent = (0, 0)
+        # region grow, tolerance is in log10 resistivity
+        self.region_grow = None
+        self.region_tolerance = 0.25
+        self.region_dimension = "3D"
+        self.region_seed = None
+        self.region = None
+        self.region_artists = []
+        # comparison with a second model on the same mesh
+        self.compare_res_model = None
+        self.model_difference = None
+        self.display = "Model"
+        self.difference_cmap = "RdBu"
+        # log10(model / comparison) at the ends of the colorbar
+        self._difference_limits = (-1, 1)
+        # per layer histograms, updated from the cells that are edited
+        self.layer_histogram = None
+        # log10 slices of new_res_model, neighbours are computed ahead
+        self.slice_cache = None
+
         self.cx_source = None
         self.cx_zoom = None
         self.map_crs = CRS.from_epsg(4326)
         if has_cx:
             self.cx_source = cx.providers.USGS.USTopo
+        # downloaded tiles are kept here, None for ~/.mtpy_gui/tiles
+        self.tile_cache_dir = None
+        # only use tiles that are cached or in a local tile directory
+        self.tile_offline = False
+        # largest number of tiles downloaded by seeding
+        self.tile_seed_max = 2000
+        self._basemap = None
+        self._basemap_key = None
 
         self.make_cb()
 
@@ -588,6 +1148,73 @@ class ModelWidget(QtWidgets.QWidget):
 
         self.cb_label = QtWidgets.QLabel("Ohm-m")
 
+        ## --> painting tools
+        self.brush_label = QtWidgets.QLabel("Brush")
+        self.brush_combo = QtWidgets.QComboBox()
+        self.brush_combo.setMaximumWidth(140)
+        self.brush_combo.addItems(
+            ["Box", "Circle", "Polygon", "Lasso", "Region"]
+        )
+        self.brush_combo.activated[str].connect(self.set_brush)
+
+        self.paint_mode_combo = QtWidgets.QComboBox()
+        self.paint_mode_combo.setMaximumWidth(140)
+        self.paint_mode_combo.addItems(["Set", "Scale"])
+        self.paint_mode_combo.activated[str].connect(self.set_paint_mode)
+
+        self.paint_factor_label = QtWidgets.QLabel("Scale Factor")
+        self.paint_factor_edit = QtWidgets.QLineEdit()
+        self.paint_factor_edit.setMaximumWidth(140)
+        self.paint_factor_edit.setText("{0:.3g}".format(self.paint_factor))
+        self.paint_factor_edit.editingFinished.connect(self.set_paint_factor)
+
+        self.paint_extent_label = QtWidgets.QLabel("Volume (-N, +N)")
+        self.paint_extent_before_edit = QtWidgets.QLineEdit()
+        self.paint_extent_before_edit.setMaximumWidth(65)
+        self.paint_extent_before_edit.setText(
+            "{0:.0f}".format(self.paint_extent[0])
+        )
+        self.paint_extent_before_edit.editingFinished.connect(
+            self.set_paint_extent
+        )
+        self.paint_extent_after_edit = QtWidgets.QLineEdit()
+        self.paint_extent_after_edit.setMaximumWidth(65)
+        self.paint_extent_after_edit.setText(
+            "{0:.0f}".format(self.paint_extent[1])
+        )
+        self.paint_extent_after_edit.editingFinished.connect(
+            self.set_paint_extent
+        )
+
+        self.region_label = QtWidgets.QLabel("Region Tolerance (Log10)")
+        self.region_tolerance_edit = QtWidgets.QLineEdit()
+        self.region_tolerance_edit.setMaximumWidth(140)
+        self.region_tolerance_edit.setText(
+            "{0:.3g}".format(self.region_tolerance)
+        )
+        self.region_tolerance_edit.editingFinished.connect(
+            self.set_region_tolerance
+        )
+        self.region_dimension_combo = QtWidgets.QComboBox()
+        self.region_dimension_combo.setMaximumWidth(140)
+        self.region_dimension_combo.addItems(["3D", "2D"])
+        self.region_dimension_combo.activated[str].connect(
+            self.set_region_dimension
+        )
+        self.region_apply_button = QtWidgets.QPushButton("Apply Region")
+        self.region_apply_button.setMaximumWidth(140)
+        self.region_apply_button.pressed.connect(self.apply_region)
+
+        self.display_label = QtWidgets.QLabel("Show")
+        self.display_combo = QtWidgets.QComboBox()
+        self.display_combo.setMaximumWidth(140)
+        self.display_combo.addItems(["Model", "Comparison", "Difference"])
+        self.display_combo.activated[str].connect(self.set_display)
+        self.display_combo.setEnabled(False)
+
+        for canvas in [self.map_canvas, self.east_canvas, self.north_canvas]:
+            canvas.mpl_connect("button_press_event", self.region_on_click)
+
         ##------------------------------------------------
         ## Layout
 
@@ -653,6 +1280,22 @@ class ModelWidget(QtWidgets.QWidget):
         cb_edit = QtWidgets.QVBoxLayout()
         cb_edit.addWidget(self.cb_label)
         cb_edit.addWidget(self.cb_line_edit)
+        cb_edit.addWidget(self.brush_label)
+        cb_edit.addWidget(self.brush_combo)
+        cb_edit.addWidget(self.paint_mode_combo)
+        cb_edit.addWidget(self.paint_factor_label)
+        cb_edit.addWidget(self.paint_factor_edit)
+        cb_edit.addWidget(self.paint_extent_label)
+        paint_extent_layout = QtWidgets.QHBoxLayout()
+        paint_extent_layout.addWidget(self.paint_extent_before_edit)
+        paint_extent_layout.addWidget(self.paint_extent_after_edit)
+        cb_edit.addLayout(paint_extent_layout)
+        cb_edit.addWidget(self.region_label)
+        cb_edit.addWidget(self.region_tolerance_edit)
+        cb_edit.addWidget(self.region_dimension_combo)
+        cb_edit.addWidget(self.region_apply_button)
+        cb_edit.addWidget(self.display_label)
+        cb_edit.addWidget(self.display_combo)
         cb_layout = QtWidgets.QVBoxLayout()
         cb_layout.addWidget(self.cb_canvas)
         cb_layout.addLayout(cb_edit)
@@ -673,6 +1316,16 @@ class ModelWidget(QtWidgets.QWidget):
 
         self.redraw_cb()
 
+    @property
+    def difference_limits(self):
+        return self._difference_limits
+
+    @difference_limits.setter
+    def difference_limits(self, difference_limits):
+        self._difference_limits = difference_limits
+
+        self.redraw_cb()
+
     @property
     def data_fn(self):
         self._data_fn
@@ -685,11 +1338,13 @@ class ModelWidget(QtWidgets.QWidget):
     def data_fn(self, data_fn):
         self._data_fn = data_fn
 
-        self.data_obj = MTData()
-        self.data_obj.from_modem(self._data_fn)
+        # only the station locations are used, so the data object is
+        # shared with other windows that opened the file
+        self.data_obj = get_data_store().get(self._data_fn, read_mt_data)
         self.map_crs = self.data_obj.utm_crs
         # dataframe of station locations
         self.station_locations = self.data_obj.station_locations
+        self._station_index = None
 
         if self.map_ax is not None:
             self.redraw_plots()
@@ -705,10 +1360,23 @@ class ModelWidget(QtWidgets.QWidget):
     @model_fn.setter
     def model_fn(self, model_fn):
         self._model_fn = model_fn
-        self.model_obj = StructuredGrid3D()
-        self.model_obj.from_modem(self._model_fn)
+        self.model_obj = ModEMModelCache(self._model_fn).read_model(
+            use_cache=self.use_model_cache
+        )
         ## make a copy of the resistivity model to manipulate
-        self.new_res_model = self.model_obj.res_model.copy()
+        self.new_res_model = ModEMModelCache.working_copy(
+            self.model_obj.res_model, log_space=self.log_space
+        )
+        self._station_index = None
+        # a comparison model has to be on the same mesh
+        self.compare_res_model = None
+        self.model_difference = None
+        self.display = "Model"
+        self.display_combo.setCurrentText(self.display)
+        self.display_combo.setEnabled(False)
+        self.draw_cb()
+        self.make_model_tools()
+        self.stats_changed.emit()
 
         # set slider bar intervals
         # need the minus 1 cause we are using the value of the slider as
@@ -729,18 +1397,12 @@ class ModelWidget(QtWidgets.QWidget):
         self.map_ax.set_xlabel("Easting {0}".format(self.units))
         self.map_ax.set_ylabel("Northing {0}".format(self.units))
         self.map_ax.set_aspect("equal")
-        self.map_ax.plot(
-            self.map_east_line_xlist,
-            self.map_east_line_ylist,
-            lw=0.25,
-            color="k",
-        )
-        self.map_ax.plot(
-            self.map_north_line_xlist,
-            self.map_north_line_ylist,
-            lw=0.25,
-            color="k",
+        self.map_lod = LODMesh(
+            self.map_ax,
+            self.model_obj.grid_east / self.scale,
+            self.model_obj.grid_north / self.scale,
         )
+        add_grid_lines(self.map_ax, self.map_grid_lines)
 
         self.redraw_map()
 
@@ -752,18 +1414,12 @@ class ModelWidget(QtWidgets.QWidget):
             sharex=self.map_ax,
         )
         # aspect='equal')
-        self.north_ax.plot(
-            self.north_east_line_xlist,
-            self.north_east_line_ylist,
-            lw=0.25,
-            color="k",
-        )
-        self.north_ax.plot(
-            self.north_z_line_xlist,
-            self.north_z_line_ylist,
-            lw=0.25,
-            color="k",
+        self.north_lod = LODMesh(
+            self.north_ax,
+            self.model_obj.grid_east / self.scale,
+            self.model_obj.grid_z / self.scale,
         )
+        add_grid_lines(self.north_ax, self.north_grid_lines)
         self.north_ax.set_xlabel("Easting {0}".format(self.units))
         self.north_ax.set_ylabel("Depth {0}".format(self.units))
         # self.north_ax.set_aspect('equal')
@@ -782,16 +1438,13 @@ class ModelWidget(QtWidgets.QWidget):
             sharex=self.map_ax,
             sharey=self.north_ax,
         )
-        ## --> plot the mesh lines, this way only do it once
-        self.east_ax.plot(
-            self.east_north_line_xlist,
-            self.east_north_line_ylist,
-            lw=0.25,
-            color="k",
-        )
-        self.east_ax.plot(
-            self.east_z_line_xlist, self.east_z_line_ylist, lw=0.25, color="k"
+        self.east_lod = LODMesh(
+            self.east_ax,
+            self.model_obj.grid_north / self.scale,
+            self.model_obj.grid_z / self.scale,
         )
+        ## --> plot the mesh lines, this way only do it once
+        add_grid_lines(self.east_ax, self.east_grid_lines)
         self.east_ax.set_xlabel("Northing {0}".format(self.units))
         self.east_ax.set_ylabel("Depth {0}".format(self.units))
         # self.east_ax.set_aspect('equal')
@@ -804,20 +1457,7 @@ class ModelWidget(QtWidgets.QWidget):
         self.location_ax.set_xlabel("Easting {0}".format(self.units))
         self.location_ax.set_ylabel("Northing {0}".format(self.units))
         self.location_ax.set_aspect("equal")
-        self.location_ax.plot(
-            self.map_east_line_xlist,
-            self.map_east_line_ylist,
-            lw=0.25,
-            color="k",
-            picker=3,
-        )
-        self.location_ax.plot(
-            self.map_north_line_xlist,
-            self.map_north_line_ylist,
-            lw=0.25,
-            color="k",
-            picker=3,
-        )
+        add_grid_lines(self.location_ax, self.location_grid_lines)
 
         self.location_ax.set_xlim(
             (
@@ -893,131 +1533,169 @@ class ModelWidget(QtWidgets.QWidget):
             self.north_ax, self.north_on_pick, useblit=True
         )
 
+        # polygon and lasso selectors, only the ones for the current brush
+        # are active
+        self.selectors = {"Box": [], "Circle": [], "Polygon": [], "Lasso": []}
+        for ax, selector, on_polygon in [
+            (self.map_ax, self.map_selector, self.map_on_polygon),
+            (self.east_ax, self.east_selector, self.east_on_polygon),
+            (self.north_ax, self.north_selector, self.north_on_polygon),
+        ]:
+            self.selectors["Box"].append(selector)
+            self.selectors["Circle"].append(selector)
+            self.selectors["Polygon"].append(
+                widgets.PolygonSelector(ax, on_polygon, useblit=True)
+            )
+            self.selectors["Lasso"].append(
+                widgets.LassoSelector(ax, on_polygon, useblit=True)
+            )
+        self.set_brush(self.brush)
+
+    def make_model_tools(self):
+        """
+        make the tools that work on new_res_model, call when a model is
+        read or log_space changes
+        """
+        ## find air/sea cells once so tools only check the cells they edit
+        self.cell_mask = ModelCellMask(
+            self.model_obj.res_model, log_space=self.log_space
+        )
+        self.painter = ModelPainter(
+            self.model_obj.grid_east / self.scale,
+            self.model_obj.grid_north / self.scale,
+            self.model_obj.grid_z / self.scale,
+            cell_mask=self.cell_mask,
+            log_space=self.log_space,
+        )
+        self.region_grow = RegionGrow(self.cell_mask, log_space=self.log_space)
+        self.region = None
+        self.layer_histogram = LayerHistogram(
+            self.new_res_model, log_space=self.log_space
+        )
+        if self.slice_cache is not None:
+            self.slice_cache.close()
+            self.slice_cache = None
+        if not self.log_space:
+            self.slice_cache = SliceCache(self.new_res_model)
+        if self.model_difference is not None:
+            self.model_difference = ModelDifference(
+                self.new_res_model,
+                self.compare_res_model,
+                log_space=self.log_space,
+            )
+
+    def set_log_space(self, log_space):
+        """
+        Keep the working model as float32 log10 resistivity or as linear
+        resistivity.  An open model is converted, edits are kept.
+        """
+        log_space = bool(log_space)
+        if log_space == self.log_space:
+            return
+        self.log_space = log_space
+        if self.new_res_model is None:
+            return
+        if log_space:
+            self.new_res_model = ModEMModelCache.working_copy(
+                self.new_res_model, log_space=True
+            )
+        else:
+            self.new_res_model = ModEMModelCache.to_linear(
+                self.new_res_model, log_space=True
+            )
+        self.make_model_tools()
+        self.clear_region()
+        self.redraw_plots()
+        self.stats_changed.emit()
+
+    def get_res_model(self):
+        """
+        edited model as linear resistivity
+        """
+        return ModEMModelCache.to_linear(self.new_res_model, self.log_space)
+
     def undo(self):
         """
         reset the resistivity model to its original
         """
-        self.new_res_model = self.model_obj.res_model.copy()
+        self.new_res_model = ModEMModelCache.working_copy(
+            self.model_obj.res_model, log_space=self.log_space
+        )
 
     def initialize_vectors(self):
         """
         get all the plotting vectors
         """
 
-        ### --> get mesh grids for plotting pcolormeshes
-        self.plot_east_map, self.plot_north_map = np.meshgrid(
-            self.model_obj.grid_east / self.scale,
-            self.model_obj.grid_north / self.scale,
-            indexing="ij",
-        )
-        self.plot_east_z, self.plot_z_east = np.meshgrid(
-            self.model_obj.grid_east / self.scale,
-            self.model_obj.grid_z / self.scale,
-            indexing="ij",
+        # get line collections for plotting grid lines, the segments are
+        # shared between the map and location views
+        ## --> map view
+        self.map_grid_lines = make_grid_lines(
+            self.model_obj.grid_east,
+            self.model_obj.grid_north,
+            scale=self.scale,
+            lw=0.25,
+            color="k",
         )
-        self.plot_north_z, self.plot_z_north = np.meshgrid(
-            self.model_obj.grid_north / self.scale,
-            self.model_obj.grid_z / self.scale,
-            indexing="ij",
+        self.location_grid_lines = make_grid_lines(
+            self.model_obj.grid_east,
+            self.model_obj.grid_north,
+            scale=self.scale,
+            lw=0.25,
+            color="k",
+            picker=3,
         )
 
-        # get line lists for plotting grid lines
-        ## --> map view
-        self.map_east_line_xlist = []
-        self.map_east_line_ylist = []
-        for xx in self.model_obj.grid_east:
-            self.map_east_line_xlist.extend([xx / self.scale, xx / self.scale])
-            self.map_east_line_xlist.append(None)
-            self.map_east_line_ylist.extend(
-                [
-                    self.model_obj.grid_north.min() / self.scale,
-                    self.model_obj.grid_north.max() / self.scale,
-                ]
-            )
-            self.map_east_line_ylist.append(None)
-
-        self.map_north_line_xlist = []
-        self.map_north_line_ylist = []
-        for yy in self.model_obj.grid_north:
-            self.map_north_line_xlist.extend(
-                [
-                    self.model_obj.grid_east.min() / self.scale,
-                    self.model_obj.grid_east.max() / self.scale,
-                ]
-            )
-            self.map_north_line_xlist.append(None)
-            self.map_north_line_ylist.extend([yy / self.scale, yy / self.scale])
-            self.map_north_line_ylist.append(None)
-
         ##--> NS cross section that move E-W
-        self.east_north_line_xlist = []
-        self.east_north_line_ylist = []
-        for xx in self.model_obj.grid_north:
-            self.east_north_line_xlist.extend(
-                [xx / self.scale, xx / self.scale]
-            )
-            self.east_north_line_xlist.append(None)
-            self.east_north_line_ylist.extend(
-                [
-                    self.model_obj.grid_z.min() / self.scale,
-                    self.model_obj.grid_z.max() / self.scale,
-                ]
-            )
-            self.east_north_line_ylist.append(None)
-
-        self.east_z_line_xlist = []
-        self.east_z_line_ylist = []
-        for yy in self.model_obj.grid_z:
-            self.east_z_line_xlist.extend(
-                [
-                    self.model_obj.grid_north.min() / self.scale,
-                    self.model_obj.grid_north.max() / self.scale,
-                ]
-            )
-            self.east_z_line_xlist.append(None)
-            self.east_z_line_ylist.extend([yy / self.scale, yy / self.scale])
-            self.east_z_line_ylist.append(None)
+        self.east_grid_lines = make_grid_lines(
+            self.model_obj.grid_north,
+            self.model_obj.grid_z,
+            scale=self.scale,
+            lw=0.25,
+            color="k",
+        )
 
         ##--> EW cross section that move N-S
-        self.north_east_line_xlist = []
-        self.north_east_line_ylist = []
-        for xx in self.model_obj.grid_east:
-            self.north_east_line_xlist.extend(
-                [xx / self.scale, xx / self.scale]
-            )
-            self.north_east_line_xlist.append(None)
-            self.north_east_line_ylist.extend(
-                [
-                    self.model_obj.grid_z.min() / self.scale,
-                    self.model_obj.grid_z.max() / self.scale,
-                ]
-            )
-            self.north_east_line_ylist.append(None)
+        self.north_grid_lines = make_grid_lines(
+            self.model_obj.grid_east,
+            self.model_obj.grid_z,
+            scale=self.scale,
+            lw=0.25,
+            color="k",
+        )
 
-        self.north_z_line_xlist = []
-        self.north_z_line_ylist = []
-        for yy in self.model_obj.grid_z:
-            self.north_z_line_xlist.extend(
-                [
-                    self.model_obj.grid_east.min() / self.scale,
-                    self.model_obj.grid_east.max() / self.scale,
-                ]
-            )
-            self.north_z_line_xlist.append(None)
-            self.north_z_line_ylist.extend([yy / self.scale, yy / self.scale])
-            self.north_z_line_ylist.append(None)
+    @property
+    def show_difference(self):
+        """
+        True if the views show the difference to the comparison model
+        """
+        return (
+            self.display == "Difference" and self.model_difference is not None
+        )
+
+    def get_cb_params(self):
+        """
+        colormap and limits of the colorbar for the current display
+        """
+        if self.show_difference:
+            return self.difference_cmap, self.difference_limits
+        return self.cmap, self.res_limits
 
     def make_cb(self):
+        limits = self.get_cb_params()[1]
         res = np.arange(
-            self.res_limits[0],
-            self.res_limits[1],
-            (self.res_limits[1] - self.res_limits[0]) / 256.0,
+            limits[0],
+            limits[1],
+            (limits[1] - limits[0]) / 256.0,
         )
         self.cb_x, self.cb_y = np.meshgrid(np.array([0, 1]), res, indexing="ij")
         self.cb_bar = np.zeros((2, 256))
         self.cb_bar[:, :] = res
 
     def on_res_pick(self, event):
+        # the difference colorbar is not a resistivity to paint with
+        if self.show_difference:
+            return
         try:
             y_data = 10**event.ydata
             y_data = np.log10(
@@ -1050,19 +1728,14 @@ class ModelWidget(QtWidgets.QWidget):
         )
 
         self.redraw_map()
+        self.stats_changed.emit()
 
     def redraw_map(self):
         """
         redraw map view
         """
-        self.map_ax.pcolormesh(
-            self.plot_east_map,
-            self.plot_north_map,
-            np.log10(self.new_res_model[:, :, self.map_index].T),
-            cmap=self.cmap,
-            vmin=self.res_limits[0],
-            vmax=self.res_limits[1],
-        )
+        data, cmap, limits = self.get_slice_data("map", self.map_index)
+        self.map_lod.set_data(data, cmap=cmap, vmin=limits[0], vmax=limits[1])
         if self.station_locations is not None:
             self.map_ax.scatter(
                 self.station_locations.model_east / self.scale,
@@ -1091,29 +1764,21 @@ class ModelWidget(QtWidgets.QWidget):
         ylim = self.east_ax.get_ylim()
 
         self.east_ax.cla()
-        self.east_ax.plot(
-            self.east_north_line_xlist,
-            self.east_north_line_ylist,
-            lw=0.25,
-            color="k",
-        )
-        self.east_ax.plot(
-            self.east_z_line_xlist, self.east_z_line_ylist, lw=0.25, color="k"
-        )
-        self.east_ax.pcolormesh(
-            self.plot_north_z,
-            self.plot_z_north,
-            np.log10(self.new_res_model[:, self.east_index, :]),
-            cmap=self.cmap,
-            vmin=self.res_limits[0],
-            vmax=self.res_limits[1],
-        )
-
-        line = self.get_stations_east()
-        if line is not None:
+        self.east_ax.set_ylim(ylim)
+        self.east_ax.set_xlim(xlim)
+        add_grid_lines(self.east_ax, self.east_grid_lines)
+        data, cmap, limits = self.get_slice_data("east", self.east_index)
+        self.east_lod.set_data(data, cmap=cmap, vmin=limits[0], vmax=limits[1])
+
+        station_index = self.station_index
+        if station_index is not None:
+            rows = station_index.get_east_rows(self.east_index)
+            east = station_index.east[rows] / self.scale
+            north = station_index.north[rows] / self.scale
+            elevation = station_index.elevation[rows] / self.scale
             self.east_ax.scatter(
-                line.model_north / self.scale,
-                line.model_elevation / self.scale,
+                north,
+                elevation,
                 marker="v",
                 c="cyan",
                 s=50,
@@ -1121,8 +1786,8 @@ class ModelWidget(QtWidgets.QWidget):
             )
 
             self.location_ax.scatter(
-                line.model_east / self.scale,
-                line.model_north / self.scale,
+                east,
+                north,
                 marker="v",
                 c="k",
                 s=30,
@@ -1130,17 +1795,10 @@ class ModelWidget(QtWidgets.QWidget):
             )
             self.location_canvas.draw()
 
-            for ss in line.itertuples():
-                self.east_ax.text(
-                    ss.model_north / self.scale,
-                    ss.model_elevation / self.scale - 0.2,
-                    ss.station,
-                    va="bottom",
-                    ha="center",
-                    fontdict={"weight": "bold", "size": 10},
-                    clip_on=True,
-                    bbox={"boxstyle": "square", "ec": "k", "fc": "w"},
-                )
+            self.east_labels.set_data(
+                north, elevation - 0.2, station_index.station[rows]
+            )
+            self.east_ax.add_artist(self.east_labels)
 
         self.east_ax.set_xlabel("Northing {0}".format(self.units))
         self.east_ax.set_ylabel("Depth {0}".format(self.units))
@@ -1154,20 +1812,7 @@ class ModelWidget(QtWidgets.QWidget):
         """
 
         self.location_ax.cla()
-        self.location_ax.plot(
-            self.map_east_line_xlist,
-            self.map_east_line_ylist,
-            lw=0.25,
-            color="k",
-            picker=3,
-        )
-        self.location_ax.plot(
-            self.map_north_line_xlist,
-            self.map_north_line_ylist,
-            lw=0.25,
-            color="k",
-            picker=3,
-        )
+        add_grid_lines(self.location_ax, self.location_grid_lines)
         # make lines that can move around
         self.east_line = self.location_ax.plot(
             [
@@ -1230,18 +1875,9 @@ class ModelWidget(QtWidgets.QWidget):
                 )
             )
 
-        if has_cx:
+        if self.cx_source is not None and self.data_obj is not None:
             try:
-                cx_kwargs = {
-                    "crs": self.data_obj.utm_crs.to_string(),
-                    "source": self.cx_source,
-                }
-                if self.cx_zoom is not None:
-                    cx_kwargs["zoom"] = self.cx_zoom
-                cx.add_basemap(
-                    self.location_ax,
-                    **cx_kwargs,
-                )
+                self.get_basemap().draw()
             except Exception as error:
                 print(f"Could not add base map because {error}")
 
@@ -1250,6 +1886,70 @@ class ModelWidget(QtWidgets.QWidget):
 
         self.location_canvas.draw()
 
+    def get_basemap(self):
+        """
+        get the basemap of the location axes, the rendered image is kept
+        until the source or view changes.
+        """
+        key = (
+            str(self.cx_source),
+            self.cx_zoom,
+            self.tile_cache_dir,
+            self.tile_offline,
+            self.data_obj.utm_crs.to_string(),
+        )
+        if self._basemap is None or key != self._basemap_key:
+            tile_cache = TileCache(
+                self.cx_source,
+                cache_dir=self.tile_cache_dir,
+                offline=self.tile_offline,
+            )
+            self._basemap = Basemap(
+                self.location_ax,
+                tile_cache,
+                self.data_obj.utm_crs,
+                zoom=self.cx_zoom,
+            )
+            self._basemap_key = key
+        return self._basemap
+
+    def regrid_model(self, target_obj, method="linear"):
+        """
+        Resample the edited model onto the mesh of another model, air cells
+        stay air.
+
+        :param target_obj: model with the new mesh
+        :type target_obj: :class:`mtpy.modeling.StructuredGrid3D`
+        :param method: 'linear' for trilinear in log10 resistivity or
+         'nearest'
+        :type method: string
+        :return: resistivity model on the new mesh
+        :rtype: np.ndarray
+
+        """
+        regridder = ModelRegridder(
+            self.model_obj.grid_east,
+            self.model_obj.grid_north,
+            self.model_obj.grid_z,
+            target_obj.grid_east,
+            target_obj.grid_north,
+            target_obj.grid_z,
+            method=method,
+        )
+        return regridder.regrid(self.get_res_model())
+
+    def get_seed_request(self, zooms=None):
+        """
+        get the tile cache, bounds and zoom levels to seed basemap tiles for
+        the location map, None if there is no location map
+        """
+        if self.cx_source is None or self.data_obj is None:
+            print("Need a data file and a tile source to seed tiles")
+            return None
+        basemap = self.get_basemap()
+        lonlat_bounds, zooms = basemap.get_seed_bounds(zooms)
+        return basemap.tile_cache, lonlat_bounds, zooms
+
     def set_north_index(self):
         self.north_index = int(self.north_slider.value())
         northing = self.model_obj.grid_north[self.north_index] / self.scale
@@ -1267,41 +1967,29 @@ class ModelWidget(QtWidgets.QWidget):
         ylim = self.north_ax.get_ylim()
         xlim = self.north_ax.get_xlim()
         self.north_ax.cla()
-        self.north_ax.plot(
-            self.north_east_line_xlist,
-            self.north_east_line_ylist,
-            lw=0.25,
-            color="k",
-        )
-        self.north_ax.plot(
-            self.north_z_line_xlist,
-            self.north_z_line_ylist,
-            lw=0.25,
-            color="k",
-        )
-        self.north_ax.pcolormesh(
-            self.plot_east_z,
-            self.plot_z_east,
-            np.log10(self.new_res_model[self.north_index, :, :]),
-            cmap=self.cmap,
-            vmin=self.res_limits[0],
-            vmax=self.res_limits[1],
-        )
-
-        line = self.get_stations_north()
-
-        if line is not None:
+        self.north_ax.set_ylim(ylim)
+        self.north_ax.set_xlim(xlim)
+        add_grid_lines(self.north_ax, self.north_grid_lines)
+        data, cmap, limits = self.get_slice_data("north", self.north_index)
+        self.north_lod.set_data(data, cmap=cmap, vmin=limits[0], vmax=limits[1])
+
+        station_index = self.station_index
+        if station_index is not None:
+            rows = station_index.get_north_rows(self.north_index)
+            east = station_index.east[rows] / self.scale
+            north = station_index.north[rows] / self.scale
+            elevation = station_index.elevation[rows] / self.scale
             self.north_ax.scatter(
-                line.model_east / self.scale,
-                line.model_elevation / self.scale,
+                east,
+                elevation,
                 marker="v",
                 c="cyan",
                 s=50,
                 edgecolors="k",
             )
             self.location_ax.scatter(
-                line.model_east / self.scale,
-                line.model_north / self.scale,
+                east,
+                north,
                 marker="v",
                 c="k",
                 s=30,
@@ -1309,17 +1997,10 @@ class ModelWidget(QtWidgets.QWidget):
             )
             self.location_canvas.draw()
 
-            for ss in line.itertuples():
-                self.north_ax.text(
-                    ss.model_east / self.scale,
-                    ss.model_elevation / self.scale - 0.2,
-                    ss.station,
-                    va="bottom",
-                    ha="center",
-                    fontdict={"weight": "bold", "size": 10},
-                    clip_on=True,
-                    bbox={"boxstyle": "square", "ec": "k", "fc": "w"},
-                )
+            self.north_labels.set_data(
+                east, elevation - 0.2, station_index.station[rows]
+            )
+            self.north_ax.add_artist(self.north_labels)
 
         self.north_ax.set_xlabel("Easting {0}".format(self.units))
         self.north_ax.set_ylabel("Elevation {0}".format(self.units))
@@ -1327,6 +2008,24 @@ class ModelWidget(QtWidgets.QWidget):
         self.north_ax.set_xlim(xlim)
         self.north_canvas.draw()
 
+    @property
+    def station_index(self):
+        """
+        index of stations close to each grid line, built the first time it
+        is needed after a new model or data file is read.
+        """
+        if self.station_locations is None or self.model_obj is None:
+            return None
+        if self._station_index is None:
+            self._station_index = StationIndex(
+                self.station_locations,
+                self.model_obj.grid_east,
+                self.model_obj.grid_north,
+                self.model_obj.cell_size_east,
+                self.model_obj.cell_size_north,
+            )
+        return self._station_index
+
     def get_stations_north(self):
         """
         get stations close to the line north
@@ -1335,19 +2034,8 @@ class ModelWidget(QtWidgets.QWidget):
         None.
 
         """
-        ymin = (
-            self.model_obj.grid_north[self.north_index]
-            - self.model_obj.cell_size_north
-        )
-        ymax = (
-            self.model_obj.grid_north[self.north_index]
-            + self.model_obj.cell_size_north
-        )
-        if self.station_locations is not None:
-            return self.station_locations.loc[
-                (self.station_locations.model_north >= ymin)
-                & (self.station_locations.model_north <= ymax)
-            ]
+        if self.station_index is not None:
+            return self.station_index.get_north_stations(self.north_index)
 
         else:
             return None
@@ -1360,39 +2048,49 @@ class ModelWidget(QtWidgets.QWidget):
         None.
 
         """
-        xmin = (
-            self.model_obj.grid_east[self.east_index]
-            - self.model_obj.cell_size_east
-        )
-        xmax = (
-            self.model_obj.grid_east[self.east_index]
-            + self.model_obj.cell_size_east
-        )
-        if self.station_locations is not None:
-            return self.station_locations.loc[
-                (self.station_locations.model_east >= xmin)
-                & (self.station_locations.model_east <= xmax)
-            ]
+        if self.station_index is not None:
+            return self.station_index.get_east_stations(self.east_index)
 
         else:
             return None
 
     def redraw_cb(self):
         """
-        redraw the colorbar
+        redraw the colorbar and the plots
+        """
+        self.draw_cb()
+        self.redraw_plots()
+
+    def draw_cb(self):
+        """
+        draw the colorbar for the current display
         """
         self.cb_ax.cla()
         self.make_cb()
+        cmap, limits = self.get_cb_params()
         self.cb_ax.pcolormesh(
             self.cb_x,
             self.cb_y,
             self.cb_bar,
-            vmin=self.res_limits[0],
-            vmax=self.res_limits[1],
-            cmap=self.cmap,
+            vmin=limits[0],
+            vmax=limits[1],
+            cmap=cmap,
             picker=5,
             shading="auto",
         )
+        if self.show_difference:
+            # the difference is shown as the log10 ratio itself
+            self.cb_ax.set_yticks(np.linspace(limits[0], limits[1], num=9))
+            self.cb_ax.set_yticklabels(
+                [
+                    "{0:.2g}".format(ii)
+                    for ii in np.linspace(limits[0], limits[1], num=9)
+                ]
+            )
+            self.cb_ax.set_ylabel("Log10(Model / Comparison)")
+            self.cb_canvas.draw()
+            return
+
         self.cb_ax.set_yticks(
             np.arange(
                 self._res_limits[0],
@@ -1416,62 +2114,163 @@ class ModelWidget(QtWidgets.QWidget):
             picker=5,
         )
         self.cb_canvas.draw()
-        self.redraw_plots()
 
     def map_on_pick(self, eclick, erelease):
         """
         on selecting a rectangle change the colors to the resistivity values
         """
-        x1, y1 = eclick.xdata, eclick.ydata
-        x2, y2 = erelease.xdata, erelease.ydata
-
-        x_change = self._get_change_index(x1, x2, self.model_obj.grid_east)
-        y_change = self._get_change_index(y1, y2, self.model_obj.grid_north)
-
-        # reset values of resistivity
-        for xx in x_change:
-            for yy in y_change:
-                if self.model_obj.res_model[yy, xx, self.map_index] < 1e10:
-                    self.new_res_model[yy, xx, self.map_index] = self.res_value
-        self.redraw_plots()
+        selection = self._get_rectangle_selection(
+            "map",
+            eclick,
+            erelease,
+            self.model_obj.grid_east,
+            self.model_obj.grid_north,
+        )
+        self.paint_selection(selection, self.map_index)
 
     def east_on_pick(self, eclick, erelease):
         """
         on selecting a rectangle change the colors to the resistivity values
         """
-        x1, y1 = eclick.xdata, eclick.ydata
-        x2, y2 = erelease.xdata, erelease.ydata
+        selection = self._get_rectangle_selection(
+            "east",
+            eclick,
+            erelease,
+            self.model_obj.grid_north,
+            self.model_obj.grid_z,
+        )
+        self.paint_selection(selection, self.east_index)
 
-        x_change = self._get_change_index(x1, x2, self.model_obj.grid_north)
-        y_change = self._get_change_index(y1, y2, self.model_obj.grid_z)
+    def north_on_pick(self, eclick, erelease):
+        """
+        on selecting a rectangle change the colors to the resistivity values
+        """
+        selection = self._get_rectangle_selection(
+            "north",
+            eclick,
+            erelease,
+            self.model_obj.grid_east,
+            self.model_obj.grid_z,
+        )
+        self.paint_selection(selection, self.north_index)
 
-        # reset values of resistivity
-        for xx in x_change:
-            for yy in y_change:
-                if self.model_obj.res_model[xx, self.east_index, yy] < 1e10:
-                    self.new_res_model[xx, self.east_index, yy] = self.res_value
+    def map_on_polygon(self, vertices):
+        """
+        paint the cells inside a polygon or lasso in map view
+        """
+        self.paint_selection(
+            self.painter.polygon_selection("map", vertices), self.map_index
+        )
 
-        self.redraw_plots()
+    def east_on_polygon(self, vertices):
+        """
+        paint the cells inside a polygon or lasso in the N-S section
+        """
+        self.paint_selection(
+            self.painter.polygon_selection("east", vertices), self.east_index
+        )
 
-    def north_on_pick(self, eclick, erelease):
+    def north_on_polygon(self, vertices):
         """
-        on selecting a rectangle change the colors to the resistivity values
+        paint the cells inside a polygon or lasso in the E-W section
+        """
+        self.paint_selection(
+            self.painter.polygon_selection("north", vertices), self.north_index
+        )
+
+    def _get_rectangle_selection(
+        self, orientation, eclick, erelease, x_grid, y_grid
+    ):
+        """
+        get a box or circle selection from a rectangle selector
         """
         x1, y1 = eclick.xdata, eclick.ydata
         x2, y2 = erelease.xdata, erelease.ydata
 
-        x_change = self._get_change_index(x1, x2, self.model_obj.grid_east)
-        y_change = self._get_change_index(y1, y2, self.model_obj.grid_z)
+        if self.brush == "Circle":
+            return self.painter.circle_selection(
+                orientation, (x1, y1), np.hypot(x2 - x1, y2 - y1)
+            )
 
-        # reset values of resistivity
-        for xx in x_change:
-            for yy in y_change:
-                if self.model_obj.res_model[self.north_index, xx, yy] < 1e10:
-                    self.new_res_model[self.north_index, xx, yy] = (
-                        self.res_value
-                    )
+        x_change = self._get_change_index(x1, x2, x_grid)
+        y_change = self._get_change_index(y1, y2, y_grid)
+        return self.painter.box_selection(orientation, x_change, y_change)
 
-        self.redraw_plots()
+    def paint_selection(self, selection, slice_index):
+        """
+        paint a selection through the volume given by paint_extent around
+        slice_index, either setting res_value or scaling by paint_factor
+        """
+        normal_slice = slice(
+            max(slice_index - self.paint_extent[0], 0),
+            slice_index + self.paint_extent[1] + 1,
+        )
+        if self.paint_mode == "Scale":
+            index = self.painter.paint(
+                self.new_res_model,
+                selection,
+                normal_slice,
+                factor=self.paint_factor,
+            )
+        else:
+            index = self.painter.paint(
+                self.new_res_model,
+                selection,
+                normal_slice,
+                value=self.res_value,
+            )
+        if index is not None:
+            self.model_edited(index)
+
+    def set_brush(self, brush):
+        """
+        set the brush used to select cells
+        """
+        self.brush = str(brush)
+        if self.brush != "Region":
+            self.clear_region()
+        for key, selector_list in self.selectors.items():
+            if key == self.brush:
+                continue
+            for selector in selector_list:
+                selector.set_active(False)
+        for selector in self.selectors.get(self.brush, []):
+            selector.set_active(True)
+
+    def set_paint_mode(self, paint_mode):
+        """
+        set whether to set values or scale them
+        """
+        self.paint_mode = str(paint_mode)
+
+    def set_paint_factor(self):
+        """
+        set the multiplicative scale factor used in Scale mode
+        """
+        paint_factor = float(str(self.paint_factor_edit.text()))
+        if paint_factor <= 0:
+            # resistivity has to stay positive, and log10 of it finite
+            print("Scale factor has to be greater than 0")
+        else:
+            self.paint_factor = paint_factor
+        self.paint_factor_edit.setText("{0:.3g}".format(self.paint_factor))
+
+    def set_paint_extent(self):
+        """
+        set the number of cells before and after the current slice to paint
+        """
+        self.paint_extent = (
+            max(
+                int(round(float(str(self.paint_extent_before_edit.text())))), 0
+            ),
+            max(int(round(float(str(self.paint_extent_after_edit.text())))), 0),
+        )
+        self.paint_extent_before_edit.setText(
+            "{0:.0f}".format(self.paint_extent[0])
+        )
+        self.paint_extent_after_edit.setText(
+            "{0:.0f}".format(self.paint_extent[1])
+        )
 
     def _get_change_index(self, y1, y2, grid_dir):
         """
@@ -1502,6 +2301,298 @@ class ModelWidget(QtWidgets.QWidget):
 
         return ychange
 
+    def model_edited(self, index=None):
+        """
+        call after new_res_model is edited to clear anything computed from
+        the model and redraw
+
+        :param index: region that was edited made of slices, None if the
+         whole model may have changed
+        :type index: tuple
+
+        """
+        if self.layer_histogram is not None:
+            self.layer_histogram.update(self.new_res_model, index)
+        if self.slice_cache is not None:
+            if self.slice_cache.res_model is not self.new_res_model:
+                self.slice_cache.reset(self.new_res_model)
+            else:
+                self.slice_cache.invalidate(index)
+        if self.region_grow is not None:
+            self.region_grow.reset()
+        if self.model_difference is not None:
+            self.model_difference.reset(self.new_res_model)
+        # a region was grown on the model before the edit, drop it so it is
+        # not applied again or reported by the layer stats
+        self.region = None
+        self.clear_region()
+        self.redraw_plots()
+        self.stats_changed.emit()
+
+    def get_slice_data(self, orientation, index):
+        """
+        Get the values to plot on a slice for the current display, either
+        log10 resistivity of the edited or comparison model or the log10
+        ratio of the two.
+
+        :return: data (n_x, n_y) in plot orientation, colormap and limits
+        :rtype: np.ndarray, string, tuple
+
+        """
+        if self.show_difference:
+            data = self.model_difference.get_slice(orientation, index)
+            cmap = self.difference_cmap
+            limits = self.difference_limits
+        elif (
+            self.display == "Comparison" and self.compare_res_model is not None
+        ):
+            data = np.log10(self.compare_res_model[SLICES[orientation](index)])
+            cmap = self.cmap
+            limits = self.res_limits
+        elif self.log_space:
+            # already log10, no need to cache
+            data = self.new_res_model[SLICES[orientation](index)]
+            cmap = self.cmap
+            limits = self.res_limits
+        else:
+            data = self.slice_cache.get(orientation, index)
+            cmap = self.cmap
+            limits = self.res_limits
+        if orientation == "map":
+            data = data.T
+        return data, cmap, limits
+
+    def set_compare_fn(self, compare_fn):
+        """
+        Read a model on the same mesh to compare against.  The model is
+        memory mapped when it comes from the model cache so it does not
+        need to be read into memory.
+        """
+        if self.model_obj is None:
+            print("Need to open a model file before a comparison model")
+            return
+        compare_obj = ModEMModelCache(compare_fn).read_model(
+            use_cache=self.use_model_cache
+        )
+        for name in ["grid_east", "grid_north", "grid_z"]:
+            grid = getattr(self.model_obj, name)
+            compare_grid = getattr(compare_obj, name)
+            if grid.shape != compare_grid.shape or not np.allclose(
+                grid, compare_grid
+            ):
+                print(f"Comparison model {compare_fn} is not on the same mesh")
+                return
+
+        self.compare_res_model = compare_obj.res_model
+        self.model_difference = ModelDifference(
+            self.new_res_model, self.compare_res_model, log_space=self.log_space
+        )
+        self.display_combo.setEnabled(True)
+        self.set_display("Difference")
+
+    def set_display(self, display):
+        """
+        show the edited model, the comparison model or their difference,
+        the views stay on the same slices and zoom
+        """
+        self.display = str(display)
+        self.display_combo.setCurrentText(self.display)
+        self.redraw_cb()
+
+    def export_difference(self, fn):
+        """
+        write the full log10 ratio volume to a .npy file
+        """
+        if self.model_difference is None:
+            print("Need to open a comparison model first")
+            return
+        self.model_difference.export(fn)
+        print(f"Wrote difference to {fn}")
+
+    def get_layer_stats(self):
+        """
+        histogram and percentiles of the current map layer and of the
+        selected region, see :meth:`ModelStats.plot`
+        """
+        if self.layer_histogram is None:
+            return None
+        bin_edges = self.layer_histogram.bin_edges
+        counts = self.layer_histogram.get_histogram(self.map_index)
+        stats = {
+            "bin_edges": bin_edges,
+            "counts": counts,
+            "percentiles": get_percentiles(counts, bin_edges),
+            "title": "Depth {0:.2f} {1}".format(
+                self.model_obj.grid_z[self.map_index] / self.scale,
+                self.units,
+            ),
+        }
+        if self.region is not None:
+            region_counts = self.layer_histogram.get_region_histogram(
+                *self.region
+            )
+            stats["region_counts"] = region_counts
+            stats["region_percentiles"] = get_percentiles(
+                region_counts, bin_edges
+            )
+        return stats
+
+    def region_on_click(self, event):
+        """
+        pick the seed cell of a region when the brush is Region
+        """
+        if self.brush != "Region" or event.inaxes is None:
+            return
+        if event.button != 1 or event.xdata is None:
+            return
+        toolbar = getattr(event.canvas, "toolbar", None)
+        if toolbar is not None and toolbar.mode:
+            return
+
+        if event.inaxes is self.map_ax:
+            orientation = "map"
+            slice_index = self.map_index
+        elif event.inaxes is self.east_ax:
+            orientation = "east"
+            slice_index = self.east_index
+        elif event.inaxes is self.north_ax:
+            orientation = "north"
+            slice_index = self.north_index
+        else:
+            return
+
+        x_axis, y_axis, normal_axis = ORIENTATIONS[orientation]
+        nodes = self.get_plot_nodes()
+        seed = [0, 0, 0]
+        seed[normal_axis] = slice_index
+        for axis, value in [(x_axis, event.xdata), (y_axis, event.ydata)]:
+            seed[axis] = int(
+                np.clip(
+                    np.searchsorted(nodes[axis], value, side="right") - 1,
+                    0,
+                    nodes[axis].size - 2,
+                )
+            )
+        self.region_seed = (tuple(seed), orientation)
+        self.update_region()
+
+    def get_plot_nodes(self):
+        """
+        (north, east, z) nodes in plot units
+        """
+        return [
+            self.model_obj.grid_north / self.scale,
+            self.model_obj.grid_east / self.scale,
+            self.model_obj.grid_z / self.scale,
+        ]
+
+    def update_region(self):
+        """
+        grow the region from the seed and show it on the current slices
+        """
+        self.clear_region()
+        if self.region_seed is None or self.region_grow is None:
+            return
+        seed, orientation = self.region_seed
+        self.region = self.region_grow.get_region(
+            self.new_res_model,
+            seed,
+            self.region_tolerance,
+            orientation=orientation if self.region_dimension == "2D" else None,
+        )
+        if self.region is None:
+            return
+
+        for ax, view, slice_index in [
+            (self.map_ax, "map", self.map_index),
+            (self.east_ax, "east", self.east_index),
+            (self.north_ax, "north", self.north_index),
+        ]:
+            self._draw_region(ax, view, slice_index)
+        for canvas in [self.map_canvas, self.east_canvas, self.north_canvas]:
+            canvas.draw_idle()
+        self.stats_changed.emit()
+
+    def _draw_region(self, ax, orientation, slice_index):
+        """
+        shade the cells of the region in the slice shown on ax
+        """
+        index, mask = self.region
+        x_axis, y_axis, normal_axis = ORIENTATIONS[orientation]
+        normal = index[normal_axis]
+        if not normal.start <= slice_index < normal.stop:
+            return
+        region_slice = mask.take(slice_index - normal.start, axis=normal_axis)
+        if x_axis > y_axis:
+            region_slice = region_slice.T
+        if not region_slice.any():
+            return
+
+        nodes = self.get_plot_nodes()
+        x_slice, y_slice = index[x_axis], index[y_axis]
+        self.region_artists.append(
+            ax.pcolormesh(
+                nodes[x_axis][x_slice.start : x_slice.stop + 1],
+                nodes[y_axis][y_slice.start : y_slice.stop + 1],
+                np.ma.masked_where(~region_slice.T, region_slice.T),
+                cmap=ListedColormap(["w"]),
+                alpha=0.5,
+            )
+        )
+
+    def clear_region(self):
+        """
+        remove the region shading
+        """
+        for artist in self.region_artists:
+            try:
+                artist.remove()
+            except (ValueError, NotImplementedError):
+                # already removed by ax.cla()
+                pass
+        self.region_artists = []
+
+    def apply_region(self):
+        """
+        set or scale the cells in the region in one assignment
+        """
+        if self.region is None:
+            return
+        index, mask = self.region
+        if self.paint_mode == "Scale":
+            index = self.painter.paint_mask(
+                self.new_res_model, index, mask, factor=self.paint_factor
+            )
+        else:
+            index = self.painter.paint_mask(
+                self.new_res_model, index, mask, value=self.res_value
+            )
+        self.region_seed = None
+        if index is not None:
+            self.model_edited(index)
+        else:
+            self.clear_region()
+            self.region = None
+
+    def set_region_tolerance(self):
+        """
+        set the tolerance in log10 resistivity and grow the region again
+        """
+        self.region_tolerance = abs(
+            float(str(self.region_tolerance_edit.text()))
+        )
+        self.region_tolerance_edit.setText(
+            "{0:.3g}".format(self.region_tolerance)
+        )
+        self.update_region()
+
+    def set_region_dimension(self, dimension):
+        """
+        grow the region in 3D or only in the slice that was clicked
+        """
+        self.region_dimension = str(dimension)
+        self.update_region()
+
     def redraw_plots(self):
         """
         redraw all plots
@@ -1590,33 +2681,23 @@ class ModelWidget(QtWidgets.QWidget):
         x_index, y_index = np.meshgrid(x_range, y_range)
         for zz in range(self.new_res_model.shape[2]):
             self.new_res_model[:, :, zz] = self.mask_elevation_cells(
-                self.new_res_model[:, :, zz]
+                self.new_res_model[:, :, zz], zz
+            )
+            # average linear resistivity whether or not the model is log10
+            res_layer = ModEMModelCache.to_linear(
+                self.new_res_model[:, :, zz], self.log_space
             )
             avg_res_value = np.mean(
                 [
-                    np.median(self.new_res_model[x_index, y_index, zz]),
-                    np.median(
-                        self.new_res_model[
-                            avg_range:-avg_range, 0:avg_range, zz
-                        ]
-                    ),
-                    np.median(
-                        self.new_res_model[
-                            avg_range:-avg_range, -avg_range:, zz
-                        ]
-                    ),
-                    np.median(
-                        self.new_res_model[
-                            0:avg_range, avg_range:-avg_range, zz
-                        ]
-                    ),
-                    np.median(
-                        self.new_res_model[
-                            -avg_range:, avg_range:-avg_range, zz
-                        ]
-                    ),
+                    np.median(res_layer[x_index, y_index]),
+                    np.median(res_layer[avg_range:-avg_range, 0:avg_range]),
+                    np.median(res_layer[avg_range:-avg_range, -avg_range:]),
+                    np.median(res_layer[0:avg_range, avg_range:-avg_range]),
+                    np.median(res_layer[-avg_range:, avg_range:-avg_range]),
                 ]
             )
+            if self.log_space:
+                avg_res_value = np.log10(avg_res_value)
 
             # self.new_res_model[x_index, y_index, zz] = avg_res_value
             self.new_res_model[:, -n_pad:, zz] = avg_res_value
@@ -1625,10 +2706,9 @@ class ModelWidget(QtWidgets.QWidget):
             self.new_res_model[-n_pad:, n_pad:-n_pad, zz] = avg_res_value
 
         ### need to elevation
-        elev_index = np.where(self.model_obj.res_model > 1e10)
-        self.new_res_model[elev_index] = 1e12
+        self.cell_mask.protect(self.new_res_model)
 
-        self.redraw_plots()
+        self.model_edited()
 
     def undo_tools(self):
         """
@@ -1636,7 +2716,7 @@ class ModelWidget(QtWidgets.QWidget):
         """
 
         self.undo()
-        self.redraw_plots()
+        self.model_edited()
 
     def set_smooth_params(self):
         """
@@ -1662,25 +2742,37 @@ class ModelWidget(QtWidgets.QWidget):
         for zz in range(self.new_res_model.shape[2]):
             ### need to take into account elevation cells
             self.new_res_model[:, :, zz] = self.mask_elevation_cells(
-                self.new_res_model[:, :, zz]
+                self.new_res_model[:, :, zz], zz
             )
-            self.new_res_model[:, :, zz] = np.exp(
-                signal.convolve(
-                    np.log(self.new_res_model[:, :, zz]), gauss, mode="same"
+            if self.log_space:
+                self.new_res_model[:, :, zz] = signal.convolve(
+                    self.new_res_model[:, :, zz], gauss, mode="same"
+                )
+            else:
+                self.new_res_model[:, :, zz] = np.exp(
+                    signal.convolve(
+                        np.log(self.new_res_model[:, :, zz]), gauss, mode="same"
+                    )
                 )
-            )
         ### need to elevation
-        elev_index = np.where(self.model_obj.res_model > 1e10)
-        self.new_res_model[elev_index] = 1e12
+        self.cell_mask.protect(self.new_res_model)
 
-        self.redraw_plots()
+        self.model_edited()
 
-    def mask_elevation_cells(self, res_array):
+    def mask_elevation_cells(self, res_array, z_index):
         """
         remove the effect of elevation cells
         """
-        mean_value = res_array[np.where(res_array < 1e10)].mean()
-        res_array[np.where(res_array > 1e10)] = mean_value
+        if not self.cell_mask.has_masked(z_index):
+            return res_array
+        layer_mask = self.cell_mask.get((slice(None), slice(None), z_index))
+        # mean of linear resistivity whether or not the model is log10
+        fill_value = ModEMModelCache.to_linear(
+            res_array[~layer_mask], self.log_space
+        ).mean()
+        if self.log_space:
+            fill_value = np.log10(fill_value)
+        res_array[layer_mask] = fill_value
 
         return res_array
 
@@ -1702,9 +2794,10 @@ class ModelWidget(QtWidgets.QWidget):
             self.new_res_model[:, :, self.map_index].reshape(o_shape)
         )
 
-        # self.new_res_model[np.where(self.model_obj.res_model > 1E10)] = 1E12
+        index = (slice(None), slice(None), slice(self.map_index, copy_index))
+        self.cell_mask.protect(self.new_res_model, index)
 
-        self.redraw_plots()
+        self.model_edited(index)
 
     def map_copy_up(self):
         """
@@ -1718,9 +2811,10 @@ class ModelWidget(QtWidgets.QWidget):
         self.new_res_model[:, :, copy_index : self.map_index] = (
             self.new_res_model[:, :, self.map_index].reshape(o_shape)
         )
-        self.new_res_model[np.where(self.model_obj.res_model > 1e10)] = 1e12
+        index = (slice(None), slice(None), slice(copy_index, self.map_index))
+        self.cell_mask.protect(self.new_res_model, index)
 
-        self.redraw_plots()
+        self.model_edited(index)
 
     def set_map_copy_num(self):
         """
@@ -1745,9 +2839,10 @@ class ModelWidget(QtWidgets.QWidget):
             self.new_res_model[:, self.east_index, :].reshape(o_shape)
         )
 
-        self.new_res_model[np.where(self.model_obj.res_model > 1e10)] = 1e12
+        index = (slice(None), slice(self.east_index, copy_index), slice(None))
+        self.cell_mask.protect(self.new_res_model, index)
 
-        self.redraw_plots()
+        self.model_edited(index)
 
     def east_copy_west(self):
         """
@@ -1763,9 +2858,10 @@ class ModelWidget(QtWidgets.QWidget):
             self.new_res_model[:, self.east_index, :].reshape(o_shape)
         )
 
-        self.new_res_model[np.where(self.model_obj.res_model > 1e10)] = 1e12
+        index = (slice(None), slice(copy_index, self.east_index), slice(None))
+        self.cell_mask.protect(self.new_res_model, index)
 
-        self.redraw_plots()
+        self.model_edited(index)
 
     def set_east_copy_num(self):
         """
@@ -1783,15 +2879,16 @@ class ModelWidget(QtWidgets.QWidget):
         o_shape = (1, self.new_res_model.shape[1], self.new_res_model.shape[2])
 
         copy_index = self.north_index - (self.north_copy_num + 1)
-        if copy_index > self.new_res_model.shape[0]:
-            copy_index = self.new_res_model.shape[0]
+        if copy_index < 0:
+            copy_index = 0
 
         self.new_res_model[copy_index : self.north_index, :, :] = (
             self.new_res_model[self.north_index, :, :].reshape(o_shape)
         )
-        self.new_res_model[np.where(self.model_obj.res_model > 1e10)] = 1e12
+        index = (slice(copy_index, self.north_index), slice(None), slice(None))
+        self.cell_mask.protect(self.new_res_model, index)
 
-        self.redraw_plots()
+        self.model_edited(index)
 
     def north_copy_north(self):
         """
@@ -1806,9 +2903,10 @@ class ModelWidget(QtWidgets.QWidget):
         self.new_res_model[self.north_index : copy_index :, :, :] = (
             self.new_res_model[self.north_index, :, :].reshape(o_shape)
         )
-        self.new_res_model[np.where(self.model_obj.res_model > 1e10)] = 1e12
+        index = (slice(self.north_index, copy_index), slice(None), slice(None))
+        self.cell_mask.protect(self.new_res_model, index)
 
-        self.redraw_plots()
+        self.model_edited(index)
 
     def set_north_copy_num(self):
         """
@@ -27,20 +27,52 @@ from matplotlib.backends.backend_qt5agg import (
     NavigationToolbar2QT as NavigationToolbar,
 )
 from matplotlib.figure import Figure
-from matplotlib.patches import Ellipse
 from matplotlib.colors import Normalize
 import matplotlib.colorbar as mcb
 import matplotlib.gridspec as gridspec
 import matplotlib.colors as colors
 from matplotlib import cm
 
-import mtpy.modeling.modem as modem
 import mtpy.imaging.mtplottools as mtplottools
-import mtpy.analysis.pt as mtpt
-import mtpy.utils.exceptions as mtex
 
 import mtpy.imaging.mtcolors as mtcl
-import mtpy.analysis.niblettbostick as mtnb
+
+from mtpy_gui.modeling.data_store import (
+    get_data_store,
+    read_modem_data,
+    read_modem_model,
+)
+from mtpy_gui.modeling.phase_tensor import (
+    stack_mt_dict,
+    get_pt_array,
+    get_residual_pt_array,
+)
+from mtpy_gui.modeling.niblett_bostick import (
+    get_nb_depth,
+    get_average_depth,
+    NBDepthCache,
+)
+from mtpy_gui.modeling.pt_map_export import export_pt_maps
+from mtpy_gui.modeling.pt_grid import (
+    GRID_PARAMETERS,
+    get_parameter,
+    make_grid,
+    get_station_interpolator,
+)
+from mtpy_gui.modeling.pt_map import (
+    get_ellipse_state,
+    get_arrow_state,
+    get_depth_index,
+    add_ellipses,
+    set_ellipses,
+    add_arrows,
+    set_arrows,
+    ModelRaster,
+)
+from mtpy_gui.modeling.pt_profile import (
+    get_profile_projection,
+    get_section_state,
+)
 
 try:
     _fromUtf8 = QtCore.QString.fromUtf8
@@ -125,6 +157,12 @@ class ModEMPlotPTMap(
         self.res_limits = (-1, 4)
         self.res_cmap = "jet_r"
 
+        # draw the model slice or a gridded parameter under the ellipses,
+        # see mtpy_gui.modeling.pt_grid.GRID_PARAMETERS
+        self.map_layer = "model"
+        self.grid_cmap = "viridis"
+        self.grid_n_cells = 200
+
         # --> set the ellipse properties -------------------
 
         self.subplot_right = 0.99
@@ -138,6 +176,39 @@ class ModEMPlotPTMap(
         self.pt_data_arr = None
         self.pt_resp_arr = None
         self.pt_resid_arr = None
+        # phase tensors that could be computed, Re(Z) is not singular
+        self.pt_data_valid = None
+        self.pt_resp_valid = None
+        self.pt_resid_valid = None
+
+        # ellipse and arrow arrays of every period for each panel and the
+        # artists they are shown in, built by plot
+        self.period_state = None
+        self.pt_artists = None
+        self.depth_index = None
+        # the model slice of each depth is rendered once and shared by the
+        # images of every panel
+        self.model_raster = None
+        self.model_raster_key = None
+        self.model_images = []
+        # average niblett-bostick depth of each period and the key of the
+        # data file it was estimated from
+        self.depth_array = None
+        self.depth_key = None
+        # (image, values, valid) of each panel when map_layer is gridded
+        self.grid_images = []
+        self.station_interpolator = None
+        # (cmap, norm, label) of the colorbars, used to export
+        self.pt_colorbar = None
+        self.residual_colorbar = None
+        self.export_thread = None
+        # polyline drawn on the map in map units, stations within
+        # profile_buffer of it are shown in the pseudo-section
+        self.ax_list = []
+        self.profile_vertices = []
+        self.profile_lines = []
+        self.profile_buffer = 5000.0 / self.dscale
+        self.pseudo_section = None
 
         self.dir_path = os.getcwd()
 
@@ -193,6 +264,7 @@ class ModEMPlotPTMap(
         # this is the Navigation widget
         # it takes the Canvas widget and a parent
         self.mpl_toolbar = NavigationToolbar(self.mpl_widget, self)
+        self.mpl_widget.mpl_connect("button_press_event", self.on_profile_click)
 
         # set the layout for the plot
         mpl_vbox = QtWidgets.QVBoxLayout()
@@ -258,10 +330,16 @@ class ModEMPlotPTMap(
         self.action_save = QtWidgets.QAction(self)
         self.action_save.setText("Save")
 
+        # export the maps of every period
+        self.action_export = QtWidgets.QAction(self)
+        self.action_export.setText("Export All Periods")
+        self.action_export.triggered.connect(self.export_all_periods)
+
         # add the action on the menu tab
         self.menu_data_file.addAction(self.action_data_open)
         self.menu_data_file.addAction(self.action_close)
         self.menu_data_file.addAction(self.action_save)
+        self.menu_data_file.addAction(self.action_export)
         self.menubar.addAction(self.menu_data_file.menuAction())
 
         self.action_resp_open = QtWidgets.QAction(self)
@@ -287,6 +365,26 @@ class ModEMPlotPTMap(
         self.action_plot_stations.toggled.connect(self.set_plot_stations)
         self.menu_display.addAction(self.action_plot_stations)
 
+        # choose what is drawn under the phase tensors
+        self.menu_map_layer = self.menu_display.addMenu("Map Layer")
+        self.map_layer_group = QtWidgets.QActionGroup(self)
+        self.map_layer_group.setExclusive(True)
+        for layer, text in [("model", "Model Slice")] + [
+            (key, key.replace("_", " ").title()) for key in GRID_PARAMETERS
+        ]:
+            action = QtWidgets.QAction(text, self.map_layer_group)
+            action.setCheckable(True)
+            action.setChecked(layer == self.map_layer)
+            action.setData(layer)
+            self.menu_map_layer.addAction(action)
+        self.map_layer_group.triggered.connect(self.set_map_layer)
+
+        self.action_draw_profile = QtWidgets.QAction(self)
+        self.action_draw_profile.setText("Draw Profile")
+        self.action_draw_profile.setCheckable(True)
+        self.action_draw_profile.toggled.connect(self.set_draw_profile)
+        self.menu_display.addAction(self.action_draw_profile)
+
         self.menubar.addAction(self.menu_display.menuAction())
 
         # be sure to connnect all slots first
@@ -307,8 +405,8 @@ class ModEMPlotPTMap(
 
         fn = os.path.abspath(fn)
 
-        self.modem_data = modem.Data()
-        self.modem_data.read_data_file(fn)
+        # shared with other windows that opened the file, only read from
+        self.modem_data = get_data_store().get(fn, read_modem_data)
         self.modem_data_fn = fn
 
         self.dir_path = os.path.dirname(fn)
@@ -321,6 +419,8 @@ class ModEMPlotPTMap(
             ]
         )
 
+        # the figure is rebuilt for the new data on the next period
+        self.pt_artists = None
         self.list_widget.clear()
 
         # this will add the station name for each station to the qwidget list
@@ -348,9 +448,9 @@ class ModEMPlotPTMap(
             )[0]
         )
         fn = os.path.abspath(fn)
-        self.modem_model = modem.Model()
-        self.modem_model.read_model_file(fn)
+        self.modem_model = get_data_store().get(fn, read_modem_model)
         self.modem_model_fn = fn
+        self.model_raster = None
         self.get_depth_array()
         self.plot()
 
@@ -359,7 +459,10 @@ class ModEMPlotPTMap(
         get the station name from the clicked station
         """
         self.plot_period = "{0:.5f}".format(float(str(widget_item.text())))
-        self.plot()
+        if self.pt_artists is None:
+            self.plot()
+        else:
+            self.update_period()
 
     def get_resp_fn(self):
         """
@@ -375,8 +478,7 @@ class ModEMPlotPTMap(
             )[0]
         )
 
-        self.modem_resp = modem.Data()
-        self.modem_resp.read_data_file(fn)
+        self.modem_resp = get_data_store().get(fn, read_modem_data)
         self.modem_resp_fn = fn
         self._get_pt()
         self.plot()
@@ -408,147 +510,47 @@ class ModEMPlotPTMap(
 
         self.plot()
 
+    def set_map_layer(self, action):
+        """
+        draw the model slice or a gridded parameter under the ellipses
+        """
+        self.map_layer = action.data()
+        if self.pt_data_arr is not None:
+            self.plot()
+
     def _get_pt(self):
         """
-        put pt parameters into something useful for plotting
+        put pt parameters into something useful for plotting, all stations
+        are computed at once from stacked impedance and tipper arrays
         """
-        ns = len(list(self.modem_data.mt_dict.keys()))
-        nf = len(self.modem_data.period_list)
-
-        data_pt_arr = np.zeros(
-            (nf, ns),
-            dtype=[
-                ("phimin", float),
-                ("phimax", float),
-                ("skew", float),
-                ("azimuth", float),
-                ("east", float),
-                ("north", float),
-                ("txr", float),
-                ("tyr", float),
-                ("txi", float),
-                ("tyi", float),
-            ],
-        )
-        if self.modem_resp_fn is not None:
-            model_pt_arr = np.zeros(
-                (nf, ns),
-                dtype=[
-                    ("phimin", float),
-                    ("phimax", float),
-                    ("skew", float),
-                    ("azimuth", float),
-                    ("east", float),
-                    ("north", float),
-                    ("txr", float),
-                    ("tyr", float),
-                    ("txi", float),
-                    ("tyi", float),
-                ],
-            )
+        keys = list(self.modem_data.mt_dict.keys())
+        z, tipper, east, north = stack_mt_dict(self.modem_data.mt_dict, keys)
+        east /= self.dscale
+        north /= self.dscale
 
-            res_pt_arr = np.zeros(
-                (nf, ns),
-                dtype=[
-                    ("phimin", float),
-                    ("phimax", float),
-                    ("skew", float),
-                    ("azimuth", float),
-                    ("east", float),
-                    ("north", float),
-                    ("geometric_mean", float),
-                    ("txr", float),
-                    ("tyr", float),
-                    ("txi", float),
-                    ("tyi", float),
-                ],
-            )
+        data_pt_arr, data_phi, self.pt_data_valid = get_pt_array(
+            z, tipper, east, north
+        )
 
-        for ii, key in enumerate(self.modem_data.mt_dict.keys()):
-            east = self.modem_data.mt_dict[key].grid_east / self.dscale
-            north = self.modem_data.mt_dict[key].grid_north / self.dscale
-            dpt = self.modem_data.mt_dict[key].pt
-            data_pt_arr[:, ii]["east"] = east
-            data_pt_arr[:, ii]["north"] = north
-            data_pt_arr[:, ii]["phimin"] = dpt.phimin
-            data_pt_arr[:, ii]["phimax"] = dpt.phimax
-            data_pt_arr[:, ii]["azimuth"] = dpt.azimuth
-            data_pt_arr[:, ii]["skew"] = dpt.beta
-
-            # compute tipper data
-            tip = self.modem_data.mt_dict[key].Tipper
-            tip.compute_mag_direction()
-
-            data_pt_arr[:, ii]["txr"] = tip.mag_real * np.sin(
-                np.deg2rad(tip.angle_real)
-            )
-            data_pt_arr[:, ii]["tyr"] = tip.mag_real * np.cos(
-                np.deg2rad(tip.angle_real)
-            )
-            data_pt_arr[:, ii]["txi"] = tip.mag_imag * np.sin(
-                np.deg2rad(tip.angle_imag)
+        if self.modem_resp_fn is not None:
+            m_z, m_tipper, _, _ = stack_mt_dict(self.modem_resp.mt_dict, keys)
+            model_pt_arr, model_phi, self.pt_resp_valid = get_pt_array(
+                m_z, m_tipper, east, north
             )
-            data_pt_arr[:, ii]["tyi"] = tip.mag_imag * np.cos(
-                np.deg2rad(tip.angle_imag)
+            res_pt_arr, self.pt_resid_valid = get_residual_pt_array(
+                data_phi,
+                model_phi,
+                data_pt_arr,
+                model_pt_arr,
+                valid=self.pt_data_valid & self.pt_resp_valid,
             )
-            if self.modem_resp_fn is not None:
-                mpt = self.modem_resp.mt_dict[key].pt
-
-                model_pt_arr[:, ii]["east"] = east
-                model_pt_arr[:, ii]["north"] = north
-                model_pt_arr[:, ii]["phimin"] = mpt.phimin
-                model_pt_arr[:, ii]["phimax"] = mpt.phimax
-                model_pt_arr[:, ii]["azimuth"] = mpt.azimuth
-                model_pt_arr[:, ii]["skew"] = mpt.beta
-
-                mtip = self.modem_resp.mt_dict[key].Tipper
-                mtip.compute_mag_direction()
-
-                model_pt_arr[:, ii]["txr"] = mtip.mag_real * np.sin(
-                    np.deg2rad(mtip.angle_real)
-                )
-                model_pt_arr[:, ii]["tyr"] = mtip.mag_real * np.cos(
-                    np.deg2rad(mtip.angle_real)
-                )
-                model_pt_arr[:, ii]["txi"] = mtip.mag_imag * np.sin(
-                    np.deg2rad(mtip.angle_imag)
-                )
-                model_pt_arr[:, ii]["tyi"] = mtip.mag_imag * np.cos(
-                    np.deg2rad(mtip.angle_imag)
-                )
-                try:
-                    rpt = mtpt.ResidualPhaseTensor(
-                        pt_object1=dpt, pt_object2=mpt
-                    )
-                    rpt = rpt.residual_pt
-
-                    res_pt_arr[:, ii]["phimin"] = rpt.phimin
-                    res_pt_arr[:, ii]["phimax"] = rpt.phimax
-                    res_pt_arr[:, ii]["azimuth"] = rpt.azimuth
-                    res_pt_arr[:, ii]["skew"] = rpt.beta
-                    res_pt_arr[:, ii]["geometric_mean"] = np.sqrt(
-                        abs(rpt.phimin * rpt.phimax)
-                    )
-
-                except mtex.MTpyError_PT:
-                    print(
-                        "Could not calculate residual PT for {0}".format(key)
+            n_invalid = (~self.pt_resid_valid).sum()
+            if n_invalid > 0:
+                print(
+                    "Could not calculate residual PT for {0} of {1} "
+                    "periods and stations".format(
+                        n_invalid, self.pt_resid_valid.size
                     )
-
-                res_pt_arr[:, ii]["east"] = east
-                res_pt_arr[:, ii]["north"] = north
-
-                res_pt_arr[:, ii]["txr"] = (
-                    data_pt_arr[:, ii]["txr"] - model_pt_arr[:, ii]["txr"]
-                )
-                res_pt_arr[:, ii]["tyr"] = (
-                    data_pt_arr[:, ii]["tyr"] - model_pt_arr[:, ii]["tyr"]
-                )
-                res_pt_arr[:, ii]["txi"] = (
-                    data_pt_arr[:, ii]["txi"] - model_pt_arr[:, ii]["txi"]
-                )
-                res_pt_arr[:, ii]["tyi"] = (
-                    data_pt_arr[:, ii]["tyi"] - model_pt_arr[:, ii]["tyi"]
                 )
 
         # make these attributes
@@ -562,49 +564,31 @@ class ModEMPlotPTMap(
         """
         estimate a niblett-bostick depth from the impedance tensors
 
-        find the average depth for each station at each period
+        find the average depth of all stations at each period, the depths
+        are cached next to the data file
         """
         if self.modem_data.mt_dict is None:
             return
 
-        d_arr_min = np.zeros(
-            (
-                self.modem_data.period_list.shape[0],
-                len(list(self.modem_data.mt_dict.keys())),
-            )
-        )
-        d_arr_max = np.zeros(
-            (
-                self.modem_data.period_list.shape[0],
-                len(list(self.modem_data.mt_dict.keys())),
-            )
-        )
-        #        print self.modem_data.mt_dict[self.modem_data.mt_dict.keys()[0]].Z.z
-        for ii, mt_key in enumerate(sorted(self.modem_data.mt_dict.keys())):
-            mt_obj = self.modem_data.mt_dict[mt_key]
-            d_arr = mtnb.calculate_depth_nb(z_object=mt_obj.Z)
-
-            d_arr_min[:, ii] = d_arr["depth_min"]
-            d_arr_max[:, ii] = d_arr["depth_max"]
-
-        # average only the non zero terms
-        d_avg_min = np.array(
-            [
-                d_arr_min[kk, np.nonzero(d_arr_min[kk, :])].mean()
-                for kk in range(d_arr_min.shape[0])
-            ]
-        )
-        d_avg_max = np.array(
-            [
-                d_arr_max[kk, np.nonzero(d_arr_max[kk, :])].mean()
-                for kk in range(d_arr_min.shape[0])
-            ]
-        )
-
-        # find the average and leave in meters cause grid_z is in meters
-        d_avg = np.nan_to_num(((d_avg_min + d_avg_max) / 2.0))
+        depth_cache = NBDepthCache(self.modem_data_fn)
+        key = (self.modem_data_fn, depth_cache.key)
+        if self.depth_array is not None and self.depth_key == key:
+            return
 
-        self.depth_array = d_avg
+        period_list = self.modem_data.period_list
+        depth_array = depth_cache.read(period_list)
+        if depth_array is None:
+            z, _, _, _ = stack_mt_dict(self.modem_data.mt_dict)
+            d_arr_min, d_arr_max = get_nb_depth(z, period_list)
+            # leave in meters cause grid_z is in meters
+            depth_array = get_average_depth(d_arr_min, d_arr_max)
+            try:
+                depth_cache.write(depth_array, period_list)
+            except OSError as error:
+                print(f"Could not write depth cache because {error}")
+
+        self.depth_array = depth_array
+        self.depth_key = key
 
     def plot(self):
         """
@@ -657,10 +641,80 @@ class ModEMPlotPTMap(
             north_max = self.pt_data_arr["north"].max() + self.pad_north
 
             self.ns_limits = (north_min, north_max)
-        # -------------plot phase tensors------------------------------------
-        data_ii = self.period_dict[self.plot_period]
-        print("Ploting period {0}".format(data_ii))
+        # -------------get ellipses and arrows of every period---------------
+        arr_dir = (-1) ** self.arrow_direction
+        data_mask = ~(
+            (self.pt_data_arr["phimin"] == 0)
+            & (self.pt_data_arr["phimax"] == 0)
+        )
+        panels = [
+            (
+                self.pt_data_arr,
+                data_mask,
+                90 - self.pt_data_arr["azimuth"],
+                self.pt_data_arr[self.ellipse_colorby],
+                self.ellipse_colorby,
+                self.ellipse_cmap,
+            )
+        ]
+        if self.modem_resp_fn is not None:
+            rcmin = np.floor(self.pt_resid_arr["geometric_mean"].min())
+            rcmax = np.floor(self.pt_resid_arr["geometric_mean"].max())
+            # residuals are plotted where the response is
+            resp_mask = ~(
+                (self.pt_resp_arr["phimin"] == 0)
+                & (self.pt_resp_arr["phimax"] == 0)
+            )
+            panels.append(
+                (
+                    self.pt_resp_arr,
+                    resp_mask,
+                    90 - self.pt_resp_arr["azimuth"],
+                    self.pt_resp_arr[self.ellipse_colorby],
+                    self.ellipse_colorby,
+                    self.ellipse_cmap,
+                )
+            )
+            panels.append(
+                (
+                    self.pt_resid_arr,
+                    resp_mask,
+                    self.pt_resid_arr["azimuth"],
+                    self.pt_resid_arr["geometric_mean"],
+                    "geometric_mean",
+                    self.residual_cmap,
+                )
+            )
+
+        # ellipses are scaled by the largest phimax of the data
+        phimax = self.pt_data_arr["phimax"].max(axis=1)
+        self.period_state = [
+            (
+                get_ellipse_state(
+                    pt_arr,
+                    mask,
+                    angles,
+                    color_values,
+                    colorby,
+                    cmap,
+                    ckmin,
+                    ckmax,
+                    bounds=bounds,
+                    phimax=phimax,
+                    ellipse_size=self.ellipse_size,
+                ),
+                get_arrow_state(
+                    pt_arr,
+                    arrow_size=self.arrow_size,
+                    arrow_head_length=self.arrow_head_length,
+                    arrow_threshold=self.arrow_threshold,
+                    arr_dir=arr_dir,
+                ),
+            )
+            for pt_arr, mask, angles, color_values, colorby, cmap in panels
+        ]
 
+        # -------------plot phase tensors------------------------------------
         self.figure.clf()
 
         if self.modem_resp_fn is not None:
@@ -677,337 +731,91 @@ class ModEMPlotPTMap(
         else:
             axd = self.figure.add_subplot(gs[0, :], aspect="equal")
             ax_list = [axd]
+        self.ax_list = ax_list
 
-        arr_dir = (-1) ** self.arrow_direction
-
-        # plot model below the phase tensors
+        # plot model below the phase tensors, the raster of the depth is
+        # filled in for each period
+        self.model_images = []
         if self.modem_model_fn is not None:
-            # self.get_depth_array()
-            if self.depth_array[data_ii] == 0:
-                print(
-                    "Could not estimate depth for period {0:.5g}".format(
-                        float(self.plot_period)
-                    )
-                )
-                d_index = 0
-            else:
-                try:
-                    d_index = np.where(
-                        self.modem_model.grid_z >= self.depth_array[data_ii]
-                    )[0][0]
-
-                    print(
-                        "Estimated depth for period {0:.5g} is {1:.2f} m".format(
-                            float(self.plot_period), self.depth_array[data_ii]
-                        )
-                    )
-
-                    self.depth_text.setText(
-                        "{0:.5g}".format(self.depth_array[data_ii])
-                    )
-
-                except IndexError:
-                    print(
-                        "Could not estimate depth for period {0:.2f}".format(
-                            float(self.plot_period)
-                        )
-                    )
-                    d_index = 0
-
-            # need to add an extra row and column to east and north to make sure
-            # all is plotted see pcolor for details.
-            plot_east = self.modem_model.grid_east / self.dscale
-            plot_north = self.modem_model.grid_north / self.dscale
-
-            # make a mesh grid for plotting
-            # the 'ij' makes sure the resulting grid is in east, north
-            self.mesh_east, self.mesh_north = np.meshgrid(
-                plot_east, plot_north, indexing="ij"
+            self.depth_index = get_depth_index(
+                self.modem_model.grid_z, self.depth_array
             )
 
-            for ax in ax_list:
-                plot_res = np.log10(
-                    self.modem_model.res_model[:, :, d_index].T
-                )
-                ax.pcolormesh(
-                    self.mesh_east,
-                    self.mesh_north,
-                    plot_res,
+        if self.modem_model_fn is not None and self.map_layer == "model":
+            # rasters are kept between plots unless the model or how it is
+            # drawn changes
+            raster_key = (
+                tuple(self.ew_limits),
+                tuple(self.ns_limits),
+                self.dscale,
+                self.res_cmap,
+                tuple(self.res_limits),
+            )
+            if self.model_raster is None or self.model_raster_key != raster_key:
+                self.model_raster = ModelRaster(
+                    self.modem_model.grid_east / self.dscale,
+                    self.modem_model.grid_north / self.dscale,
+                    self.modem_model.res_model,
+                    self.ew_limits,
+                    self.ns_limits,
                     cmap=self.res_cmap,
                     vmin=self.res_limits[0],
                     vmax=self.res_limits[1],
                 )
+                self.model_raster_key = raster_key
 
-        # --> plot data phase tensors
-        for pt in self.pt_data_arr[data_ii]:
-            if pt["phimin"] == 0 and pt["phimax"] == 0:
-                pass
-            else:
-                eheight = (
-                    pt["phimin"]
-                    / self.pt_data_arr[data_ii]["phimax"].max()
-                    * self.ellipse_size
+            for ax in ax_list:
+                self.model_images.append(self.model_raster.add_image(ax))
+
+        east = self.pt_data_arr["east"][0]
+        north = self.pt_data_arr["north"][0]
+
+        # or a gridded parameter, the interpolation operator is only built
+        # when the stations or limits change
+        self.grid_images = []
+        if self.map_layer != "model":
+            grid_east, grid_north = make_grid(
+                self.ew_limits, self.ns_limits, self.grid_n_cells
+            )
+            self.station_interpolator = get_station_interpolator(
+                east, north, grid_east, grid_north
+            )
+            layers = [
+                get_parameter(panel[0], self.map_layer) for panel in panels
+            ]
+            for ii, (ax, (values, valid)) in enumerate(zip(ax_list, layers)):
+                # data and response share a color scale
+                vmin, vmax = self._get_grid_limits(
+                    layers[:2] if ii < 2 else layers[2:]
                 )
-                ewidth = (
-                    pt["phimax"]
-                    / self.pt_data_arr[data_ii]["phimax"].max()
-                    * self.ellipse_size
+                image = ax.imshow(
+                    np.full(self.station_interpolator.shape, np.nan),
+                    extent=self.station_interpolator.extent,
+                    origin="lower",
+                    cmap=self.grid_cmap,
+                    vmin=vmin,
+                    vmax=vmax,
+                    interpolation="nearest",
                 )
-
-                ellipse = Ellipse(
-                    (pt["east"], pt["north"]),
-                    width=ewidth,
-                    height=eheight,
-                    angle=90 - pt["azimuth"],
+                self.grid_images.append((image, values, valid))
+
+        # one collection of ellipses and one quiver for each set of arrows
+        self.pt_artists = []
+        for ax in ax_list:
+            ellipses = add_ellipses(ax, east, north)
+            arrows = [
+                add_arrows(
+                    ax,
+                    east,
+                    north,
+                    color,
+                    arrow_head_width=self.arrow_head_width,
+                    arrow_head_length=self.arrow_head_length,
+                    lw=self.arrow_lw,
                 )
-
-                # get ellipse color
-                if self.ellipse_cmap.find("seg") > 0:
-                    ellipse.set_facecolor(
-                        mtcl.get_plot_color(
-                            pt[self.ellipse_colorby],
-                            self.ellipse_colorby,
-                            self.ellipse_cmap,
-                            ckmin,
-                            ckmax,
-                            bounds=bounds,
-                        )
-                    )
-                else:
-                    ellipse.set_facecolor(
-                        mtcl.get_plot_color(
-                            pt[self.ellipse_colorby],
-                            self.ellipse_colorby,
-                            self.ellipse_cmap,
-                            ckmin,
-                            ckmax,
-                        )
-                    )
-
-                axd.add_artist(ellipse)
-
-            # -----------Plot Induction Arrows---------------------------
-            if pt["txr"] != 0.0:
-                real_mag = np.sqrt(abs(pt["txr"]) ** 2 + abs(pt["tyr"]) ** 2)
-                imag_mag = np.sqrt(abs(pt["txi"]) ** 2 + abs(pt["tyi"]) ** 2)
-                # plot real tipper
-                if real_mag <= self.arrow_threshold:
-                    axd.arrow(
-                        pt["east"],
-                        pt["north"],
-                        self.arrow_size * pt["txr"] * arr_dir,
-                        self.arrow_size * pt["tyr"] * arr_dir,
-                        lw=self.arrow_lw,
-                        facecolor=self.arrow_color_real,
-                        edgecolor=self.arrow_color_real,
-                        length_includes_head=False,
-                        head_width=self.arrow_head_width,
-                        head_length=self.arrow_head_length,
-                    )
-                else:
-                    pass
-
-                # plot imaginary tipper
-                if imag_mag <= self.arrow_threshold:
-                    axd.arrow(
-                        pt["east"],
-                        pt["north"],
-                        self.arrow_size * pt["txi"] * arr_dir,
-                        self.arrow_size * pt["tyi"] * arr_dir,
-                        lw=self.arrow_lw,
-                        facecolor=self.arrow_color_imag,
-                        edgecolor=self.arrow_color_imag,
-                        length_includes_head=False,
-                        head_width=self.arrow_head_width,
-                        head_length=self.arrow_head_length,
-                    )
-                else:
-                    pass
-
-        # -----------plot response phase tensors---------------
-        if self.modem_resp_fn is not None:
-            rcmin = np.floor(self.pt_resid_arr["geometric_mean"].min())
-            rcmax = np.floor(self.pt_resid_arr["geometric_mean"].max())
-            for mpt, rpt in zip(
-                self.pt_resp_arr[data_ii], self.pt_resid_arr[data_ii]
-            ):
-                if mpt["phimin"] == 0 and mpt["phimax"] == 0:
-                    pass
-                else:
-                    eheight = (
-                        mpt["phimin"]
-                        / self.pt_data_arr[data_ii]["phimax"].max()
-                        * self.ellipse_size
-                    )
-                    ewidth = (
-                        mpt["phimax"]
-                        / self.pt_data_arr[data_ii]["phimax"].max()
-                        * self.ellipse_size
-                    )
-
-                    ellipsem = Ellipse(
-                        (mpt["east"], mpt["north"]),
-                        width=ewidth,
-                        height=eheight,
-                        angle=90 - mpt["azimuth"],
-                    )
-
-                    # get ellipse color
-                    if self.ellipse_cmap.find("seg") > 0:
-                        ellipsem.set_facecolor(
-                            mtcl.get_plot_color(
-                                mpt[self.ellipse_colorby],
-                                self.ellipse_colorby,
-                                self.ellipse_cmap,
-                                ckmin,
-                                ckmax,
-                                bounds=bounds,
-                            )
-                        )
-                    else:
-                        ellipsem.set_facecolor(
-                            mtcl.get_plot_color(
-                                mpt[self.ellipse_colorby],
-                                self.ellipse_colorby,
-                                self.ellipse_cmap,
-                                ckmin,
-                                ckmax,
-                            )
-                        )
-
-                    axm.add_artist(ellipsem)
-
-                # -----------Plot Induction Arrows---------------------------
-                if mpt["txr"] != 0.0:
-                    real_mag = np.sqrt(
-                        abs(mpt["txr"]) ** 2 + abs(mpt["tyr"]) ** 2
-                    )
-                    imag_mag = np.sqrt(
-                        abs(mpt["txi"]) ** 2 + abs(mpt["tyi"]) ** 2
-                    )
-                    # plot real tipper
-                    if real_mag <= self.arrow_threshold:
-                        axm.arrow(
-                            mpt["east"],
-                            mpt["north"],
-                            self.arrow_size * mpt["txr"] * arr_dir,
-                            self.arrow_size * mpt["tyr"] * arr_dir,
-                            lw=self.arrow_lw,
-                            facecolor=self.arrow_color_real,
-                            edgecolor=self.arrow_color_real,
-                            length_includes_head=False,
-                            head_width=self.arrow_head_width,
-                            head_length=self.arrow_head_length,
-                        )
-                    else:
-                        pass
-
-                    # plot imaginary tipper
-                    if imag_mag <= self.arrow_threshold:
-                        axm.arrow(
-                            mpt["east"],
-                            mpt["north"],
-                            self.arrow_size * mpt["txi"] * arr_dir,
-                            self.arrow_size * mpt["tyi"] * arr_dir,
-                            lw=self.arrow_lw,
-                            facecolor=self.arrow_color_imag,
-                            edgecolor=self.arrow_color_imag,
-                            length_includes_head=False,
-                            head_width=self.arrow_head_width,
-                            head_length=self.arrow_head_length,
-                        )
-                    else:
-                        pass
-
-                # -----------plot residual phase tensors---------------
-                if mpt["phimin"] == 0 and mpt["phimax"] == 0:
-                    pass
-                else:
-                    eheight = (
-                        rpt["phimin"]
-                        / self.pt_data_arr[data_ii]["phimax"].max()
-                        * self.ellipse_size
-                    )
-                    ewidth = (
-                        rpt["phimax"]
-                        / self.pt_data_arr[data_ii]["phimax"].max()
-                        * self.ellipse_size
-                    )
-
-                    ellipser = Ellipse(
-                        (rpt["east"], rpt["north"]),
-                        width=ewidth,
-                        height=eheight,
-                        angle=rpt["azimuth"],
-                    )
-
-                    # get ellipse color
-                    rpt_color = np.sqrt(abs(rpt["phimin"] * rpt["phimax"]))
-                    if self.ellipse_cmap.find("seg") > 0:
-                        ellipser.set_facecolor(
-                            mtcl.get_plot_color(
-                                rpt_color,
-                                "geometric_mean",
-                                self.residual_cmap,
-                                ckmin,
-                                ckmax,
-                                bounds=bounds,
-                            )
-                        )
-                    else:
-                        ellipser.set_facecolor(
-                            mtcl.get_plot_color(
-                                rpt_color,
-                                "geometric_mean",
-                                self.residual_cmap,
-                                ckmin,
-                                ckmax,
-                            )
-                        )
-
-                    axr.add_artist(ellipser)
-
-                # -----------Plot Induction Arrows---------------------------
-                if rpt["txr"] != 0.0:
-                    real_mag = np.sqrt(
-                        abs(rpt["txr"]) ** 2 + abs(rpt["tyr"]) ** 2
-                    )
-                    imag_mag = np.sqrt(
-                        abs(rpt["txi"]) ** 2 + abs(rpt["tyi"]) ** 2
-                    )
-                    # plot real tipper
-                    if real_mag <= self.arrow_threshold:
-                        axr.arrow(
-                            rpt["east"],
-                            rpt["north"],
-                            self.arrow_size * rpt["txr"] * arr_dir,
-                            self.arrow_size * rpt["tyr"] * arr_dir,
-                            lw=self.arrow_lw,
-                            facecolor=self.arrow_color_real,
-                            edgecolor=self.arrow_color_real,
-                            length_includes_head=False,
-                            head_width=self.arrow_head_width,
-                            head_length=self.arrow_head_length,
-                        )
-                    else:
-                        pass
-
-                    # plot imaginary tipper
-                    if imag_mag <= self.arrow_threshold:
-                        axr.arrow(
-                            rpt["east"],
-                            rpt["north"],
-                            self.arrow_size * rpt["txi"] * arr_dir,
-                            self.arrow_size * rpt["tyi"] * arr_dir,
-                            lw=self.arrow_lw,
-                            facecolor=self.arrow_color_imag,
-                            edgecolor=self.arrow_color_imag,
-                            length_includes_head=False,
-                            head_width=self.arrow_head_width,
-                            head_length=self.arrow_head_length,
-                        )
-                    else:
-                        pass
+                for color in [self.arrow_color_real, self.arrow_color_imag]
+            ]
+            self.pt_artists.append((ellipses, arrows[0], arrows[1]))
 
         # --> set axes properties
         # data
@@ -1075,6 +883,11 @@ class ModEMPlotPTMap(
         cb_pt.ax.xaxis.set_label_coords(0.5, 1.75)
         cb_pt.set_label(mtplottools.ckdict[self.ellipse_colorby])
         cb_pt.set_ticks([ckmin, (ckmax - ckmin) / 2, ckmax])
+        self.pt_colorbar = (
+            cb_pt.cmap,
+            cb_pt.norm,
+            mtplottools.ckdict[self.ellipse_colorby],
+        )
 
         axd.text(
             self.ew_limits[0] * 0.95,
@@ -1176,6 +989,11 @@ class ModEMPlotPTMap(
                     cb_ptr.ax.xaxis.set_label_coords(0.5, 1.75)
                     cb_ptr.set_label(r"$\sqrt{\Phi_{min} \Phi_{max}}$")
                     cb_ptr.set_ticks([rcmin, (rcmax - rcmin) / 2, rcmax])
+                    self.residual_colorbar = (
+                        cb_ptr.cmap,
+                        cb_ptr.norm,
+                        r"$\sqrt{\Phi_{min} \Phi_{max}}$",
+                    )
                     ax.text(
                         self.ew_limits[0] * 0.95,
                         self.ns_limits[1] * 0.95,
@@ -1186,7 +1004,7 @@ class ModEMPlotPTMap(
                         fontdict={"size": self.font_size + 1},
                     )
 
-        if self.modem_model_fn is not None:
+        if self.model_images:
             for ax in ax_list:
                 ax.tick_params(direction="out")
                 bb = ax.axes.get_position().bounds
@@ -1223,6 +1041,32 @@ class ModEMPlotPTMap(
                     [mtplottools.labeldict[ctk] for ctk in cb_ticks]
                 )
 
+        if self.grid_images:
+            for ax, (image, _, _) in zip(ax_list, self.grid_images):
+                ax.tick_params(direction="out")
+                bb = ax.axes.get_position().bounds
+                y1 = 0.25 * (
+                    2
+                    - (self.ns_limits[1] - self.ns_limits[0])
+                    / (self.ew_limits[1] - self.ew_limits[0])
+                )
+                cb_position = (
+                    3.0 * bb[2] / 5 + bb[0],
+                    y1 * self.cb_res_pad,
+                    0.35 * bb[2],
+                    0.02,
+                )
+                cbax = self.figure.add_axes(cb_position)
+                cb_grid = mcb.ColorbarBase(
+                    cbax,
+                    cmap=image.get_cmap(),
+                    norm=image.norm,
+                    orientation="horizontal",
+                )
+                cb_grid.ax.xaxis.set_label_position("top")
+                cb_grid.ax.xaxis.set_label_coords(0.5, 1.5)
+                cb_grid.set_label(GRID_PARAMETERS[self.map_layer][0])
+
         if self.plot_stations == True:
             for ax in ax_list:
                 for (
@@ -1238,10 +1082,417 @@ class ModEMPlotPTMap(
                         clip_on=True,
                     )
 
-        # draw plot
+        # redraw the profile and pseudo-section for the new settings
+        if self.profile_vertices:
+            self.draw_profile_lines()
+            if (
+                self.pseudo_section is not None
+                and self.pseudo_section.isVisible()
+            ):
+                self.plot_pseudo_section()
+
+        # fill in the period and draw plot
+        self.update_period()
+
+    @staticmethod
+    def _get_grid_limits(layers):
+        """
+        2nd and 98th percentile of the valid values of all periods
+        """
+        values = np.concatenate([values[valid] for values, valid in layers])
+        if values.size == 0:
+            return 0, 1
+        vmin, vmax = np.percentile(values, [2, 98])
+        if vmin == vmax:
+            vmax = vmin + 1
+        return vmin, vmax
+
+    def update_period(self):
+        """
+        show plot_period by swapping the arrays of the artists made by plot
+        """
+        data_ii = self.period_dict[self.plot_period]
+        print("Ploting period {0}".format(data_ii))
+
+        if self.modem_model_fn is not None:
+            depth = self.depth_array[data_ii]
+            if depth == 0 or depth > self.modem_model.grid_z.max():
+                print(
+                    "Could not estimate depth for period {0:.5g}".format(
+                        float(self.plot_period)
+                    )
+                )
+            else:
+                print(
+                    "Estimated depth for period {0:.5g} is {1:.2f} m".format(
+                        float(self.plot_period), depth
+                    )
+                )
+                self.depth_text.setText("{0:.5g}".format(depth))
+
+        if self.model_images:
+            raster = self.model_raster.get(self.depth_index[data_ii])
+            for image in self.model_images:
+                image.set_data(raster)
+
+        for image, values, valid in self.grid_images:
+            image.set_data(
+                self.station_interpolator.interpolate(
+                    values[data_ii], valid[data_ii]
+                )
+            )
+
+        for (ellipses, real_arrows, imag_arrows), (
+            ellipse_state,
+            arrow_state,
+        ) in zip(self.pt_artists, self.period_state):
+            set_ellipses(ellipses, ellipse_state, data_ii)
+            set_arrows(real_arrows, arrow_state["real"], data_ii)
+            set_arrows(imag_arrows, arrow_state["imag"], data_ii)
+
+        self.mpl_widget.draw()
+
+    # ==========================================================================
+    # pseudo-section along a profile
+    # ==========================================================================
+    def set_draw_profile(self, toggled):
+        """
+        start a new profile, left click adds points and right or double
+        click finishes it
+        """
+        if not toggled:
+            return
+        self.profile_vertices = []
+        self.draw_profile_lines()
+        self.mpl_widget.draw_idle()
+        self.statusbar.showMessage(
+            "Left click to add profile points, right click to finish"
+        )
+
+    def on_profile_click(self, event):
+        if not self.action_draw_profile.isChecked():
+            return
+        # leave clicks to the toolbar when zooming or panning
+        if event.inaxes not in self.ax_list or self.mpl_toolbar.mode:
+            return
+
+        if event.button == 1 and not event.dblclick:
+            self.profile_vertices.append((event.xdata, event.ydata))
+            self.draw_profile_lines()
+            self.mpl_widget.draw_idle()
+        elif event.button == 3 or event.dblclick:
+            if len(self.profile_vertices) < 2:
+                print("Need at least 2 points to make a profile")
+                return
+            self.action_draw_profile.setChecked(False)
+            self.statusbar.clearMessage()
+            self.plot_pseudo_section()
+
+    def draw_profile_lines(self):
+        """
+        draw the profile on every map
+        """
+        for line in self.profile_lines:
+            if line.axes is not None:
+                line.remove()
+        self.profile_lines = []
+        if not self.profile_vertices:
+            return
+        east, north = np.array(self.profile_vertices).T
+        for ax in self.ax_list:
+            (line,) = ax.plot(
+                east, north, color="k", ls="--", lw=1.5, marker="o", ms=4
+            )
+            self.profile_lines.append(line)
+
+    def plot_pseudo_section(self):
+        """
+        plot the phase tensors of stations near the profile against period
+        """
+        if self.period_state is None:
+            return
+        projection = get_profile_projection(
+            self.pt_data_arr["east"][0],
+            self.pt_data_arr["north"][0],
+            self.profile_vertices,
+            self.profile_buffer,
+        )
+        if projection.station_index.size == 0:
+            print(
+                "No stations within {0:.5g} {1} of the profile".format(
+                    self.profile_buffer, self.map_scale
+                )
+            )
+            return
+
+        stations = list(self.modem_data.mt_dict.keys())
+        if self.pseudo_section is None:
+            self.pseudo_section = PTPseudoSection()
+        self.pseudo_section.plot(
+            projection,
+            [
+                get_section_state(
+                    projection, ellipse_state, arrow_state, self.period_list
+                )
+                for ellipse_state, arrow_state in self.period_state
+            ],
+            [stations[ii] for ii in projection.station_index],
+            self.period_list,
+            map_scale=self.map_scale,
+            font_size=self.font_size,
+            arrow_color_real=self.arrow_color_real,
+            arrow_color_imag=self.arrow_color_imag,
+            arrow_head_width=self.arrow_head_width,
+            arrow_head_length=self.arrow_head_length,
+            arrow_lw=self.arrow_lw,
+            ellipse_size=self.ellipse_size,
+        )
+        self.pseudo_section.show()
+        self.pseudo_section.raise_()
+
+    def get_export_kwargs(self, save_format="png"):
+        """
+        get the arrays and figure options to export every period with
+        :func:`mtpy_gui.modeling.pt_map_export.export_pt_maps`
+        """
+        options = {
+            "east": self.pt_data_arr["east"][0],
+            "north": self.pt_data_arr["north"][0],
+            "ew_limits": self.ew_limits,
+            "ns_limits": self.ns_limits,
+            "map_scale": self.map_scale,
+            "font_size": self.font_size,
+            "figsize": tuple(self.figure.get_size_inches()),
+            "dpi": self.figure.dpi,
+            "arrow_color_real": self.arrow_color_real,
+            "arrow_color_imag": self.arrow_color_imag,
+            "arrow_head_width": self.arrow_head_width,
+            "arrow_head_length": self.arrow_head_length,
+            "arrow_lw": self.arrow_lw,
+            "pt_colorbar": self.pt_colorbar,
+            "residual_colorbar": self.residual_colorbar,
+        }
+        kwargs = {
+            "period_list": self.period_list,
+            "period_state": self.period_state,
+            "options": options,
+            "save_format": save_format,
+            "depth_array": self.depth_array,
+            "metadata": {
+                "data_fn": self.modem_data_fn,
+                "resp_fn": self.modem_resp_fn,
+                "model_fn": self.modem_model_fn,
+            },
+        }
+
+        if self.model_images:
+            # the raster of each depth is only sent to the workers once
+            d_index, slice_index = np.unique(
+                self.depth_index, return_inverse=True
+            )
+            kwargs["model_slices"] = np.stack(
+                [self.model_raster.get(ii) for ii in d_index]
+            )
+            kwargs["slice_index"] = slice_index
+            options.update(
+                {
+                    "model_extent": self.model_raster.extent,
+                    "res_cmap": self.res_cmap,
+                    "res_limits": self.res_limits,
+                }
+            )
+        return kwargs
+
+    def export_all_periods(self):
+        """
+        save the maps of every period to a directory in a process pool
+        """
+        if self.pt_artists is None:
+            print("Need to open a data file and plot a period before exporting")
+            return
+        if self.export_thread is not None and self.export_thread.isRunning():
+            print("Still exporting, try again when it is done")
+            return
+
+        save_dir = QtWidgets.QFileDialog.getExistingDirectory(
+            self, "Choose directory to save PT maps to", self.dir_path
+        )
+        if not save_dir:
+            return
+        save_format, ok = QtWidgets.QInputDialog.getItem(
+            self,
+            "Export All Periods",
+            "Format:",
+            ["png", "pdf", "svg"],
+            0,
+            False,
+        )
+        if not ok:
+            return
+
+        self.export_thread = PTMapExportThread(
+            save_dir, self.get_export_kwargs(save_format)
+        )
+        self.export_thread.progress.connect(self.update_export_progress)
+        self.export_thread.export_finished.connect(self.export_finished)
+        self.export_thread.export_failed.connect(self.export_failed)
+        self.action_export.setEnabled(False)
+        self.export_thread.start()
+
+    def update_export_progress(self, n_done, n_total):
+        self.statusbar.showMessage(f"Exported {n_done} of {n_total} periods")
+
+    def export_finished(self, manifest_fn):
+        self.action_export.setEnabled(True)
+        self.statusbar.showMessage(f"Exported PT maps, see {manifest_fn}", 5000)
+        print(f"Exported PT maps, see {manifest_fn}")
+
+    def export_failed(self, message):
+        self.action_export.setEnabled(True)
+        self.statusbar.showMessage("Export failed", 5000)
+        print(f"Could not export PT maps because {message}")
+
+
+class PTPseudoSection(QtWidgets.QWidget):
+    """
+    Phase tensor pseudo-section of the stations along a profile, one panel
+    each for data, model and residual.
+    """
+
+    panel_names = ["Data", "Model", "Residual"]
+
+    def __init__(self):
+        super().__init__()
+        self.setWindowTitle("Phase Tensor Pseudo-Section")
+
+        self.figure = Figure(dpi=150)
+        self.mpl_widget = FigureCanvas(self.figure)
+        self.mpl_widget.setSizePolicy(
+            QtWidgets.QSizePolicy.Expanding, QtWidgets.QSizePolicy.Expanding
+        )
+        self.mpl_toolbar = NavigationToolbar(self.mpl_widget, self)
+
+        layout = QtWidgets.QVBoxLayout()
+        layout.addWidget(self.mpl_toolbar)
+        layout.addWidget(self.mpl_widget)
+        self.setLayout(layout)
+        self.resize(1000, 800)
+
+    def plot(
+        self,
+        projection,
+        section_states,
+        stations,
+        period_list,
+        map_scale="km",
+        font_size=7,
+        arrow_color_real="k",
+        arrow_color_imag="b",
+        arrow_head_width=0.35,
+        arrow_head_length=0.35,
+        arrow_lw=1,
+        ellipse_size=1,
+    ):
+        """
+        plot the section states of each panel
+
+        :param projection: stations in the profile
+        :type projection: :class:`mtpy_gui.modeling.pt_profile.ProfileProjection`
+        :param section_states: (x, y, ellipse state, arrow state) of each
+         panel from :func:`mtpy_gui.modeling.pt_profile.get_section_state`
+        :type section_states: list
+        :param stations: names of the stations along the profile
+        :type stations: list
+        :param period_list: periods of the rows of the states
+        :type period_list: np.ndarray
+
+        """
+        self.figure.clf()
+        axes = self.figure.subplots(
+            len(section_states), 1, sharex=True, sharey=True, squeeze=False
+        ).ravel()
+
+        log_period = np.log10(period_list)
+        y_ticks = np.arange(
+            np.floor(log_period.min()), np.ceil(log_period.max()) + 1
+        )
+        pad = ellipse_size
+        for ii, (ax, (x, y, ellipse_state, arrow_state)) in enumerate(
+            zip(axes, section_states)
+        ):
+            # sizes are in distance units so the ellipses keep their shape
+            ellipses = add_ellipses(ax, x, y, units="x")
+            set_ellipses(ellipses, ellipse_state, 0)
+            for key, color in [
+                ("real", arrow_color_real),
+                ("imag", arrow_color_imag),
+            ]:
+                arrows = add_arrows(
+                    ax,
+                    x,
+                    y,
+                    color,
+                    arrow_head_width=arrow_head_width,
+                    arrow_head_length=arrow_head_length,
+                    lw=arrow_lw,
+                    units="x",
+                )
+                set_arrows(arrows, arrow_state[key], 0)
+
+            ax.set_xlim(
+                min(0, projection.distance.min()) - pad,
+                max(projection.length, projection.distance.max()) + pad,
+            )
+            # long periods at the bottom like depth
+            ax.set_ylim(log_period.max() + 0.5, log_period.min() - 0.5)
+            ax.set_yticks(y_ticks)
+            ax.set_yticklabels(
+                ["$10^{{{0:.0f}}}$".format(tick) for tick in y_ticks]
+            )
+            ax.set_ylabel("Period (s)", fontdict={"size": font_size + 2})
+            ax.set_title(self.panel_names[ii], fontdict={"size": font_size + 2})
+            ax.tick_params(labelsize=font_size)
+            ax.grid(which="major", color=(0.65, 0.65, 0.65), lw=0.5)
+
+        axes[-1].set_xlabel(
+            "Distance ({0})".format(map_scale), fontdict={"size": font_size + 2}
+        )
+        # station names above the first panel
+        top_axis = axes[0].secondary_xaxis("top")
+        top_axis.set_xticks(projection.distance)
+        top_axis.set_xticklabels(stations, rotation=90, fontsize=font_size)
+
+        self.figure.tight_layout()
         self.mpl_widget.draw()
 
 
+class PTMapExportThread(QtCore.QThread):
+    """
+    Export the phase tensor maps of every period in a worker thread so the
+    window stays responsive, the figures are drawn in a process pool by
+    :func:`mtpy_gui.modeling.pt_map_export.export_pt_maps`.
+    """
+
+    progress = QtCore.pyqtSignal(int, int)
+    export_finished = QtCore.pyqtSignal(str)
+    export_failed = QtCore.pyqtSignal(str)
+
+    def __init__(self, save_dir, export_kwargs):
+        super().__init__()
+        self.save_dir = save_dir
+        self.export_kwargs = export_kwargs
+
+    def run(self):
+        try:
+            manifest_fn = export_pt_maps(
+                self.save_dir, progress=self.progress.emit, **self.export_kwargs
+            )
+        except Exception as error:
+            self.export_failed.emit(str(error))
+            return
+        self.export_finished.emit(str(manifest_fn))
+
+
 class PlotSettings(QtWidgets.QWidget):
     settings_updated = QtCore.pyqtSignal()
 
@@ -35,7 +35,6 @@ import matplotlib.widgets as mplwidgets
 from matplotlib.lines import Line2D
 from matplotlib.collections import LineCollection
 
-from mtpy import MTData
 from mtpy.imaging.mtplot_tools.plotters import (
     plot_errorbar,
     plot_resistivity,
@@ -43,6 +42,7 @@ from mtpy.imaging.mtplot_tools.plotters import (
 )
 
 from .response_plot_settings import PlotSettings
+from .data_store import get_data_store, read_mt_data
 from matplotlib import __version__ as mpl_version
 
 # ==============================================================================
@@ -105,15 +105,12 @@ class PlotResponses(QtWidgets.QWidget):
         self._data_fn = Path(data_fn)
         self.file_watcher_dfn.addPath(self._data_fn.as_posix())
 
-        # create new modem data object
-        self.modem_data = MTData()
-        self.modem_data.from_modem(self._data_fn)
+        # the data object is shared with other windows that opened the file,
+        # it is copied before the first edit by _edit_data.  The shared
+        # object is unchanged so it is the back up copy to revert to
+        self.modem_data = get_data_store().get(self._data_fn, read_mt_data)
         self.periods = self.modem_data.get_periods()
-
-        # make a back up copy that will be unchanged
-        # that way we can revert back
-        self._modem_data_copy = self.modem_data.copy()
-        # self._modem_data_copy.from_modem_data(self._data_fn)
+        self._modem_data_copy = self.modem_data
 
         self.dirpath = self._data_fn.parent
 
@@ -137,9 +134,9 @@ class PlotResponses(QtWidgets.QWidget):
     @resp_fn.setter
     def resp_fn(self, resp_fn):
         self._resp_fn = Path(resp_fn)
-        self.modem_resp = MTData()
-
-        self.modem_resp.from_modem(self._resp_fn, survey=self._resp_survey)
+        self.modem_resp = get_data_store().get(
+            self._resp_fn, read_mt_data, survey=self._resp_survey
+        )
         self.plot()
 
     @staticmethod
@@ -322,11 +319,19 @@ class PlotResponses(QtWidgets.QWidget):
 
         self.modem_data.to_modem(data_filename=save_fn)
 
+    def _edit_data(self):
+        """
+        copy the shared data object before it is edited
+        """
+        if self.modem_data is self._modem_data_copy:
+            self.modem_data = get_data_store().copy(self._modem_data_copy)
+
     def apply_edits(self):
         self.plot()
 
     def apply_interpolation(self):
         print(f"{'='*10} interpolating {self.station} {'='*10}")
+        self._edit_data()
 
         self.modem_data[self.station] = self.modem_data[self.station].interpolate(
             self.modem_periods, bounds_error=False
@@ -335,6 +340,7 @@ class PlotResponses(QtWidgets.QWidget):
         self.plot()
 
     def apply_undo(self):
+        self._edit_data()
         self.modem_data[self.station] = self._modem_data_copy[self.station].copy()
         self.plot()
 
@@ -342,6 +348,7 @@ class PlotResponses(QtWidgets.QWidget):
         self.phase_flip_comp = str(self.flip_phase_combo.currentText()).lower()
 
     def apply_flip_phase(self):
+        self._edit_data()
         self.modem_data[self.station].flip_phase(
             **{self.phase_flip_comp: True, "inplace": True}
         )
@@ -365,6 +372,7 @@ class PlotResponses(QtWidgets.QWidget):
         self.add_t_error_text.setText(f"{self.add_t_error:.2f}")
 
     def apply_add_error(self):
+        self._edit_data()
         self.modem_data[self.station].add_model_error(
             [self.add_error_comp],
             z_value=self.add_z_error,
@@ -394,6 +402,7 @@ class PlotResponses(QtWidgets.QWidget):
         elif self.ss_comp.lower() == "zy":
             kwargs["ss_y"] = self.static_shift
 
+        self._edit_data()
         self.modem_data[self.station].remove_static_shift(**kwargs)
         self.plot()
 
@@ -936,6 +945,7 @@ class PlotResponses(QtWidgets.QWidget):
             ]
         except IndexError:
             return
+        self._edit_data()
 
         if self._key == "tip":
             data_value_2 = self.modem_data[self.station].tipper.loc[self._comp_dict][
@@ -1172,6 +1182,7 @@ class PlotResponses(QtWidgets.QWidget):
         self._ax2.figure.canvas.draw()
 
         # set to nan
+        self._edit_data()
         self.modem_data[self.station]._transfer_function.transfer_function.loc[
             self._comp_dict
         ][f_idx] = (np.nan + 1j * np.nan)
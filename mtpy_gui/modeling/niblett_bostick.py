@@ -0,0 +1,245 @@
+# -*- coding: utf-8 -*-
+"""
+Niblett-Bostick depth of a whole survey at once.
+
+The impedance tensors of every station and period are rotated to the
+phase tensor strike and the Bostick depth sqrt(rho_a T / (2 pi mu0)) of
+the two off-diagonal modes gives a minimum and maximum depth.  Where the
+phase tensor is 3D (|beta| above a threshold) or cannot be computed the
+strike is interpolated over period from the 2D periods of the station,
+0 outside of them, so every period with data gets a depth.  Only missing
+data get a depth of 0 and are left out of the survey average.
+
+The average depth of each period is cached next to the data file, keyed
+by the size and modification time of the data file.
+
+Created on Mon Oct 19 2026
+
+:license: MIT
+
+"""
+
+# =============================================================================
+# Imports
+# =============================================================================
+import os
+import json
+import tempfile
+from pathlib import Path
+
+import numpy as np
+
+from mtpy_gui.modeling.phase_tensor import (
+    compute_phase_tensor,
+    get_pt_parameters,
+)
+
+# =============================================================================
+# Niblett-Bostick depth
+# =============================================================================
+MU0 = 4e-7 * np.pi
+
+
+def rotate_z(z, angle):
+    """
+    Rotate stacked impedance tensors clockwise from north.
+
+    :param z: impedance tensors (..., 2, 2)
+    :type z: np.ndarray of complex
+    :param angle: rotation angle in degrees for each tensor
+    :type angle: np.ndarray (...)
+    :return: rotated impedance tensors
+    :rtype: np.ndarray of complex
+
+    """
+    angle = np.radians(angle)
+    cos = np.cos(angle)
+    sin = np.sin(angle)
+    rotation = np.stack(
+        (np.stack((cos, sin), axis=-1), np.stack((-sin, cos), axis=-1)),
+        axis=-2,
+    )
+    return rotation @ z @ np.swapaxes(rotation, -2, -1)
+
+
+def interpolate_strike(strike, valid, periods):
+    """
+    Linearly interpolate strike over period from the valid periods of each
+    station, the strike is 0 outside of the valid periods.
+
+    :param strike: strike in degrees (n_periods, ...)
+    :type strike: np.ndarray
+    :param valid: periods to interpolate from (n_periods, ...)
+    :type valid: np.ndarray of bool
+    :param periods: periods in seconds, increasing
+    :type periods: np.ndarray (n_periods)
+    :return: interpolated strike (n_periods, ...)
+    :rtype: np.ndarray
+
+    """
+    n_periods = strike.shape[0]
+    index = np.arange(n_periods).reshape((-1,) + (1,) * (strike.ndim - 1))
+    # nearest valid period at or before and at or after each period
+    before = np.maximum.accumulate(np.where(valid, index, -1), axis=0)
+    after = np.minimum.accumulate(
+        np.where(valid, index, n_periods)[::-1], axis=0
+    )[::-1]
+    inside = (before >= 0) & (after < n_periods)
+    before = np.clip(before, 0, n_periods - 1)
+    after = np.clip(after, 0, n_periods - 1)
+
+    period = np.broadcast_to(periods.reshape(index.shape), strike.shape)
+    period_before = periods[before]
+    period_after = periods[after]
+    with np.errstate(divide="ignore", invalid="ignore"):
+        weight = np.where(
+            after > before,
+            (period - period_before) / (period_after - period_before),
+            0.0,
+        )
+    strike_before = np.take_along_axis(strike, before, axis=0)
+    strike_after = np.take_along_axis(strike, after, axis=0)
+    return np.where(
+        inside, strike_before + weight * (strike_after - strike_before), 0.0
+    )
+
+
+def get_nb_depth(z, periods, skew_threshold=5.0):
+    """
+    Get the minimum and maximum Niblett-Bostick depth of the two modes
+    along strike.
+
+    :param z: impedance tensors in mV/km/nT (n_periods, n_stations, 2, 2)
+    :type z: np.ndarray of complex
+    :param periods: periods in seconds
+    :type periods: np.ndarray (n_periods)
+    :param skew_threshold: periods with |beta| above this in degrees are
+     3D and are rotated to a strike interpolated from the 2D periods
+    :type skew_threshold: float
+    :return: depth_min, depth_max in meters (n_periods, n_stations), 0
+     where there is no data
+    :rtype: np.ndarray, np.ndarray
+
+    """
+    z = np.asarray(z, dtype=complex)
+    periods = np.asarray(periods, dtype=float)
+    phi, valid = compute_phase_tensor(z)
+    parameters = get_pt_parameters(phi)
+    valid &= np.abs(parameters["beta"]) <= skew_threshold
+
+    # interpolate over increasing period
+    order = np.argsort(periods)
+    strike = np.empty(valid.shape)
+    strike[order] = interpolate_strike(
+        np.where(valid, parameters["azimuth"], 0)[order],
+        valid[order],
+        periods[order],
+    )
+
+    z_rot = rotate_z(z, strike)
+    modes = np.stack((z_rot[..., 0, 1], z_rot[..., 1, 0]), axis=-1)
+    periods = periods.reshape((-1,) + (1,) * (z.ndim - 2))
+    rho = 0.2 * periods * np.abs(modes) ** 2
+    depth = np.sqrt(rho * periods / (2 * np.pi * MU0))
+
+    has_data = np.isfinite(z).all(axis=(-2, -1)) & (z != 0).any(axis=(-2, -1))
+    depth = np.where(has_data[..., None] & np.isfinite(depth), depth, 0)
+    return depth.min(axis=-1), depth.max(axis=-1)
+
+
+def get_average_depth(depth_min, depth_max):
+    """
+    Get the average depth of each period from the non zero depths of all
+    stations.
+
+    :param depth_min: minimum depth (n_periods, n_stations)
+    :type depth_min: np.ndarray
+    :param depth_max: maximum depth (n_periods, n_stations)
+    :type depth_max: np.ndarray
+    :return: mean of the average minimum and maximum depth, 0 where there
+     is no depth
+    :rtype: np.ndarray (n_periods)
+
+    """
+    d_avg_min = np.ma.masked_equal(depth_min, 0).mean(axis=1)
+    d_avg_max = np.ma.masked_equal(depth_max, 0).mean(axis=1)
+    d_avg = (d_avg_min + d_avg_max) / 2.0
+    return np.nan_to_num(np.ma.filled(d_avg, 0.0))
+
+
+# =============================================================================
+# Depth cache
+# =============================================================================
+CACHE_VERSION = 2
+
+
+class NBDepthCache:
+    """
+    Cache of the average Niblett-Bostick depth of each period of a ModEM
+    data file, written to <data_fn>.nb_depth.npz.
+
+    :param data_fn: full path to ModEM data file
+    :type data_fn: string or Path
+
+    """
+
+    def __init__(self, data_fn):
+        self.data_fn = Path(data_fn)
+        self.cache_fn = self.data_fn.parent.joinpath(
+            f"{self.data_fn.name}.nb_depth.npz"
+        )
+
+    @property
+    def key(self):
+        """
+        key of the source file, changes when the file changes
+        """
+        stat = self.data_fn.stat()
+        return {
+            "version": CACHE_VERSION,
+            "size": stat.st_size,
+            "mtime_ns": stat.st_mtime_ns,
+        }
+
+    def read(self, periods=None):
+        """
+        Read the depths if the cache matches the data file.
+
+        :param periods: periods the depths should be for
+        :type periods: np.ndarray
+        :return: average depth of each period or None
+        :rtype: np.ndarray
+
+        """
+        if not self.cache_fn.exists():
+            return None
+        try:
+            with np.load(self.cache_fn, allow_pickle=False) as cache:
+                if json.loads(str(cache["__key__"])) != self.key:
+                    return None
+                if periods is not None and not np.array_equal(
+                    cache["periods"], periods
+                ):
+                    return None
+                return cache["depth"]
+        except (OSError, ValueError, KeyError):
+            return None
+
+    def write(self, depth, periods):
+        """
+        write the depths to a temporary file and rename it
+        """
+        fid, tmp_fn = tempfile.mkstemp(dir=self.cache_fn.parent, suffix=".tmp")
+        try:
+            with os.fdopen(fid, "wb") as fh:
+                np.savez(
+                    fh,
+                    __key__=np.array(json.dumps(self.key)),
+                    periods=np.asarray(periods, dtype=float),
+                    depth=np.asarray(depth, dtype=float),
+                )
+            os.replace(tmp_fn, self.cache_fn)
+        except BaseException:
+            if os.path.exists(tmp_fn):
+                os.remove(tmp_fn)
+            raise
@@ -0,0 +1,286 @@
+# -*- coding: utf-8 -*-
+"""
+Phase tensor and induction vector parameters for a whole survey at once.
+
+The impedance and tipper of every station are stacked into arrays of
+shape (n_periods, n_stations, ...) and the phase tensor
+Phi = inv(Re(Z)) Im(Z) (Caldwell et al., 2004) and its parameters are
+computed with a few numpy operations instead of one object per station.
+Periods where Re(Z) is singular are flagged in a mask and their parameters
+are 0, the same as an unfilled station.  The residual phase tensor between
+data and model response is computed the same way.
+
+Created on Mon Oct 19 2026
+
+:license: MIT
+
+"""
+
+# =============================================================================
+# Imports
+# =============================================================================
+import numpy as np
+
+# =============================================================================
+# Array types
+# =============================================================================
+PT_DTYPE = [
+    ("phimin", float),
+    ("phimax", float),
+    ("skew", float),
+    ("azimuth", float),
+    ("east", float),
+    ("north", float),
+    ("txr", float),
+    ("tyr", float),
+    ("txi", float),
+    ("tyi", float),
+]
+
+RESIDUAL_PT_DTYPE = PT_DTYPE[:6] + [("geometric_mean", float)] + PT_DTYPE[6:]
+
+# =============================================================================
+# Stacking
+# =============================================================================
+
+
+def stack_mt_dict(mt_dict, keys=None):
+    """
+    Stack the impedance and tipper of the stations in a ModEM data object.
+
+    :param mt_dict: station name to MT object
+    :type mt_dict: dict
+    :param keys: stations to stack in order, defaults to the dict order
+    :type keys: list
+    :return: z (n_periods, n_stations, 2, 2), tipper
+     (n_periods, n_stations, 2) and east, north (n_stations)
+    :rtype: np.ndarray
+
+    """
+    if keys is None:
+        keys = list(mt_dict.keys())
+    z = np.stack([mt_dict[key].Z.z for key in keys], axis=1)
+
+    tipper = np.zeros(z.shape[:2] + (2,), dtype=complex)
+    for ii, key in enumerate(keys):
+        t_obj = getattr(mt_dict[key], "Tipper", None)
+        if t_obj is not None and t_obj.tipper is not None:
+            tipper[:, ii] = t_obj.tipper[:, 0, :]
+
+    east = np.array([mt_dict[key].grid_east for key in keys], dtype=float)
+    north = np.array([mt_dict[key].grid_north for key in keys], dtype=float)
+    return z, tipper, east, north
+
+
+# =============================================================================
+# Phase tensor
+# =============================================================================
+
+
+def invert_2x2(tensor):
+    """
+    Invert stacked 2x2 matrices, singular matrices are flagged.
+
+    :param tensor: matrices (..., 2, 2)
+    :type tensor: np.ndarray
+    :return: inverses with zeros where singular and a mask of the matrices
+     that could be inverted
+    :rtype: np.ndarray, np.ndarray of bool
+
+    """
+    det = tensor[..., 0, 0] * tensor[..., 1, 1] - (
+        tensor[..., 0, 1] * tensor[..., 1, 0]
+    )
+    valid = np.isfinite(det) & (det != 0)
+    safe_det = np.where(valid, det, 1.0)
+
+    inverse = np.empty_like(tensor)
+    inverse[..., 0, 0] = tensor[..., 1, 1]
+    inverse[..., 0, 1] = -tensor[..., 0, 1]
+    inverse[..., 1, 0] = -tensor[..., 1, 0]
+    inverse[..., 1, 1] = tensor[..., 0, 0]
+    inverse /= safe_det[..., None, None]
+    inverse[~valid] = 0
+    return inverse, valid
+
+
+def compute_phase_tensor(z):
+    """
+    Compute the phase tensor of stacked impedance tensors.
+
+    :param z: impedance tensors (..., 2, 2)
+    :type z: np.ndarray of complex
+    :return: phase tensors (..., 2, 2), zero where Re(Z) is singular, and
+     a mask of the valid tensors
+    :rtype: np.ndarray, np.ndarray of bool
+
+    """
+    z = np.asarray(z, dtype=complex)
+    inverse, valid = invert_2x2(z.real)
+    phi = inverse @ z.imag
+    return phi, valid
+
+
+def get_pt_parameters(phi):
+    """
+    Get the parameters of stacked phase tensors.
+
+    :param phi: phase tensors (..., 2, 2)
+    :type phi: np.ndarray
+    :return: phimin, phimax, alpha, beta (skew) and azimuth in degrees
+    :rtype: dict of np.ndarray
+
+    """
+    pi1 = 0.5 * np.hypot(
+        phi[..., 0, 0] - phi[..., 1, 1], phi[..., 0, 1] + phi[..., 1, 0]
+    )
+    pi2 = 0.5 * np.hypot(
+        phi[..., 0, 0] + phi[..., 1, 1], phi[..., 0, 1] - phi[..., 1, 0]
+    )
+    alpha = np.degrees(
+        0.5
+        * np.arctan2(
+            phi[..., 0, 1] + phi[..., 1, 0], phi[..., 0, 0] - phi[..., 1, 1]
+        )
+    )
+    beta = np.degrees(
+        0.5
+        * np.arctan2(
+            phi[..., 0, 1] - phi[..., 1, 0], phi[..., 0, 0] + phi[..., 1, 1]
+        )
+    )
+    return {
+        "phimin": np.degrees(np.arctan(pi2 - pi1)),
+        "phimax": np.degrees(np.arctan(pi2 + pi1)),
+        "alpha": alpha,
+        "beta": beta,
+        "azimuth": alpha - beta,
+    }
+
+
+def get_tipper_components(tipper):
+    """
+    Get the east and north components of the real and imaginary induction
+    vectors in the Parkinson convention, pointing towards conductors.
+
+    :param tipper: tipper (..., 2) as (Tx, Ty) with x north
+    :type tipper: np.ndarray of complex
+    :return: txr, tyr, txi, tyi
+    :rtype: dict of np.ndarray
+
+    """
+    return {
+        "txr": -tipper[..., 1].real,
+        "tyr": -tipper[..., 0].real,
+        "txi": -tipper[..., 1].imag,
+        "tyi": -tipper[..., 0].imag,
+    }
+
+
+def _fill_pt_array(phi, tipper_components, east, north, dtype):
+    parameters = get_pt_parameters(phi)
+    pt_arr = np.zeros(phi.shape[:2], dtype=dtype)
+    pt_arr["east"] = east[None, :]
+    pt_arr["north"] = north[None, :]
+    pt_arr["phimin"] = parameters["phimin"]
+    pt_arr["phimax"] = parameters["phimax"]
+    pt_arr["azimuth"] = parameters["azimuth"]
+    pt_arr["skew"] = parameters["beta"]
+    if "geometric_mean" in pt_arr.dtype.names:
+        pt_arr["geometric_mean"] = np.sqrt(
+            np.abs(parameters["phimin"] * parameters["phimax"])
+        )
+    for key, value in tipper_components.items():
+        pt_arr[key] = value
+    return pt_arr
+
+
+def get_pt_array(z, tipper, east, north):
+    """
+    Fill a structured array of phase tensor and induction vector
+    parameters for plotting.
+
+    :param z: impedance tensors (n_periods, n_stations, 2, 2)
+    :type z: np.ndarray of complex
+    :param tipper: tipper (n_periods, n_stations, 2)
+    :type tipper: np.ndarray of complex
+    :param east: station east in plot units
+    :type east: np.ndarray (n_stations)
+    :param north: station north in plot units
+    :type north: np.ndarray (n_stations)
+    :return: parameters (n_periods, n_stations), phase tensors and a mask
+     of valid phase tensors
+    :rtype: np.ndarray, np.ndarray, np.ndarray of bool
+
+    """
+    phi, valid = compute_phase_tensor(z)
+    pt_arr = _fill_pt_array(
+        phi, get_tipper_components(tipper), east, north, PT_DTYPE
+    )
+    return pt_arr, phi, valid
+
+
+# =============================================================================
+# Residual phase tensor
+# =============================================================================
+
+
+def compute_residual_pt(phi_data, phi_model):
+    """
+    Compute the residual phase tensor of Heise et al. (2008),
+    Delta = I - (inv(Phi_d) Phi_m + Phi_m inv(Phi_d)) / 2.
+
+    :param phi_data: phase tensors of the data (..., 2, 2)
+    :type phi_data: np.ndarray
+    :param phi_model: phase tensors of the model response (..., 2, 2)
+    :type phi_model: np.ndarray
+    :return: residual phase tensors, zero where the data phase tensor is
+     singular or the residual is not finite, and a mask of valid residuals
+    :rtype: np.ndarray, np.ndarray of bool
+
+    """
+    inverse, valid = invert_2x2(phi_data)
+    delta = np.eye(2) - 0.5 * (inverse @ phi_model + phi_model @ inverse)
+    valid &= np.isfinite(delta).all(axis=(-2, -1))
+    delta[~valid] = 0
+    return delta, valid
+
+
+def get_residual_pt_array(
+    phi_data, phi_model, data_pt_arr, model_pt_arr, valid=None
+):
+    """
+    Fill a structured array of residual phase tensor parameters, including
+    the geometric mean sqrt(|phimin * phimax|) and skew, and the difference
+    of the induction vectors.
+
+    :param phi_data: phase tensors of the data (n_periods, n_stations, 2, 2)
+    :type phi_data: np.ndarray
+    :param phi_model: phase tensors of the response
+    :type phi_model: np.ndarray
+    :param data_pt_arr: data parameters from :func:`get_pt_array`
+    :type data_pt_arr: np.ndarray
+    :param model_pt_arr: response parameters from :func:`get_pt_array`
+    :type model_pt_arr: np.ndarray
+    :param valid: phase tensors that could be computed for both
+    :type valid: np.ndarray of bool
+    :return: residual parameters and a mask of valid residuals
+    :rtype: np.ndarray, np.ndarray of bool
+
+    """
+    delta, residual_valid = compute_residual_pt(phi_data, phi_model)
+    if valid is not None:
+        residual_valid &= valid
+        delta[~residual_valid] = 0
+    tipper_components = dict(
+        (key, data_pt_arr[key] - model_pt_arr[key])
+        for key in ["txr", "tyr", "txi", "tyi"]
+    )
+    res_pt_arr = _fill_pt_array(
+        delta,
+        tipper_components,
+        data_pt_arr["east"][0],
+        data_pt_arr["north"][0],
+        RESIDUAL_PT_DTYPE,
+    )
+    return res_pt_arr, residual_valid
@@ -35,6 +35,8 @@ from matplotlib.backends.backend_qt5agg import (
 )
 from matplotlib.figure import Figure
 
+from mtpy_gui.modeling.basemap import TileCache, Basemap
+
 # =============================================================================
 # Plot stations
 # =============================================================================
@@ -90,6 +92,12 @@ class PlotStations(QtWidgets.QWidget):
         self.map_crs = CRS.from_epsg(4326)
         if has_cx:
             self.cx_source = cx.providers.USGS.USTopo
+        # downloaded tiles are kept here, None for ~/.mtpy_gui/tiles
+        self.tile_cache_dir = None
+        # only use tiles that are cached or in a local tile directory
+        self.tile_offline = False
+        self._basemap = None
+        self._basemap_key = None
 
         super().__init__()
         self.setup_ui()
@@ -168,18 +176,9 @@ class PlotStations(QtWidgets.QWidget):
                 clip_on=True,
             )
 
-        if has_cx:
+        if self.cx_source is not None:
             try:
-                cx_kwargs = {
-                    "crs": self.map_crs.to_string(),
-                    "source": self.cx_source,
-                }
-                if self.cx_zoom is not None:
-                    cx_kwargs["zoom"] = self.cx_zoom
-                cx.add_basemap(
-                    self.ax,
-                    **cx_kwargs,
-                )
+                self.get_basemap().draw()
             except Exception as error:
                print(f"Could not add base map because {error}")
 
@@ -192,6 +191,32 @@ class PlotStations(QtWidgets.QWidget):
 
         self.mpl_widget.draw()
 
+    def get_basemap(self):
+        """
+        get the basemap, the rendered image is kept until the source or view
+        changes.
+        """
+        key = (
+            str(self.cx_source),
+            self.cx_zoom,
+            self.tile_cache_dir,
+            self.tile_offline,
+            self.map_crs.to_string(),
+        )
+        if self._basemap is None or key != self._basemap_key:
+            tile_cache = TileCache(
+                self.cx_source,
+                cache_dir=self.tile_cache_dir,
+                offline=self.tile_offline,
+            )
+            self._basemap = Basemap(
+                self.ax, tile_cache, self.map_crs, zoom=self.cx_zoom
+            )
+            self._basemap_key = key
+        # plot makes a new axes each time
+        self._basemap.ax = self.ax
+        return self._basemap
+
     def plot_new_station(self):
         self.ax.plot(
             self.station_locations.longitude[self.previous_index],
@@ -0,0 +1,275 @@
+# -*- coding: utf-8 -*-
+"""
+Gridded maps of phase tensor and induction vector parameters.
+
+Station values are interpolated linearly onto a regular grid inside the
+Delaunay triangulation of the stations.  The barycentric weights of every
+grid cell are stored in a sparse matrix that is built once for a station
+layout and grid, so gridding any parameter at any period is one sparse
+product.  Stations without a value at a period are left out by
+triangulating only the stations with values, the weights are cached for
+each set of stations that have values.
+
+Created on Mon Oct 19 2026
+
+:license: MIT
+
+"""
+
+# =============================================================================
+# Imports
+# =============================================================================
+from collections import OrderedDict
+
+import numpy as np
+from scipy import sparse
+from scipy.spatial import Delaunay, QhullError
+
+# =============================================================================
+# Parameters
+# =============================================================================
+
+
+def _pt_valid(pt_arr):
+    return ~((pt_arr["phimin"] == 0) & (pt_arr["phimax"] == 0))
+
+
+# name: (colorbar label, values of a phase tensor array, valid values)
+GRID_PARAMETERS = OrderedDict(
+    [
+        (
+            "phimin",
+            (
+                r"$\Phi_{min}$ (deg)",
+                lambda pt_arr: pt_arr["phimin"],
+                _pt_valid,
+            ),
+        ),
+        (
+            "skew",
+            (
+                r"$\beta$ (deg)",
+                lambda pt_arr: pt_arr["skew"],
+                _pt_valid,
+            ),
+        ),
+        (
+            "geometric_mean",
+            (
+                r"$\sqrt{\Phi_{min} \Phi_{max}}$",
+                lambda pt_arr: np.sqrt(
+                    np.abs(pt_arr["phimin"] * pt_arr["phimax"])
+                ),
+                _pt_valid,
+            ),
+        ),
+        (
+            "induction_vector",
+            (
+                "|Real Induction Vector|",
+                lambda pt_arr: np.hypot(pt_arr["txr"], pt_arr["tyr"]),
+                lambda pt_arr: pt_arr["txr"] != 0,
+            ),
+        ),
+    ]
+)
+
+
+def get_parameter(pt_arr, parameter):
+    """
+    Get the values of a parameter in GRID_PARAMETERS and where they are
+    valid.
+
+    :param pt_arr: phase tensor parameters (n_periods, n_stations)
+    :type pt_arr: np.ndarray
+    :param parameter: key of GRID_PARAMETERS
+    :type parameter: string
+    :return: values and valid mask
+    :rtype: np.ndarray, np.ndarray of bool
+
+    """
+    _, get_values, get_valid = GRID_PARAMETERS[parameter]
+    return get_values(pt_arr), get_valid(pt_arr)
+
+
+# =============================================================================
+# Interpolation
+# =============================================================================
+
+
+def make_grid(ew_limits, ns_limits, n_cells=200):
+    """
+    Get the cell centers of a grid of square cells covering the limits with
+    n_cells along the longer side.
+
+    :return: grid_east, grid_north
+    :rtype: np.ndarray, np.ndarray
+
+    """
+    cell_size = (
+        max(ew_limits[1] - ew_limits[0], ns_limits[1] - ns_limits[0]) / n_cells
+    )
+    grid_east = np.arange(
+        ew_limits[0] + cell_size / 2, ew_limits[1], cell_size
+    )
+    grid_north = np.arange(
+        ns_limits[0] + cell_size / 2, ns_limits[1], cell_size
+    )
+    return grid_east, grid_north
+
+
+class StationInterpolator:
+    """
+    Linear interpolation from stations onto a regular grid.
+
+    >>> interpolator = StationInterpolator(east, north, grid_east, grid_north)
+    >>> phimin_grid = interpolator.interpolate(pt_arr["phimin"][period_index])
+
+    :param east: station east
+    :type east: np.ndarray (n_stations)
+    :param north: station north
+    :type north: np.ndarray (n_stations)
+    :param grid_east: cell centers along east
+    :type grid_east: np.ndarray (n_east)
+    :param grid_north: cell centers along north
+    :type grid_north: np.ndarray (n_north)
+    :param cache_size: number of sets of valid stations to keep weights for
+    :type cache_size: int
+
+    """
+
+    def __init__(self, east, north, grid_east, grid_north, cache_size=16):
+        self.east = np.asarray(east, dtype=float)
+        self.north = np.asarray(north, dtype=float)
+        self.grid_east = np.asarray(grid_east, dtype=float)
+        self.grid_north = np.asarray(grid_north, dtype=float)
+        self.shape = (self.grid_north.size, self.grid_east.size)
+        self.cache_size = cache_size
+        # valid stations as bytes: sparse weights
+        self._operators = OrderedDict()
+        self.operator = self.get_operator(np.ones(self.east.size, dtype=bool))
+
+    @property
+    def extent(self):
+        """
+        extent of the grid for imshow
+        """
+        half_cell = (self.grid_east[1] - self.grid_east[0]) / 2.0
+        return (
+            self.grid_east[0] - half_cell,
+            self.grid_east[-1] + half_cell,
+            self.grid_north[0] - half_cell,
+            self.grid_north[-1] + half_cell,
+        )
+
+    def get_operator(self, valid):
+        """
+        Get the weights for a set of valid stations, the last few sets are
+        cached.
+
+        :param valid: stations to triangulate
+        :type valid: np.ndarray of bool (n_stations)
+        :return: sparse (n_cells, n_stations) weights
+        :rtype: scipy.sparse.csr_matrix
+
+        """
+        valid = np.asarray(valid, dtype=bool)
+        key = valid.tobytes()
+        operator = self._operators.get(key)
+        if operator is None:
+            operator = self._get_operator(np.nonzero(valid)[0])
+            self._operators[key] = operator
+            while len(self._operators) > self.cache_size:
+                self._operators.popitem(last=False)
+        self._operators.move_to_end(key)
+        return operator
+
+    def _get_operator(self, stations):
+        """
+        sparse (n_cells, n_stations) barycentric weights of the
+        triangulation of the given stations, cells outside the
+        triangulation have no weights
+        """
+        n_cells = self.shape[0] * self.shape[1]
+        empty = sparse.csr_matrix((n_cells, self.east.size))
+        if stations.size < 3:
+            return empty
+        try:
+            triangulation = Delaunay(
+                np.column_stack((self.east[stations], self.north[stations]))
+            )
+        except (QhullError, ValueError) as error:
+            print(f"Could not triangulate the stations because {error}")
+            return empty
+
+        mesh_east, mesh_north = np.meshgrid(self.grid_east, self.grid_north)
+        cells = np.column_stack((mesh_east.ravel(), mesh_north.ravel()))
+        simplex = triangulation.find_simplex(cells)
+        inside = np.nonzero(simplex >= 0)[0]
+        simplex = simplex[inside]
+
+        # barycentric coordinates from the affine transform of each triangle
+        transform = triangulation.transform[simplex]
+        bary = np.einsum(
+            "ijk,ik->ij", transform[:, :2], cells[inside] - transform[:, 2]
+        )
+        weights = np.column_stack((bary, 1 - bary.sum(axis=1)))
+        return sparse.csr_matrix(
+            (
+                weights.ravel(),
+                (
+                    np.repeat(inside, 3),
+                    stations[triangulation.simplices[simplex].ravel()],
+                ),
+            ),
+            shape=(n_cells, self.east.size),
+        )
+
+    def interpolate(self, values, valid=None):
+        """
+        Interpolate station values onto the grid.
+
+        :param values: value at each station
+        :type values: np.ndarray (n_stations)
+        :param valid: stations to use, defaults to finite values
+        :type valid: np.ndarray of bool (n_stations)
+        :return: gridded values, NaN outside the stations
+        :rtype: np.ndarray (n_north, n_east)
+
+        """
+        values = np.asarray(values, dtype=float)
+        valid = np.isfinite(values) if valid is None else valid
+        valid = valid & np.isfinite(values)
+        operator = self.get_operator(valid)
+        # the weights of a cell sum to 1 inside the triangulation
+        grid, weight = (
+            operator
+            @ np.column_stack(
+                (np.where(valid, values, 0), np.ones(valid.size))
+            )
+        ).T
+        grid[weight < 0.5] = np.nan
+        return grid.reshape(self.shape)
+
+
+_interpolators = OrderedDict()
+
+
+def get_station_interpolator(east, north, grid_east, grid_north, cache_size=4):
+    """
+    Get a :class:`StationInterpolator`, the last few station layouts and
+    grids are cached.
+    """
+    arrays = [
+        np.asarray(ii, dtype=float)
+        for ii in [east, north, grid_east, grid_north]
+    ]
+    key = tuple((ii.size, ii.tobytes()) for ii in arrays)
+    interpolator = _interpolators.get(key)
+    if interpolator is None:
+        interpolator = StationInterpolator(*arrays)
+        _interpolators[key] = interpolator
+        while len(_interpolators) > cache_size:
+            _interpolators.popitem(last=False)
+    _interpolators.move_to_end(key)
+    return interpolator
@@ -0,0 +1,408 @@
+# -*- coding: utf-8 -*-
+"""
+Per-period state and artists for phase tensor maps.
+
+The ellipse geometry, face colours and induction arrow vectors of every
+period are computed at once from the arrays of
+:mod:`mtpy_gui.modeling.phase_tensor`.  The map is drawn with one
+EllipseCollection and one quiver per arrow set for all stations, and
+changing period only swaps the arrays of those artists.  Stations that
+are not plotted at a period get ellipses of zero size and masked arrows.
+The model slice under the ellipses is rendered once per depth index into
+a raster that all panels share.
+
+Created on Mon Oct 19 2026
+
+:license: MIT
+
+"""
+
+# =============================================================================
+# Imports
+# =============================================================================
+from collections import OrderedDict
+
+import numpy as np
+import matplotlib
+from matplotlib.colors import Normalize, BoundaryNorm, ListedColormap
+from matplotlib.image import AxesImage
+from matplotlib.collections import EllipseCollection
+
+import mtpy.imaging.mtcolors as mtcl
+
+# =============================================================================
+# Per-period state
+# =============================================================================
+
+
+def get_color_norm(colorby, cmap, ckmin, ckmax, bounds=None):
+    """
+    Get the colour map and norm that colour values the same as the PT
+    colorbar of the map, Normalize(ckmin, ckmax) for every parameter.
+
+    :param colorby: parameter name, see mtpy.imaging.mtcolors.get_plot_color
+    :type colorby: string
+    :param cmap: colour map name
+    :type cmap: string
+    :param bounds: colour bounds for segmented colour maps, evenly spaced
+     from ckmin to ckmax
+    :type bounds: np.ndarray
+    :return: colour map and norm
+    :rtype: :class:`matplotlib.colors.Colormap`,
+     :class:`matplotlib.colors.Normalize`
+
+    """
+    if cmap.find("seg") > 0:
+        # same segments as the colorbar, the middle segment is white
+        ckstep = bounds[1] - bounds[0]
+        nseg = (ckmax - ckmin) / (2 * ckstep)
+        clist = [
+            (cc, cc, 1) for cc in np.arange(0, 1 + 1.0 / nseg, 1.0 / nseg)
+        ] + [(1, cc, cc) for cc in np.arange(1, -1.0 / nseg, -1.0 / nseg)]
+        seg_cmap = ListedColormap(clist)
+        seg_bounds = np.arange(ckmin - ckstep, ckmax + 2 * ckstep, ckstep)
+        return seg_cmap, BoundaryNorm(seg_bounds, seg_cmap.N)
+
+    return mtcl.cmapdict[cmap], Normalize(ckmin, ckmax)
+
+
+def get_face_colors(values, colorby, cmap, ckmin, ckmax, bounds=None):
+    """
+    Get the face colour of each ellipse, all values are mapped in one call
+    to the colour map.
+
+    :param values: values the ellipses are coloured by
+    :type values: np.ndarray
+    :param colorby: parameter name, see mtpy.imaging.mtcolors.get_plot_color
+    :type colorby: string
+    :param cmap: colour map name
+    :type cmap: string
+    :param bounds: colour bounds for segmented colour maps
+    :type bounds: np.ndarray
+    :return: colours with shape values.shape + (3,)
+    :rtype: np.ndarray
+
+    """
+    color_map, norm = get_color_norm(colorby, cmap, ckmin, ckmax, bounds)
+    values = np.asarray(values, dtype=float)
+    return color_map(norm(values))[..., :3]
+
+
+def get_ellipse_state(
+    pt_arr,
+    mask,
+    angles,
+    color_values,
+    colorby,
+    cmap,
+    ckmin,
+    ckmax,
+    bounds=None,
+    phimax=None,
+    ellipse_size=1,
+):
+    """
+    Get the ellipse geometry and colours of all periods.
+
+    :param pt_arr: phase tensor parameters (n_periods, n_stations)
+    :type pt_arr: np.ndarray
+    :param mask: ellipses to plot
+    :type mask: np.ndarray of bool (n_periods, n_stations)
+    :param angles: angle of each ellipse in degrees counter clockwise
+    :type angles: np.ndarray (n_periods, n_stations)
+    :param color_values: value each ellipse is coloured by
+    :type color_values: np.ndarray (n_periods, n_stations)
+    :param phimax: phimax scaled to ellipse_size for each period, defaults
+     to the largest phimax of pt_arr at each period
+    :type phimax: np.ndarray (n_periods)
+    :param ellipse_size: size of the largest ellipse in map units
+    :type ellipse_size: float
+    :return: widths, heights, angles and facecolors
+    :rtype: dict of np.ndarray
+
+    """
+    if phimax is None:
+        phimax = pt_arr["phimax"].max(axis=1)
+    with np.errstate(divide="ignore"):
+        scale = np.where(phimax > 0, ellipse_size / phimax, 0.0)[:, None]
+    return {
+        "widths": np.where(mask, pt_arr["phimax"] * scale, 0.0),
+        "heights": np.where(mask, pt_arr["phimin"] * scale, 0.0),
+        "angles": np.asarray(angles, dtype=float),
+        "facecolors": get_face_colors(
+            color_values, colorby, cmap, ckmin, ckmax, bounds=bounds
+        ),
+    }
+
+
+def get_arrow_state(
+    pt_arr, arrow_size=1, arrow_head_length=0, arrow_threshold=2, arr_dir=1
+):
+    """
+    Get the real and imaginary induction arrow vectors of all periods.
+    Stations without tipper and arrows longer than arrow_threshold are
+    masked.  quiver draws the head inside the arrow, so arrows are
+    stretched by the head length to keep the shaft arrow_size long.
+
+    :param pt_arr: phase tensor parameters (n_periods, n_stations)
+    :type pt_arr: np.ndarray
+    :param arr_dir: 1 to point towards conductors, -1 away
+    :type arr_dir: int
+    :return: (u, v) for 'real' and 'imag'
+    :rtype: dict of np.ma.MaskedArray
+
+    """
+    has_tipper = pt_arr["txr"] != 0.0
+    state = {}
+    for key, tx, ty in [("real", "txr", "tyr"), ("imag", "txi", "tyi")]:
+        magnitude = np.hypot(pt_arr[tx], pt_arr[ty])
+        mask = has_tipper & (magnitude > 0) & (magnitude <= arrow_threshold)
+        length = arrow_size * magnitude
+        with np.errstate(divide="ignore", invalid="ignore"):
+            stretch = np.where(mask, (length + arrow_head_length) / length, 0)
+        state[key] = (
+            np.ma.masked_array(
+                arrow_size * pt_arr[tx] * arr_dir * stretch, mask=~mask
+            ),
+            np.ma.masked_array(
+                arrow_size * pt_arr[ty] * arr_dir * stretch, mask=~mask
+            ),
+        )
+    return state
+
+
+def get_depth_index(grid_z, depth_array):
+    """
+    index of the first layer at or below each depth, 0 where the depth
+    is 0 or deeper than the model
+    """
+    depth_array = np.asarray(depth_array, dtype=float)
+    d_index = np.searchsorted(grid_z, depth_array, side="left")
+    d_index[(depth_array == 0) | (d_index >= len(grid_z))] = 0
+    return d_index
+
+
+# =============================================================================
+# Artists
+# =============================================================================
+
+
+def add_ellipses(ax, east, north, units="xy"):
+    """
+    Add an empty EllipseCollection at the stations to ax, fill it with
+    :func:`set_ellipses`.
+
+    :param units: 'xy' for sizes in map units on a map, 'x' for sizes in
+     x units that keep their shape on axes with a different y scale
+    :type units: string
+    :return: ellipses
+    :rtype: :class:`matplotlib.collections.EllipseCollection`
+
+    """
+    zeros = np.zeros(len(east))
+    ellipses = EllipseCollection(
+        zeros,
+        zeros,
+        zeros,
+        units=units,
+        offsets=np.column_stack((east, north)),
+        offset_transform=ax.transData,
+    )
+    ax.add_collection(ellipses, autolim=False)
+    return ellipses
+
+
+def set_ellipses(ellipses, state, index):
+    """
+    show period index of an ellipse state in ellipses
+    """
+    ellipses.set_widths(state["widths"][index])
+    ellipses.set_heights(state["heights"][index])
+    ellipses.set_angles(state["angles"][index])
+    ellipses.set_facecolor(state["facecolors"][index])
+
+
+def add_arrows(
+    ax,
+    east,
+    north,
+    color,
+    arrow_head_width=0.35,
+    arrow_head_length=0.35,
+    lw=1,
+    units="xy",
+):
+    """
+    Add an empty quiver at the stations to ax, fill it with
+    :func:`set_arrows`.  Head sizes are in map units.
+
+    :param units: 'xy' for arrows in map units on a map, 'x' for arrows in
+     x units that keep their direction on axes with a different y scale
+    :type units: string
+    :return: arrows
+    :rtype: :class:`matplotlib.quiver.Quiver`
+
+    """
+    width = arrow_head_width / 5.0
+    masked = np.ma.masked_all(len(east))
+    return ax.quiver(
+        east,
+        north,
+        masked,
+        masked,
+        angles="xy" if units == "xy" else "uv",
+        scale_units=units,
+        scale=1,
+        units=units,
+        width=width,
+        headwidth=arrow_head_width / width,
+        headlength=arrow_head_length / width,
+        headaxislength=arrow_head_length / width,
+        color=color,
+        edgecolor=color,
+        linewidth=lw,
+    )
+
+
+def set_arrows(arrows, uv, index):
+    """
+    show period index of (u, v) from :func:`get_arrow_state` in arrows
+    """
+    arrows.set_UVC(uv[0][index], uv[1][index])
+
+
+# =============================================================================
+# Model background
+# =============================================================================
+
+
+class ModelRaster:
+    """
+    Depth slices of a model colour mapped into RGBA rasters covering the
+    map limits.  Each depth index is rendered once and the same raster is
+    shown on every panel, so changing period only swaps the image data.
+
+    >>> model_raster = ModelRaster(east_nodes, north_nodes, res_model,
+    ...                            ew_limits, ns_limits)
+    >>> image = model_raster.add_image(ax)
+    >>> image.set_data(model_raster.get(d_index))
+
+    :param east_nodes: cell nodes along east in map units
+    :type east_nodes: np.ndarray (n_east + 1)
+    :param north_nodes: cell nodes along north in map units
+    :type north_nodes: np.ndarray (n_north + 1)
+    :param res_model: resistivity model
+    :type res_model: np.ndarray (n_north, n_east, n_z)
+    :param ew_limits: (min, max) east of the raster
+    :type ew_limits: tuple
+    :param ns_limits: (min, max) north of the raster
+    :type ns_limits: tuple
+    :param n_pixels: number of pixels along the longer side
+    :type n_pixels: int
+    :param cmap: colour map of log10 resistivity
+    :type cmap: string
+    :param vmin: log10 resistivity of the bottom of the colour map
+    :type vmin: float
+    :param vmax: log10 resistivity of the top of the colour map
+    :type vmax: float
+    :param cache_size: number of depth slices to keep
+    :type cache_size: int
+
+    """
+
+    def __init__(
+        self,
+        east_nodes,
+        north_nodes,
+        res_model,
+        ew_limits,
+        ns_limits,
+        n_pixels=1000,
+        cmap="jet_r",
+        vmin=-1,
+        vmax=4,
+        cache_size=16,
+    ):
+        self.res_model = res_model
+        self.ew_limits = tuple(ew_limits)
+        self.ns_limits = tuple(ns_limits)
+        self.cmap = matplotlib.colormaps.get_cmap(cmap)
+        self.norm = Normalize(vmin=vmin, vmax=vmax)
+        self.cache_size = cache_size
+        self._rasters = OrderedDict()
+
+        # cell of the center of each pixel, found once for all depths
+        pixel_size = (
+            max(
+                self.ew_limits[1] - self.ew_limits[0],
+                self.ns_limits[1] - self.ns_limits[0],
+            )
+            / n_pixels
+        )
+        self.n_east = max(
+            int(np.ceil((self.ew_limits[1] - self.ew_limits[0]) / pixel_size)),
+            1,
+        )
+        self.n_north = max(
+            int(np.ceil((self.ns_limits[1] - self.ns_limits[0]) / pixel_size)),
+            1,
+        )
+        pixel_east = self.ew_limits[0] + (np.arange(self.n_east) + 0.5) * (
+            (self.ew_limits[1] - self.ew_limits[0]) / self.n_east
+        )
+        pixel_north = self.ns_limits[0] + (np.arange(self.n_north) + 0.5) * (
+            (self.ns_limits[1] - self.ns_limits[0]) / self.n_north
+        )
+        ix = np.searchsorted(east_nodes, pixel_east, side="right") - 1
+        iy = np.searchsorted(north_nodes, pixel_north, side="right") - 1
+        x_valid = (ix >= 0) & (ix < res_model.shape[1])
+        y_valid = (iy >= 0) & (iy < res_model.shape[0])
+        self._ix = np.clip(ix, 0, res_model.shape[1] - 1)
+        self._iy = np.clip(iy, 0, res_model.shape[0] - 1)
+        self._outside = ~(y_valid[:, None] & x_valid[None, :])
+
+    @property
+    def extent(self):
+        return self.ew_limits + self.ns_limits
+
+    def get(self, d_index):
+        """
+        Get the RGBA raster of a depth index, rows ordered from south to
+        north.  Do not edit it, it is shared.
+
+        :param d_index: index of the depth slice
+        :type d_index: int
+        :return: raster (n_north, n_east, 4)
+        :rtype: np.ndarray of uint8
+
+        """
+        d_index = int(d_index)
+        raster = self._rasters.get(d_index)
+        if raster is None:
+            with np.errstate(divide="ignore", invalid="ignore"):
+                log_res = np.log10(
+                    self.res_model[
+                        self._iy[:, None], self._ix[None, :], d_index
+                    ]
+                )
+            raster = self.cmap(self.norm(log_res), bytes=True)
+            raster[self._outside | ~np.isfinite(log_res)] = 0
+            self._rasters[d_index] = raster
+            while len(self._rasters) > self.cache_size:
+                self._rasters.popitem(last=False)
+        self._rasters.move_to_end(d_index)
+        return raster
+
+    def add_image(self, ax):
+        """
+        add an image for the rasters to ax, fill it with get
+        """
+        image = AxesImage(
+            ax,
+            interpolation="nearest",
+            origin="lower",
+            extent=self.extent,
+        )
+        image.set_data(np.zeros((self.n_north, self.n_east, 4), dtype=np.uint8))
+        ax.add_image(image)
+        return image
@@ -0,0 +1,302 @@
+# -*- coding: utf-8 -*-
+"""
+Batch export of phase tensor maps for every period.
+
+The ellipse and arrow arrays of every period from
+:mod:`mtpy_gui.modeling.pt_map` and the model rasters under them are saved
+as .npy files in a scratch directory.  Worker processes memory map them and
+each renders the maps of a period with the Agg backend, so only the
+period they draw is read.  A manifest of the files written is saved as
+pt_maps_manifest.json in the output directory.
+
+Created on Mon Oct 19 2026
+
+:license: MIT
+
+"""
+
+# =============================================================================
+# Imports
+# =============================================================================
+import json
+import shutil
+import tempfile
+import multiprocessing
+from pathlib import Path
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import numpy as np
+
+# =============================================================================
+# Export
+# =============================================================================
+MANIFEST_FN = "pt_maps_manifest.json"
+PANEL_NAMES = ["Data", "Model", "Residual"]
+ELLIPSE_KEYS = ["widths", "heights", "angles", "facecolors"]
+
+# set in each worker by _init_worker
+_arrays = None
+_options = None
+
+
+def write_export_arrays(array_dir, period_state, model_slices=None):
+    """
+    Save the arrays the workers draw from.
+
+    :param array_dir: directory to save to
+    :type array_dir: Path
+    :param period_state: (ellipse state, arrow state) of each panel
+    :type period_state: list
+    :param model_slices: RGBA raster of each depth used
+    :type model_slices: np.ndarray (n_depths, n_north, n_east, 4)
+    :return: file name of each array
+    :rtype: dict
+
+    """
+    array_fns = {}
+
+    def save(name, array):
+        fn = array_dir.joinpath(f"{name}.npy")
+        np.save(fn, array)
+        array_fns[name] = str(fn)
+
+    for ii, (ellipse_state, arrow_state) in enumerate(period_state):
+        for key in ELLIPSE_KEYS:
+            save(f"{ii}_{key}", ellipse_state[key])
+        # masked arrows are saved as nan
+        for key, (u, v) in arrow_state.items():
+            save(f"{ii}_{key}_u", np.ma.filled(u, np.nan))
+            save(f"{ii}_{key}_v", np.ma.filled(v, np.nan))
+    if model_slices is not None:
+        save("model_slices", model_slices)
+    return array_fns
+
+
+def _init_worker(array_fns, options):
+    global _arrays, _options
+    import matplotlib
+
+    matplotlib.use("Agg")
+    _arrays = dict(
+        (name, np.load(fn, mmap_mode="r")) for name, fn in array_fns.items()
+    )
+    _options = options
+
+
+def _render_period(data_ii, period, save_fn, slice_index=None):
+    """
+    draw the maps of one period in a worker and save them
+    """
+    from matplotlib.figure import Figure
+    from matplotlib.cm import ScalarMappable
+    from matplotlib.colors import Normalize
+    from matplotlib.backends.backend_agg import FigureCanvasAgg
+
+    from mtpy_gui.modeling.pt_map import (
+        add_ellipses,
+        set_ellipses,
+        add_arrows,
+        set_arrows,
+    )
+
+    options = _options
+    n_panels = options["n_panels"]
+    figure = Figure(
+        figsize=options["figsize"], dpi=options["dpi"], layout="constrained"
+    )
+    FigureCanvasAgg(figure)
+    axes = figure.subplots(
+        1, n_panels, sharex=True, sharey=True, squeeze=False
+    ).ravel()
+    figure.suptitle(
+        "Period {0:.5g} s".format(period),
+        fontsize=options["font_size"] + 2,
+        fontweight="bold",
+    )
+
+    east = options["east"]
+    north = options["north"]
+    for ii, ax in enumerate(axes):
+        ax.set_aspect("equal")
+        if slice_index is not None:
+            ax.imshow(
+                _arrays["model_slices"][slice_index],
+                extent=options["model_extent"],
+                origin="lower",
+                interpolation="nearest",
+            )
+        ellipses = add_ellipses(ax, east, north)
+        set_ellipses(
+            ellipses,
+            dict(
+                (key, _arrays[f"{ii}_{key}"][data_ii]) for key in ELLIPSE_KEYS
+            ),
+            slice(None),
+        )
+        for key, color in [
+            ("real", options["arrow_color_real"]),
+            ("imag", options["arrow_color_imag"]),
+        ]:
+            arrows = add_arrows(
+                ax,
+                east,
+                north,
+                color,
+                arrow_head_width=options["arrow_head_width"],
+                arrow_head_length=options["arrow_head_length"],
+                lw=options["arrow_lw"],
+            )
+            uv = [
+                np.ma.masked_invalid(_arrays[f"{ii}_{key}_{comp}"][data_ii])
+                for comp in "uv"
+            ]
+            set_arrows(arrows, uv, slice(None))
+
+        ax.set_xlim(options["ew_limits"])
+        ax.set_ylim(options["ns_limits"])
+        ax.set_title(PANEL_NAMES[ii], fontsize=options["font_size"] + 1)
+        ax.set_xlabel("Easting ({0})".format(options["map_scale"]))
+        if ii == 0:
+            ax.set_ylabel("Northing ({0})".format(options["map_scale"]))
+
+        if ii < 2:
+            cmap, norm, label = options["pt_colorbar"]
+        else:
+            cmap, norm, label = options["residual_colorbar"]
+        figure.colorbar(
+            ScalarMappable(norm=norm, cmap=cmap),
+            ax=ax,
+            orientation="horizontal",
+            shrink=0.6,
+            label=label,
+        )
+        if slice_index is not None:
+            figure.colorbar(
+                ScalarMappable(
+                    norm=Normalize(*options["res_limits"]),
+                    cmap=options["res_cmap"],
+                ),
+                ax=ax,
+                orientation="horizontal",
+                shrink=0.6,
+                label=r"log$_{10}$ Resistivity ($\Omega \cdot$m)",
+            )
+
+    figure.savefig(save_fn, dpi=options["dpi"])
+    return save_fn
+
+
+def export_pt_maps(
+    save_dir,
+    period_list,
+    period_state,
+    options,
+    save_format="png",
+    model_slices=None,
+    slice_index=None,
+    depth_array=None,
+    n_workers=None,
+    progress=None,
+    metadata=None,
+):
+    """
+    Render the phase tensor maps of every period in a process pool.
+
+    :param save_dir: directory to save figures and the manifest to
+    :type save_dir: string or Path
+    :param period_list: period of each row of the arrays in period_state
+    :type period_list: np.ndarray
+    :param period_state: (ellipse state, arrow state) of each panel from
+     :func:`mtpy_gui.modeling.pt_map.get_ellipse_state` and
+     :func:`mtpy_gui.modeling.pt_map.get_arrow_state`
+    :type period_state: list
+    :param options: figure options, station east and north, limits,
+     colours and colorbars (cmap, norm, label)
+    :type options: dict
+    :param save_format: png, pdf or svg
+    :type save_format: string
+    :param model_slices: RGBA raster of each depth used from
+     :class:`mtpy_gui.modeling.pt_map.ModelRaster`
+    :type model_slices: np.ndarray (n_depths, n_north, n_east, 4)
+    :param slice_index: index into model_slices of each period
+    :type slice_index: np.ndarray (n_periods)
+    :param depth_array: depth of each period for the manifest
+    :type depth_array: np.ndarray
+    :param n_workers: number of processes, defaults to the number of cpus
+    :type n_workers: int
+    :param progress: called with (n_done, n_total) as figures are saved
+    :type progress: callable
+    :param metadata: extra entries for the manifest, e.g. file names
+    :type metadata: dict
+    :return: path to the manifest
+    :rtype: Path
+
+    """
+    save_dir = Path(save_dir)
+    save_dir.mkdir(parents=True, exist_ok=True)
+    options = dict(options, n_panels=len(period_state))
+
+    array_dir = Path(tempfile.mkdtemp(dir=save_dir, prefix=".pt_map_arrays_"))
+    maps = []
+    try:
+        array_fns = write_export_arrays(array_dir, period_state, model_slices)
+        # spawn so workers do not inherit the state of a running Qt app
+        with ProcessPoolExecutor(
+            max_workers=n_workers,
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=_init_worker,
+            initargs=(array_fns, options),
+        ) as executor:
+            futures = {}
+            for data_ii, period in enumerate(period_list):
+                save_fn = save_dir.joinpath(
+                    f"PT_map_{data_ii:03d}_{period:.5g}s.{save_format}"
+                )
+                entry = {
+                    "index": data_ii,
+                    "period": float(period),
+                    "file": save_fn.name,
+                }
+                d_index = None
+                if slice_index is not None:
+                    d_index = int(slice_index[data_ii])
+                if depth_array is not None:
+                    entry["depth"] = float(depth_array[data_ii])
+                future = executor.submit(
+                    _render_period,
+                    data_ii,
+                    float(period),
+                    str(save_fn),
+                    d_index,
+                )
+                futures[future] = entry
+
+            for n_done, future in enumerate(as_completed(futures), 1):
+                entry = futures[future]
+                try:
+                    future.result()
+                except Exception as error:
+                    entry["error"] = str(error)
+                    print(
+                        "Could not export period {0:.5g} because {1}".format(
+                            entry["period"], error
+                        )
+                    )
+                maps.append(entry)
+                if progress is not None:
+                    progress(n_done, len(futures))
+    finally:
+        shutil.rmtree(array_dir, ignore_errors=True)
+
+    manifest = dict(metadata or {})
+    manifest.update(
+        {
+            "format": save_format,
+            "panels": PANEL_NAMES[: len(period_state)],
+            "maps": sorted(maps, key=lambda entry: entry["index"]),
+        }
+    )
+    manifest_fn = save_dir.joinpath(MANIFEST_FN)
+    with open(manifest_fn, "w") as fid:
+        json.dump(manifest, fid, indent=4)
+    return manifest_fn
@@ -0,0 +1,175 @@
+# -*- coding: utf-8 -*-
+"""
+Phase tensor pseudo-sections along a profile.
+
+Stations are projected onto every segment of a polyline at once and each
+station is assigned to the nearest segment.  Stations within a buffer
+distance of the profile are kept, ordered by distance along the profile.
+The projection of the last few profiles is cached, so redrawing a
+pseudo-section for other settings only indexes the per-period arrays of
+:mod:`mtpy_gui.modeling.pt_map`.
+
+Created on Mon Oct 19 2026
+
+:license: MIT
+
+"""
+
+# =============================================================================
+# Imports
+# =============================================================================
+from collections import OrderedDict
+
+import numpy as np
+
+# =============================================================================
+# Projection
+# =============================================================================
+
+
+def project_points(east, north, vertices):
+    """
+    Project points onto the nearest segment of a polyline.
+
+    :param east: point east
+    :type east: np.ndarray (n_points)
+    :param north: point north
+    :type north: np.ndarray (n_points)
+    :param vertices: (east, north) of the profile vertices
+    :type vertices: np.ndarray (n_vertices, 2)
+    :return: distance along the profile, perpendicular offset from the
+     profile and index of the nearest segment of each point
+    :rtype: np.ndarray, np.ndarray, np.ndarray
+
+    """
+    points = np.column_stack((east, north)).astype(float)
+    vertices = np.asarray(vertices, dtype=float)
+    start = vertices[:-1]
+    segment = vertices[1:] - start
+    length = np.hypot(segment[:, 0], segment[:, 1])
+    cumulative = np.concatenate(([0], np.cumsum(length)))
+
+    # (n_points, n_segments) position along each segment
+    relative = points[:, None, :] - start[None, :, :]
+    with np.errstate(divide="ignore", invalid="ignore"):
+        t = np.einsum("psk,sk->ps", relative, segment) / length**2
+    t = np.clip(np.nan_to_num(t), 0, 1)
+    nearest = start[None] + t[..., None] * segment[None]
+    offset = np.hypot(
+        points[:, None, 0] - nearest[..., 0],
+        points[:, None, 1] - nearest[..., 1],
+    )
+
+    segment_index = offset.argmin(axis=1)
+    rows = np.arange(points.shape[0])
+    distance = (
+        cumulative[segment_index]
+        + t[rows, segment_index] * length[segment_index]
+    )
+    return distance, offset[rows, segment_index], segment_index
+
+
+class ProfileProjection:
+    """
+    Stations within buffer of a profile ordered along it.
+
+    :param east: station east
+    :type east: np.ndarray (n_stations)
+    :param north: station north
+    :type north: np.ndarray (n_stations)
+    :param vertices: (east, north) of the profile vertices
+    :type vertices: np.ndarray (n_vertices, 2)
+    :param buffer: largest distance of a station from the profile
+    :type buffer: float
+
+    """
+
+    def __init__(self, east, north, vertices, buffer):
+        self.vertices = np.asarray(vertices, dtype=float)
+        self.buffer = buffer
+
+        distance, offset, _ = project_points(east, north, self.vertices)
+        inside = np.nonzero(offset <= buffer)[0]
+        order = np.argsort(distance[inside], kind="stable")
+        # index of the stations in the section and where they are on it
+        self.station_index = inside[order]
+        self.distance = distance[self.station_index]
+        self.offset = offset[self.station_index]
+
+    @property
+    def length(self):
+        segment = np.diff(self.vertices, axis=0)
+        return np.hypot(segment[:, 0], segment[:, 1]).sum()
+
+    def get_section(self, array):
+        """
+        take the stations in the section from a per-period array
+        (n_periods, n_stations, ...)
+        """
+        return np.asarray(array)[:, self.station_index]
+
+
+_projections = OrderedDict()
+
+
+def get_profile_projection(east, north, vertices, buffer, cache_size=8):
+    """
+    Get a :class:`ProfileProjection`, the last few profiles are cached.
+    """
+    arrays = [np.asarray(ii, dtype=float) for ii in [east, north, vertices]]
+    key = tuple((ii.shape, ii.tobytes()) for ii in arrays) + (float(buffer),)
+    projection = _projections.get(key)
+    if projection is None:
+        projection = ProfileProjection(*arrays, buffer)
+        _projections[key] = projection
+        while len(_projections) > cache_size:
+            _projections.popitem(last=False)
+    _projections.move_to_end(key)
+    return projection
+
+
+# =============================================================================
+# Pseudo-section
+# =============================================================================
+
+
+def get_section_state(projection, ellipse_state, arrow_state, period_list):
+    """
+    Get the ellipses and arrows of the stations in a profile for all
+    periods as flat arrays, placed at (distance, log10(period)).
+
+    :param projection: stations in the profile
+    :type projection: :class:`ProfileProjection`
+    :param ellipse_state: from :func:`mtpy_gui.modeling.pt_map.get_ellipse_state`
+    :type ellipse_state: dict
+    :param arrow_state: from :func:`mtpy_gui.modeling.pt_map.get_arrow_state`
+    :type arrow_state: dict
+    :param period_list: period of each row of the states
+    :type period_list: np.ndarray (n_periods)
+    :return: x, y, ellipse state and arrow state with one row
+    :rtype: np.ndarray, np.ndarray, dict, dict
+
+    """
+    n_periods = len(period_list)
+    n_stations = projection.station_index.size
+    x = np.broadcast_to(projection.distance, (n_periods, n_stations)).ravel()
+    y = np.broadcast_to(
+        np.log10(np.asarray(period_list, dtype=float))[:, None],
+        (n_periods, n_stations),
+    ).ravel()
+
+    section_ellipses = {}
+    for key, value in ellipse_state.items():
+        value = projection.get_section(value)
+        section_ellipses[key] = value.reshape((1, -1) + value.shape[2:])
+
+    section_arrows = {}
+    for key, (u, v) in arrow_state.items():
+        section_arrows[key] = tuple(
+            np.ma.masked_array(
+                projection.get_section(np.ma.getdata(comp)),
+                mask=projection.get_section(np.ma.getmaskarray(comp)),
+            ).reshape(1, -1)
+            for comp in (u, v)
+        )
+    return x, y, section_ellipses, section_arrows
@@ -0,0 +1,198 @@
+# -*- coding: utf-8 -*-
+"""
+Cache of log10 resistivity slices with background prefetch.
+
+When a slice is asked for, the slices next to it are computed in a worker
+thread.  More slices are computed ahead, in the direction the index last
+moved, than behind, so stepping through the model with a slider mostly
+finds the slice already computed.  An edit only drops the cached slices
+that pass through the edited region.
+
+Created on Mon Oct 19 2026
+
+:license: MIT
+
+"""
+
+# =============================================================================
+# Imports
+# =============================================================================
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+from mtpy_gui.modeling.model_compare import SLICES
+from mtpy_gui.modeling.model_paint import ORIENTATIONS
+
+# =============================================================================
+# Slice cache
+# =============================================================================
+
+
+class SliceCache:
+    """
+    Log10 slices of a model for each view, see
+    :data:`mtpy_gui.modeling.model_compare.SLICES`.
+
+    :param res_model: resistivity model
+    :type res_model: np.ndarray (n_north, n_east, n_z)
+    :param n_ahead: number of slices to prefetch in the direction of travel
+    :type n_ahead: int
+    :param n_behind: number of slices to prefetch behind
+    :type n_behind: int
+    :param cache_size: number of slices to keep for each view
+    :type cache_size: int
+
+    """
+
+    def __init__(self, res_model, n_ahead=4, n_behind=1, cache_size=24):
+        self.res_model = res_model
+        self.n_ahead = n_ahead
+        self.n_behind = n_behind
+        self.cache_size = cache_size
+
+        self._slices = dict((key, OrderedDict()) for key in SLICES)
+        self._last_index = dict((key, None) for key in SLICES)
+        self._direction = dict((key, 0) for key in SLICES)
+        self._pending = set()
+        # results from before an edit are thrown away
+        self._generation = 0
+        self._lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(max_workers=1)
+
+    def _compute(self, orientation, index):
+        with np.errstate(divide="ignore"):
+            return np.log10(self.res_model[SLICES[orientation](index)])
+
+    def _store(self, orientation, index, data):
+        slices = self._slices[orientation]
+        slices[index] = data
+        slices.move_to_end(index)
+        while len(slices) > self.cache_size:
+            slices.popitem(last=False)
+
+    def _prefetch_one(self, orientation, index, generation):
+        try:
+            if generation != self._generation:
+                return
+            data = self._compute(orientation, index)
+            with self._lock:
+                if generation == self._generation:
+                    self._store(orientation, index, data)
+        finally:
+            with self._lock:
+                self._pending.discard((orientation, index))
+
+    def get_prefetch_index(self, orientation, index):
+        """
+        index of the slices to prefetch around index, nearest first
+        """
+        n_slices = self.res_model.shape[ORIENTATIONS[orientation][2]]
+        direction = self._direction[orientation]
+        if direction == 0:
+            ahead = behind = max(self.n_ahead, self.n_behind)
+            direction = 1
+        else:
+            ahead, behind = self.n_ahead, self.n_behind
+
+        prefetch = []
+        for step in range(1, max(ahead, behind) + 1):
+            if step <= ahead:
+                prefetch.append(index + direction * step)
+            if step <= behind:
+                prefetch.append(index - direction * step)
+        return [ii for ii in prefetch if 0 <= ii < n_slices]
+
+    def get(self, orientation, index, prefetch=True):
+        """
+        Get the log10 resistivity of a slice with model axis order, then
+        prefetch its neighbours.
+
+        :param orientation: one of 'map', 'east', 'north'
+        :type orientation: string
+        :param index: index of the slice
+        :type index: int
+        :param prefetch: compute neighbouring slices in the background
+        :type prefetch: bool
+        :return: log10 resistivity, do not edit
+        :rtype: np.ndarray
+
+        """
+        index = int(index)
+        last_index = self._last_index[orientation]
+        if last_index is not None and index != last_index:
+            self._direction[orientation] = int(np.sign(index - last_index))
+        self._last_index[orientation] = index
+
+        with self._lock:
+            data = self._slices[orientation].get(index)
+            if data is not None:
+                self._slices[orientation].move_to_end(index)
+            generation = self._generation
+        if data is None:
+            data = self._compute(orientation, index)
+            with self._lock:
+                if generation == self._generation:
+                    self._store(orientation, index, data)
+
+        if prefetch:
+            self.prefetch(orientation, index)
+        return data
+
+    def prefetch(self, orientation, index):
+        """
+        queue the slices around index that are not cached or queued
+        """
+        with self._lock:
+            generation = self._generation
+            for ii in self.get_prefetch_index(orientation, index):
+                key = (orientation, ii)
+                if ii in self._slices[orientation] or key in self._pending:
+                    continue
+                self._pending.add(key)
+                self._executor.submit(
+                    self._prefetch_one, orientation, ii, generation
+                )
+
+    def invalidate(self, index=None):
+        """
+        Drop the cached slices that pass through an edited region.
+
+        :param index: edited region of the model made of slices, None for
+         the whole model
+        :type index: tuple
+
+        """
+        with self._lock:
+            self._generation += 1
+            for orientation, slices in self._slices.items():
+                if index is None:
+                    slices.clear()
+                    continue
+                normal_axis = ORIENTATIONS[orientation][2]
+                normal_index = index[normal_axis]
+                if isinstance(normal_index, slice):
+                    start, stop, _ = normal_index.indices(
+                        self.res_model.shape[normal_axis]
+                    )
+                else:
+                    start, stop = int(normal_index), int(normal_index) + 1
+                for ii in [ii for ii in slices if start <= ii < stop]:
+                    del slices[ii]
+
+    def reset(self, res_model):
+        """
+        use a new model, e.g. after undo
+        """
+        self.res_model = res_model
+        self.invalidate()
+
+    def close(self):
+        """
+        stop the worker thread, slices still queued are not computed
+        """
+        with self._lock:
+            self._generation += 1
+        self._executor.shutdown(wait=False, cancel_futures=True)
@@ -0,0 +1,183 @@
+# -*- coding: utf-8 -*-
+"""
+Spatial index of stations for model sections.
+
+The stations near each grid line are found once with :func:`np.searchsorted`
+on the sorted station coordinates, so a section redraw only has to look up
+a slice of station rows.  Station labels for a section are drawn by a single
+:class:`StationLabels` artist that is reused between redraws.
+
+Created on Mon Oct 19 2026
+
+:license: MIT
+
+"""
+
+# =============================================================================
+# Imports
+# =============================================================================
+import numpy as np
+from matplotlib.artist import Artist
+from matplotlib.text import Text
+
+# =============================================================================
+# Station index
+# =============================================================================
+
+
+class StationIndex:
+    """
+    Map grid line indices to the stations close to that line.
+
+    A station is close to a line if it is within one cell size of the grid
+    node, the same as filtering the station DataFrame for each section.
+
+    :param station_locations: station locations with columns station,
+     model_east, model_north, model_elevation
+    :type station_locations: :class:`pandas.DataFrame`
+    :param grid_east: east nodes of the model
+    :type grid_east: np.ndarray
+    :param grid_north: north nodes of the model
+    :type grid_north: np.ndarray
+    :param cell_size_east: cell size in the east direction
+    :type cell_size_east: float
+    :param cell_size_north: cell size in the north direction
+    :type cell_size_north: float
+
+    """
+
+    def __init__(
+        self,
+        station_locations,
+        grid_east,
+        grid_north,
+        cell_size_east,
+        cell_size_north,
+    ):
+        self.station_locations = station_locations
+        self.east = station_locations.model_east.to_numpy(dtype=float)
+        self.north = station_locations.model_north.to_numpy(dtype=float)
+        self.elevation = station_locations.model_elevation.to_numpy(dtype=float)
+        self.station = station_locations.station.to_numpy(dtype=str)
+
+        self._east_order, self._east_bounds = self._build(
+            self.east, grid_east, cell_size_east
+        )
+        self._north_order, self._north_bounds = self._build(
+            self.north, grid_north, cell_size_north
+        )
+
+    @staticmethod
+    def _build(coordinates, nodes, cell_size):
+        """
+        sort the stations along one axis and find the range of sorted
+        stations within cell_size of each node
+        """
+        order = np.argsort(coordinates, kind="stable")
+        sorted_coordinates = coordinates[order]
+        nodes = np.asarray(nodes, dtype=float)
+        lower = np.searchsorted(
+            sorted_coordinates, nodes - cell_size, side="left"
+        )
+        upper = np.searchsorted(
+            sorted_coordinates, nodes + cell_size, side="right"
+        )
+        return order, np.column_stack((lower, upper))
+
+    @staticmethod
+    def _get_rows(order, bounds, index):
+        lower, upper = bounds[index]
+        return np.sort(order[lower:upper])
+
+    def get_east_rows(self, east_index):
+        """
+        row numbers of the stations close to the east grid line east_index
+        """
+        return self._get_rows(self._east_order, self._east_bounds, east_index)
+
+    def get_north_rows(self, north_index):
+        """
+        row numbers of the stations close to the north grid line north_index
+        """
+        return self._get_rows(
+            self._north_order, self._north_bounds, north_index
+        )
+
+    def get_east_stations(self, east_index):
+        """
+        station locations close to the east grid line east_index
+        """
+        return self.station_locations.iloc[self.get_east_rows(east_index)]
+
+    def get_north_stations(self, north_index):
+        """
+        station locations close to the north grid line north_index
+        """
+        return self.station_locations.iloc[self.get_north_rows(north_index)]
+
+
+# =============================================================================
+# Station labels
+# =============================================================================
+
+
+class StationLabels(Artist):
+    """
+    Draw a set of station labels as a single artist.
+
+    One :class:`matplotlib.text.Text` is kept as a template and drawn at
+    each label position, only labels inside the view are drawn.  The artist
+    can be added back to an axes after ax.cla().
+
+    :param x: x position of each label in data coordinates
+    :type x: np.ndarray
+    :param y: y position of each label in data coordinates
+    :type y: np.ndarray
+    :param labels: label text
+    :type labels: np.ndarray of str
+
+    Other keyword arguments are passed to :class:`matplotlib.text.Text`.
+
+    """
+
+    def __init__(self, x=(), y=(), labels=(), **kwargs):
+        super().__init__()
+        self._text = Text(**kwargs)
+        self.set_data(x, y, labels)
+
+    def set_data(self, x, y, labels):
+        """
+        set the label positions and text
+        """
+        self.x = np.asarray(x, dtype=float)
+        self.y = np.asarray(y, dtype=float)
+        self.labels = np.asarray(labels, dtype=str)
+        self.stale = True
+
+    @staticmethod
+    def _in_view(values, limits):
+        vmin, vmax = min(limits), max(limits)
+        pad = 0.05 * (vmax - vmin)
+        return (values >= vmin - pad) & (values <= vmax + pad)
+
+    def draw(self, renderer):
+        if not self.get_visible() or self.axes is None or self.x.size == 0:
+            return
+
+        ax = self.axes
+        visible = self._in_view(self.x, ax.get_xlim()) & self._in_view(
+            self.y, ax.get_ylim()
+        )
+
+        text = self._text
+        text.set_figure(self.figure)
+        text.set_transform(ax.transData)
+        text.set_clip_box(ax.bbox)
+        text.set_clip_on(self.get_clip_on())
+        for xx, yy, label in zip(
+            self.x[visible], self.y[visible], self.labels[visible]
+        ):
+            text.set_position((xx, yy))
+            text.set_text(label)
+            text.draw(renderer)
+        self.stale = False